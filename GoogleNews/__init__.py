@@ -1,82 +1,198 @@
 ### MODULES
-import re
-import urllib.request
-import dateparser, copy
-from bs4 import BeautifulSoup as Soup, ResultSet
-from dateutil.parser import parse
+import copy
+import time
+from urllib.parse import quote, urlsplit
 
 import datetime
-from dateutil.relativedelta import relativedelta
 import logging
+from .transport import Transport, UrllibTransport, PooledTransport
+from .cache import Cache, MemoryCache, SQLiteCache
+from .ratelimit import RateLimiter, BlockedError, shared_limiter, is_block_page, retry_after, THROTTLE_STATUSES
+from .item import NewsItem, FieldView, newest, timestamp_of, UNKNOWN_TIMESTAMP
+from . import parser as html_parser
+from .dates import parse_date
+from .extract import search_plan, news_plan, REJECTED
+from .filters import DomainFilter, MediaFilter
+from .dedup import DedupIndex, canonical_url, clean_url
+from .query import Query
+from .archive import SQLiteArchive
+from .observe import Observer, HistogramObserver, Histogram, PHASES, FIELDS
+from .watermark import Watermark, WatermarkStore, MemoryWatermarkStore, SQLiteWatermarkStore
 ### METHODS
 
-def lexical_date_parser(date_to_check):
+def lexical_date_parser(date_to_check, lang='en'):
+    """
+    Splits the date off the text google shows under a result and converts it.
+    Returns the date text and its datetime, or the original text and None when it is not a date.
+    """
     if date_to_check=='':
         return ('',None)
-    datetime_tmp=None
-    date_tmp=copy.copy(date_to_check)
-    try:
+    date_tmp=date_to_check
+    if '..' in date_tmp:
         date_tmp = date_tmp[date_tmp.rfind('..')+2:]
-        datetime_tmp=dateparser.parse(date_tmp)
-    except:
-        date_tmp = None
-        datetime_tmp = None
+    datetime_tmp=parse_date(date_tmp, lang)
 
     if datetime_tmp==None:
         date_tmp=date_to_check
-    else:
-        datetime_tmp=datetime_tmp.replace(tzinfo=None)
 
     if date_tmp[0]==' ':
         date_tmp=date_tmp[1:]
     return date_tmp,datetime_tmp
 
 
-def define_date(date):
-    months = {'Jan':1,'Feb':2,'Mar':3,'Apr':4,'May':5,'Jun':6,'Jul':7,'Aug':8,'Sep':9,'Sept':9,'Oct':10,'Nov':11,'Dec':12, '01':1, '02':2, '03':3, '04':4, '05':5, '06':6, '07':7, '08':8, '09':9, '10':10, '11':11, '12':12}
-    try:
-        if ' ago' in date.lower():
-            q = int(date.split()[-3])
-            if 'minutes' in date.lower() or 'mins' in date.lower():
-                return datetime.datetime.now() + relativedelta(minutes=-q)
-            elif 'hour' in date.lower():
-                return datetime.datetime.now() + relativedelta(hours=-q)
-            elif 'day' in date.lower():
-                return datetime.datetime.now() + relativedelta(days=-q)
-            elif 'week' in date.lower():
-                return datetime.datetime.now() + relativedelta(days=-7*q)
-            elif 'month' in date.lower():
-                return datetime.datetime.now() + relativedelta(months=-q)
-        elif 'yesterday' in date.lower():
-            return datetime.datetime.now() + relativedelta(days=-1)
-        else:
-            date_list = date.replace('/',' ').split(' ')
-            if len(date_list) == 2:
-                date_list.append(datetime.datetime.now().year)
-            elif len(date_list) == 3:
-                if date_list[0] == '':
-                    date_list[0] = '1'
-            return datetime.datetime(day=int(date_list[0]), month=months[date_list[1]], year=int(date_list[2]))
-    except:
+def define_date(date, lang='en'):
+    """Converts a date shown by google into a datetime, nan when it is not a date."""
+    datetime_tmp = parse_date(date, lang)
+    if datetime_tmp is None:
         return float('nan')
+    return datetime_tmp
+
+
+def cut_after_last_fullstop(text):
+    """text up to its last full stop, google cuts the descriptions in the middle of a sentence."""
+    last_period_index = text.rfind('.')
+    return text[:last_period_index+1] if last_period_index != -1 else text
+
+
+def parse_search_rows(nodes, plan, lang='en', accept=None, stats=None):
+    """
+    Reads the result nodes of a google.com page into rows (title, media, date, datetime, desc, link, img),
+    the values of their NewsItem. Needs no GoogleNews, so it also runs in worker processes.
+    Parameters:
+    nodes = the result nodes, parser.search_items()
+    plan = ExtractionPlan reading the fields, it counts the results accept turned down; when it keeps their dates,
+           see search_plan(dates=True), plan.dates gets the datetimes of every result of the page
+    lang = language of the dates
+    accept = function(link, media) -> bool, None to keep every result
+    stats = None, or a dict that gets 'dates', the seconds spent converting dates, and 'missing', the count per field
+    """
+    rows = []
+    if stats is not None:
+        dating, missing = 0.0, dict.fromkeys(FIELDS, 0)
+    for node in nodes:
+        fields = plan.extract(node, accept)
+        if fields is REJECTED:
+            continue
+        title, link, media, date, desc, img = fields
+        tmp_datetime = None
+        if stats is None:
+            if date is not None:
+                date, tmp_datetime = lexical_date_parser(date, lang)
+        else:
+            if date is not None:
+                dating_started = time.perf_counter()
+                date, tmp_datetime = lexical_date_parser(date, lang)
+                dating += time.perf_counter() - dating_started
+            for field, value in (('title', title), ('link', link), ('media', media), ('date', date), ('desc', desc)):
+                if value is None:
+                    missing[field] += 1
+            if date is not None and tmp_datetime is None:
+                missing['datetime'] += 1
+        rows.append((title.replace("\n","") if title is not None else '',
+                     media if media is not None else '',
+                     date if date is not None else '',
+                     tmp_datetime if tmp_datetime is not None else float('nan'),
+                     cut_after_last_fullstop(desc).replace('\n','') if desc is not None else '',
+                     link.replace('/url?esrc=s&q=&rct=j&sa=U&url=','') if link is not None else '',
+                     img))
+    if plan.rejected_dates is not None:
+        dates = [row[3] for row in rows if isinstance(row[3], datetime.datetime)]
+        for date in plan.rejected_dates:
+            if date:
+                tmp_datetime = lexical_date_parser(date, lang)[1]
+                if tmp_datetime is not None:
+                    dates.append(tmp_datetime)
+        plan.dates = dates
+    if stats is not None:
+        stats['dates'] = dating
+        stats['missing'] = missing
+    return rows
+
+
+def parse_search_page(page, parser='html.parser', lang='en', link_filter=None, media_filter=None, timed=False,
+                      dates=False):
+    """
+    Parses a downloaded google.com page in a worker process of the parse pool.
+    Only plain values cross the process boundary: returns (total count, rejected, rows, stats, dates), rows being
+    those of parse_search_rows, stats, when timed, the seconds of the 'parse', 'extract' and 'dates' phases and
+    'missing', and dates, when asked, the datetimes of every result of the page, the rejected ones included.
+    The filters must be picklable, like DomainFilter and MediaFilter; GoogleNews applies the others itself.
+    """
+    stats = {} if timed else None
+    started = time.perf_counter() if timed else None
+    nodes = html_parser.search_items(page, parser)
+    if timed:
+        parsed = time.perf_counter()
+        stats['parse'] = parsed - started
+    plan = search_plan(dates)
+    accept = SearchAccept(link_filter, media_filter) if link_filter is not None or media_filter is not None else None
+    rows = parse_search_rows(nodes, plan, lang, accept, stats)
+    if timed:
+        stats['extract'] = time.perf_counter() - parsed - stats['dates']
+    return html_parser.total_count(page), plan.rejected, rows, stats, plan.dates
+
+
+def picklable(value):
+    """Whether value can be sent to a worker process: functions defined in other functions and lambdas can't."""
+    import pickle
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def process_pool(workers=None, parser='html.parser'):
+    """
+    ProcessPoolExecutor for GoogleNews.set_parse_pool(), one worker per core by default.
+    The workers import the parser and the date modules when they start instead of on their first page,
+    from Python 3.7: before it, the executors take no initializer and the first page pays for them.
+    """
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+    if sys.version_info < (3, 7):
+        return ProcessPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(parser,))
+
+
+def _warm_worker(parser):
+    html_parser.check_parser(parser)
+    html_parser.search_items(b'<a data-ved="x" href="/">x</a>', parser)
+    parse_date('1 hour ago')
 
 
 ### CLASSEs
 
+class SearchAccept:
+    """accept(link, media) of the google.com results: the link without google's redirect and the media through the filters."""
+
+    __slots__ = ('link_filter', 'media_filter')
+
+    def __init__(self, link_filter=None, media_filter=None):
+        self.link_filter = link_filter
+        self.media_filter = media_filter
+
+    def __call__(self, link, media):
+        link = link.replace('/url?esrc=s&q=&rct=j&sa=U&url=','') if link is not None else ''
+        return ((self.link_filter is None or self.link_filter(link)) and
+                (self.media_filter is None or self.media_filter(media if media is not None else '')))
+
+    def __getstate__(self):
+        return (self.link_filter, self.media_filter)
+
+    def __setstate__(self, state):
+        self.link_filter, self.media_filter = state
+
+
 class GoogleNews:
 
-    def __init__(self,lang="en",period="",start="",end="",encode="utf-8",region=None):
-        self.__texts = []
-        self.__links = []
+    def __init__(self,lang="en",period="",start="",end="",encode="utf-8",region=None,transport=None,parser="html.parser",cache=None,rate_limiter=None,observer=None):
         self.__results = []
         self.__totalcount = 0
         self.user_agent = 'Mozilla/5.0 (X11; Ubuntu; Linux i686; rv:64.0) Gecko/20100101 Firefox/64.0'
         self.__lang = lang
-        if region:
-            self.accept_language= lang + '-' + region + ',' + lang + ';q=0.9'
-            self.headers = {'User-Agent': self.user_agent, 'Accept-Language': self.accept_language}
-        else:
-            self.headers = {'User-Agent': self.user_agent}
+        self.headers = {'User-Agent': self.user_agent}
+        self.set_region(region)
         self.__period = period
         self.__start = start
         self.__end = end
@@ -85,6 +201,36 @@ class GoogleNews:
         self.__version = '1.6.15'
         self.__topic = None
         self.__section = None
+        self.transport = transport if transport is not None else PooledTransport()
+        html_parser.check_parser(parser)
+        self.__parser = parser
+        self.cache = cache
+        self.rate_limiter = rate_limiter if rate_limiter is not None else shared_limiter()
+        self.__link_filter = None
+        self.__media_filter = None
+        # the filters split into the ones sent to the parse pool and the ones applied here, see __submit_parse
+        self.__pool_filters = None
+        self.__dedup = None
+        self.observer = observer
+        self.parse_pool = None
+        self.archive = None
+        # whether the last fetch_until reached its cutoff or the last page of results,
+        # and the datetimes of every result on the pages it read, the filtered out ones included
+        self.__complete = False
+        self.__page_dates = []
+
+    def clone(self):
+        """
+        Returns a new GoogleNews with the same settings, transport and cache but no results,
+        so several searches can run in parallel threads, one instance each.
+        """
+        other = copy.copy(self)
+        other.__results = []
+        other.__totalcount = 0
+        other.headers = dict(self.headers)
+        for name in ('url', 'page', '_GoogleNews__key'):
+            other.__dict__.pop(name, None)
+        return other
 
     def getVersion(self):
         return self.__version
@@ -95,6 +241,14 @@ class GoogleNews:
     def set_lang(self, lang):
         self.__lang = lang
 
+    def set_region(self, region):
+        """Asks google for the results of region ('BR', 'US'...) in the current language, None for no region."""
+        if region:
+            self.accept_language= self.__lang + '-' + region + ',' + self.__lang + ';q=0.9'
+            self.headers['Accept-Language'] = self.accept_language
+        else:
+            self.headers.pop('Accept-Language', None)
+
     def setlang(self, lang):
         """Don't remove this, will affect old version user when upgrade"""
         self.set_lang(lang)
@@ -123,98 +277,480 @@ class GoogleNews:
     def set_section(self, section: str):
         self.__section = section
         
+    def set_filter(self, link=None, media=None):
+        """
+        Keeps only the results accepted by the predicates. They are checked on the link and the media of each
+        result before the rest of it is read, so rejected results cost neither extraction nor date parsing.
+        Parameters:
+        link = function(link) -> bool, e.g. DomainFilter(['globo.com']), None to accept every link
+        media = function(media) -> bool, e.g. MediaFilter('Valor'), None to accept every media
+        """
+        self.__link_filter = link
+        self.__media_filter = media
+        self.__pool_filters = None
+
+    def set_dedup(self, index):
+        """
+        Leaves out the results that index already has: the same article seen on another page, in another search
+        or in a previous poll, under a variant of its link or as a copy on another outlet.
+        Parameter:
+        index = a DedupIndex, it can be shared by several GoogleNews; None to keep every result
+        """
+        self.__dedup = index
+
+    def set_parse_pool(self, pool):
+        """
+        Parses the google.com pages in pool instead of the thread that downloaded them: the raw page goes to a worker
+        and only rows of plain values come back, so parsing uses as many cores as the pool has workers.
+        Parameter:
+        pool = a concurrent.futures executor, usually process_pool(); None to parse in the calling thread
+        """
+        self.parse_pool = pool
+
+    def set_archive(self, archive):
+        """
+        Stores every search result in archive, and lets search_archived() answer from it.
+        Parameter:
+        archive = a SQLiteArchive, it can be shared by several GoogleNews and processes; None to keep nothing
+        """
+        self.archive = archive
+
+    def archive_key(self, key=None):
+        """Key of a search in the archive: the term, the language, the region and the filters, which change its results."""
+        if key is not None:
+            self.__set_key(key)
+        return '|'.join([self.__key, self.__lang, self.__region() or '',
+                         repr(self.__link_filter) if self.__link_filter is not None else '',
+                         repr(self.__media_filter) if self.__media_filter is not None else ''])
+
+    def search_archived(self, key, since, pages=1, fresh=0, media=None):
+        """
+        Retrieves into __results the results of a search dated since `since`, from the archive: google is only asked
+        for the parts of the window the archive has not retrieved yet, usually the newest hours, page by page until
+        a result older than the part or `pages` pages (see fetch_until). Each part is asked with its own date range,
+        from the page after the results google already showed in its last day. When the pages end before the part
+        does, only the time down to their oldest result, filtered out or not, counts as retrieved, the next search
+        goes on with the rest.
+        Errors are handled as in the other searches, the archive still answers with what it has.
+        Returns the number of pages downloaded from google, 0 when the archive had the whole window.
+        Parameters:
+        key = the search term
+        since = datetime, the oldest results wanted
+        pages = maximum number of pages retrieved from google for each missing part of the window
+        fresh = seconds: missing parts shorter than that are not retrieved, the archive is recent enough
+        media = only the results of this media, ignoring case
+        """
+        search = self.archive_key(key)
+        start, now = since.timestamp(), time.time()
+        fetched = 0
+        for gap_start, gap_end in self.archive.gaps(search, start, now, fresh):
+            client = self.clone()
+            client.set_dedup(None)
+            client.enableException(True)
+            # google takes whole days: the results of the last day newer than the gap were read already,
+            # the retrieval starts on the page holding the first one older
+            first_day = datetime.datetime.fromtimestamp(gap_start)
+            last_day = datetime.datetime.fromtimestamp(gap_end)
+            client.set_time_range(first_day.strftime('%m/%d/%Y'), last_day.strftime('%m/%d/%Y'))
+            first = 1 + self.archive.offset(search, gap_end) // 10
+            started = time.time()
+            try:
+                # the head of a window usually fits in one page, don't download the next one in advance
+                retrieved = client.fetch_until(first_day, first + pages - 1, key,
+                                               prefetch=gap_end - gap_start > 24 * 3600, first=first)
+            except Exception as e_fetch:
+                # the client already reported the error
+                if self.__exception or isinstance(e_fetch, BlockedError):
+                    raise
+                break
+            fetched += retrieved
+            # the head of the window runs until the retrieval, the older gaps end where the archive goes on
+            gap_end = started if gap_end == now else gap_end
+            if client.__complete:
+                self.archive.cover(search, gap_start, gap_end)
+                continue
+            # the results the filters rejected count too, a filtered search goes down the pages as well
+            dated = [timestamp_of(date) for date in client.__page_dates]
+            dated = [stamp for stamp in dated if stamp != UNKNOWN_TIMESTAMP]
+            if dated and min(dated) < gap_end:
+                oldest = max(gap_start, min(dated))
+                self.archive.cover(search, oldest, gap_end)
+                # the results of the oldest one's day at or after it: the ones read now, and the skipped pages
+                day = datetime.date.fromtimestamp(oldest)
+                rows = sum(1 for stamp in dated if stamp >= oldest and datetime.date.fromtimestamp(stamp) == day)
+                if day == last_day.date():
+                    rows += 10 * (first - 1)
+                self.archive.set_offset(search, oldest, rows)
+        observer = self.observer
+        started = time.perf_counter() if observer is not None else None
+        items = self.archive.results(search, start, media=media)
+        if observer is not None:
+            observer.phase('archive', time.perf_counter() - started)
+        if self.__dedup is not None:
+            items = [item for item in items if self.__dedup.add(item) is None]
+        self.__results.extend(items)
+        return fetched
+
     def setencode(self, encode):
         """Don't remove this, will affect old version user when upgrade"""
         self.set_encode(encode)
 
-    def search(self, key):
+    def search(self, key, pages=1, concurrency=1):
+        """
+        Searches for a term in google.com in the news section and retrieves the first pages into __results.
+        Parameters:
+        key = the search term
+        pages = number of pages to be retrieved, starting from the first one
+        concurrency = number of pages downloaded in parallel
+        """
+        self.__set_key(key)
+        if pages <= 1:
+            self.get_page()
+        else:
+            self.get_pages(range(1, pages + 1), concurrency)
+
+    def search_many(self, queries, pages=1, concurrency=4, sink=None):
+        """
+        Runs many searches at once, each in a clone of this GoogleNews: they share its transport (and so its
+        connection pool), cache, rate limiter, filters and observer, and leave __results untouched.
+        Returns a list of (query, results, error) in the order of queries, query being a Query, error None
+        or the exception that stopped the search, results what it retrieved before that.
+        Parameters:
+        queries = Query objects, search terms or dicts with the parameters of Query
+        pages = number of pages retrieved per search
+        concurrency = number of searches running at the same time
+        sink = function(query, results, error) called as soon as each search ends, from the thread that ran it
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        queries = [Query.of(query) for query in queries]
+
+        def run(query):
+            entry = self.search_query(query, pages)
+            if sink is not None:
+                sink(*entry)
+            return entry
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(run, queries))
+
+    def search_query(self, query, pages=1):
+        """
+        One search of search_many, in the calling thread: for callers running the searches on their own executor.
+        Returns (query, results, error) as search_many does.
+        Parameters:
+        query = a Query, a search term or a dict with the parameters of Query
+        pages = number of pages retrieved
+        """
+        query = Query.of(query)
+        client = self.clone()
+        client.enableException(True)
+        if query.lang is not None:
+            client.set_lang(query.lang)
+        if query.region is not None or query.lang is not None:
+            client.set_region(query.region if query.region is not None else self.__region())
+        if query.start is not None:
+            client.set_time_range(query.start, query.end)
+        if query.period is not None:
+            # a time range would take precedence over the period in the url
+            client.set_time_range('', '')
+            client.set_period(query.period)
+        error = None
+        try:
+            client.search(query.key, pages=pages)
+        except Exception as e_search:
+            error = e_search
+        return query, client.results(), error
+
+    def __region(self):
+        # the region is only kept in the Accept-Language header, 'pt-BR,pt;q=0.9'
+        language = self.headers.get('Accept-Language', '').split(',')[0]
+        return language.split('-', 1)[1] if '-' in language else None
+
+    async def async_search(self, key, pages=1, concurrency=4, executor=None):
         """
-        Searches for a term in google.com in the news section and retrieves the first page into __results.
+        Same as search(), but awaitable: the pages are downloaded and parsed concurrently without blocking the event loop.
         Parameters:
         key = the search term
+        pages = number of pages to be retrieved, starting from the first one
+        concurrency = maximum number of pages being downloaded at the same time
+        executor = concurrent.futures executor doing the downloads, None for the event loop's default one
         """
+        import asyncio
+        self.__set_key(key)
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(url):
+            async with semaphore:
+                return await loop.run_in_executor(executor, self.__fetch_items, url)
+
+        urls = [self.__page_url(page) for page in range(1, pages + 1)]
+        downloads = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+        for url, download in zip(urls, downloads):
+            self.url = url
+            if isinstance(download, Exception):
+                self.__handle_error(download)
+                continue
+            self.page, items = download
+            self.__results.extend(items)
+
+    def __set_key(self, key):
         self.__key = key
         if self.__encode != "":
-            self.__key = urllib.request.quote(self.__key.encode(self.__encode))
-        self.get_page()
+            self.__key = quote(self.__key.encode(self.__encode))
 
-    def build_response(self):
-        self.req = urllib.request.Request(self.url.replace("search?","search?hl="+self.__lang+"&gl="+self.__lang+"&"), headers=self.headers)
-        self.response = urllib.request.urlopen(self.req)
-        self.page = self.response.read()
-        self.content = Soup(self.page, "html.parser")
-        stats = self.content.find_all("div", id="result-stats")
-        if stats and isinstance(stats, ResultSet):
-            stats = re.search(r'[\d,]+', stats[0].text)
-            self.__totalcount = int(stats.group().replace(',', ''))
+    def __page_url(self, page=1):
+        try:
+            if self.__start != "" and self.__end != "":
+                return "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},cdr:1,cd_min:{},cd_max:{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__start,self.__end,(10 * (page - 1)))
+            elif self.__period != "":
+                return "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},qdr:{},,sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__period,(10 * (page - 1)))
+            else:
+                return "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,(10 * (page - 1)))
+        except AttributeError:
+            raise AttributeError("You need to run a search() before using get_page().")
+
+    def __fetch(self, url):
+        """Downloads a google.com search page. Safe to call from worker threads."""
+        return self.__download(url.replace("search?","search?hl="+self.__lang+"&gl="+self.__lang+"&"))
+
+    def __fetch_items(self, url, plan=None):
+        """Downloads and parses a page, returns (page, results) without storing them."""
+        page = self.__fetch(url)
+        return page, self.__page_items(page, plan, url)
+
+    def __download(self, url):
+        """Returns the page at url, from the cache when there is a fresh copy."""
+        if self.cache is None:
+            return self.__request(url)
+        # the url holds the key, lang, period, time range, topic/section and page; the region is in the headers
+        key = '{} {}'.format(url, self.headers.get('Accept-Language', ''))
+        if self.observer is None:
+            page = self.cache.get(key)
         else:
+            started = time.perf_counter()
+            page = self.cache.get(key)
+            self.observer.phase('cache', time.perf_counter() - started)
+        if page is None:
+            page = self.__request(url)
+            self.cache.set(key, page)
+        return page
+
+    def __request(self, url):
+        """
+        Downloads url through the transport, paced by the rate limiter when the transport goes to the network.
+        Raises BlockedError when google throttles the request or answers with its captcha page.
+        """
+        host = urlsplit(url).hostname
+        limiter = self.rate_limiter if self.transport.rate_limited else None
+        observer = self.observer
+        if limiter is not None:
+            if observer is None:
+                limiter.acquire(host)
+            else:
+                started = time.perf_counter()
+                limiter.acquire(host)
+                observer.phase('wait', time.perf_counter() - started)
+        try:
+            if observer is None:
+                page = self.transport.fetch(url, self.headers)
+            else:
+                started = time.perf_counter()
+                try:
+                    page = self.transport.fetch(url, self.headers)
+                finally:
+                    observer.phase('request', time.perf_counter() - started)
+        except Exception as e_fetch:
+            status = getattr(e_fetch, 'code', None)
+            if status not in THROTTLE_STATUSES:
+                raise
+            pause = limiter.throttled(host, retry_after(e_fetch)) if limiter is not None else retry_after(e_fetch)
+            raise BlockedError('{} answered {} to {}'.format(host, status, url), host, pause) from e_fetch
+        if is_block_page(page):
+            pause = limiter.throttled(host) if limiter is not None else None
+            raise BlockedError('{} answered with its captcha page to {}'.format(host, url), host, pause)
+        if limiter is not None:
+            limiter.succeeded(host)
+        return page
+
+    def __handle_error(self, error):
+        print(error)
+        if self.observer is not None:
+            self.observer.error(error)
+        # a block is raised even without enableException(), or it would look like a search without results
+        if isinstance(error, BlockedError):
+            raise error
+        if self.__exception:
+            raise Exception(error)
+
+    def build_response(self):
+        self.page = self.__fetch(self.url)
+        return self.__parse_response()
+
+    def __parse_response(self):
+        return self.__result_nodes(self.page)
+
+    def __result_nodes(self, page):
+        started = time.perf_counter() if self.observer is not None else None
+        self.__totalcount = html_parser.total_count(page)
+        if self.__totalcount is None:
             #TODO might want to add output for user to know no data was found
-            self.__totalcount = None
             logging.debug('Total count is not available when sort by date')
-        result = self.content.find_all("a",attrs={'data-ved': True})
-        return result
+        nodes = html_parser.search_items(page, self.__parser)
+        if started is not None:
+            self.observer.phase('parse', time.perf_counter() - started)
+        return nodes
+
+    def __page_items(self, page, plan=None, url=None, parsing=None):
+        """
+        Parses a downloaded google.com page into its results, reporting the page to the observer.
+        parsing is the page already submitted to the parse pool, see __submit_parse.
+        """
+        if self.parse_pool is not None:
+            return self.__pooled_items(page, plan, url, parsing)
+        if self.observer is None:
+            return self.__parse_items(self.__result_nodes(page), plan)
+        started = time.perf_counter()
+        plan = plan if plan is not None else search_plan()
+        items = self.__parse_items(self.__result_nodes(page), plan)
+        # links google adds around the results come out without a title, they are not counted
+        self.observer.page(url if url is not None else getattr(self, 'url', None), time.perf_counter() - started,
+                           sum(1 for item in items if item.title), plan.rejected)
+        return items
 
     def remove_after_last_fullstop(self, s):
-        # Find the last occurrence of the full stop
-        last_period_index = s.rfind('.')
-        # Slice the string up to the last full stop
-        return s[:last_period_index+1] if last_period_index != -1 else s
-    
+        return cut_after_last_fullstop(s)
+
+    def __parse_items(self, result, plan=None):
+        plan = plan if plan is not None else search_plan()
+        accept = SearchAccept(self.__link_filter, self.__media_filter) if self.__filtered() else None
+        observer = self.observer
+        if observer is None:
+            return self.__items(parse_search_rows(result, plan, self.__lang, accept), plan)
+        # the dates are timed apart, what is left is the extraction
+        started, stats = time.perf_counter(), {}
+        items = self.__items(parse_search_rows(result, plan, self.__lang, accept, stats), plan)
+        observer.phase('extract', time.perf_counter() - started - stats['dates'])
+        observer.phase('dates', stats['dates'])
+        self.__report_missing(observer, stats['missing'])
+        return items
+
+    def __items(self, rows, plan=None):
+        """
+        NewsItems of the rows of a page, without the ones the dedup index already has, counted in plan.duplicates.
+        Stores the others in the archive.
+        """
+        items = []
+        for row in rows:
+            item = NewsItem(*row)
+            item.canonical = canonical_url(item.link)
+            items.append(item)
+        if self.__dedup is not None:
+            kept = [item for item in items if self.__dedup.add(item) is None]
+            if plan is not None:
+                # links google adds around the results come out without a title, they are not results
+                plan.duplicates += sum(1 for item in items if item.title) - sum(1 for item in kept if item.title)
+            items = kept
+        if self.archive is not None:
+            self.__archive_items(items)
+        return items
+
+    def __archive_items(self, items):
+        observer = self.observer
+        started = time.perf_counter() if observer is not None else None
+        self.archive.add(items, self.archive_key())
+        if observer is not None:
+            observer.phase('archive', time.perf_counter() - started)
+
+    def __submit_parse(self, page, dates=False):
+        """
+        Sends page to the parse pool. Returns the future of its rows and the SearchAccept of the filters that
+        can't be pickled, a lambda or a function defined in another one: those are applied here on the rows.
+        The filters are tried with pickle once, on the first page after set_filter().
+        dates asks the worker for the dates of every result of the page too, see parse_search_page.
+        """
+        if self.__pool_filters is None:
+            link_filter, media_filter, local = self.__link_filter, self.__media_filter, None
+            link_local, media_local = not picklable(link_filter), not picklable(media_filter)
+            if link_local or media_local:
+                local = SearchAccept(link_filter if link_local else None, media_filter if media_local else None)
+                link_filter = None if link_local else link_filter
+                media_filter = None if media_local else media_filter
+            self.__pool_filters = (link_filter, media_filter, local)
+        link_filter, media_filter, local = self.__pool_filters
+        future = self.parse_pool.submit(parse_search_page, page, self.__parser, self.__lang,
+                                        link_filter, media_filter, self.observer is not None, dates)
+        return future, local
+
+    def __pooled_items(self, page, plan=None, url=None, parsing=None):
+        """Parses page in the parse pool, same as __page_items."""
+        observer = self.observer
+        started = time.perf_counter() if observer is not None else None
+        if parsing is None:
+            parsing = self.__submit_parse(page, plan is not None and plan.rejected_dates is not None)
+        future, local = parsing
+        total, rejected, rows, stats, dates = future.result()
+        if local is not None:
+            accepted = [row for row in rows if local(row[5], row[1])]
+            rejected += len(rows) - len(accepted)
+            rows = accepted
+        self.__totalcount = total
+        if plan is not None:
+            plan.rejected += rejected
+            plan.dates = dates
+        items = self.__items(rows, plan)
+        if observer is not None:
+            for phase in ('parse', 'extract', 'dates'):
+                observer.phase(phase, stats[phase])
+            self.__report_missing(observer, stats['missing'])
+            observer.page(url if url is not None else getattr(self, 'url', None), time.perf_counter() - started,
+                          sum(1 for item in items if item.title), rejected)
+        return items
+
+    @staticmethod
+    def __report_missing(observer, missing):
+        for field, count in missing.items():
+            if count:
+                observer.missing(field, count)
+
+    def __filtered(self):
+        return self.__link_filter is not None or self.__media_filter is not None
+
+    def __accept(self, link, media):
+        return ((self.__link_filter is None or self.__link_filter(link)) and
+                (self.__media_filter is None or self.__media_filter(media)))
+
+    def __accept_news(self, href, media):
+        if href is None:
+            # the link may still come from jslog, it is checked once built
+            return self.__media_filter is None or self.__media_filter(media)
+        return self.__accept('https://news.google.com/' + href[2:], media)
+
+    def __store_download(self, url, download, parsing=None):
+        """Parses a page downloaded in the background into __results, or reports its download error."""
+        self.url = url
+        if isinstance(download, Exception):
+            self.__handle_error(download)
+            return
+        self.page = download
+        try:
+            self.__results.extend(self.__page_items(download, url=url, parsing=parsing))
+        except Exception as e_parser:
+            self.__handle_error(e_parser)
+
     def page_at(self, page=1):
         """
-        Retrieves a specific page from google.com in the news sections into __results.
+        Retrieves a specific page from google.com in the news sections and returns its results.
         Parameter:
         page = number of the page to be retrieved
         """
+        self.url = self.__page_url(page)
         results = []
         try:
-            if self.__start != "" and self.__end != "":
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},cdr:1,cd_min:{},cd_max:{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__start,self.__end,(10 * (page - 1)))
-            elif self.__period != "":
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},qdr:{},,sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__period,(10 * (page - 1))) 
-            else:
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,(10 * (page - 1))) 
-        except AttributeError:
-            raise AttributeError("You need to run a search() before using get_page().")
-        try:
-            result = self.build_response()
-            for item in result:
-                try:
-                    tmp_text = item.find("h3").text.replace("\n","")
-                except Exception:
-                    tmp_text = ''
-                try:
-                    tmp_link = item.get("href").replace('/url?esrc=s&q=&rct=j&sa=U&url=','')
-                except Exception:
-                    tmp_link = ''
-                try:
-                    tmp_media = item.find('div').find('div').find('div').find_next_sibling('div').text
-                except Exception:
-                    tmp_media = ''
-                try:
-                    tmp_date = item.find('div').find_next_sibling('div').find('span').text
-                    tmp_date,tmp_datetime=lexical_date_parser(tmp_date)
-                except Exception:
-                    tmp_date = ''
-                    tmp_datetime=None
-                try:
-                    tmp_desc = self.remove_after_last_fullstop(item.find('div').find_next_sibling('div').find('div').find_next_sibling('div').find('div').find('div').find('div').text).replace('\n','')
-                except Exception:
-                    tmp_desc = ''
-                try:
-                    tmp_img = item.find("img").get("src")
-                except Exception:
-                    tmp_img = ''
-                self.__texts.append(tmp_text)
-                self.__links.append(tmp_link)
-                results.append({'title': tmp_text, 'media': tmp_media,'date': tmp_date,'datetime':define_date(tmp_date),'desc': tmp_desc, 'link': tmp_link,'img': tmp_img})
-            self.response.close()
+            self.page = self.__fetch(self.url)
+            results = self.__page_items(self.page, url=self.url)
         except Exception as e_parser:
-            print(e_parser)
-            if self.__exception:
-                raise Exception(e_parser)
-            else:
-                pass
+            self.__handle_error(e_parser)
         return results
 
     def get_page(self, page=1):
@@ -223,67 +759,213 @@ class GoogleNews:
         Parameter:
         page = number of the page to be retrieved 
         """
-        try:
-            if self.__start != "" and self.__end != "":
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},cdr:1,cd_min:{},cd_max:{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__start,self.__end,(10 * (page - 1)))
-            elif self.__period != "":
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},qdr:{},,sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,self.__period,(10 * (page - 1))) 
-            else:
-                self.url = "https://www.google.com/search?q={}&lr=lang_{}&biw=1920&bih=976&source=lnt&&tbs=lr:lang_1{},sbd:1&tbm=nws&start={}".format(self.__key,self.__lang,self.__lang,(10 * (page - 1))) 
-        except AttributeError:
-            raise AttributeError("You need to run a search() before using get_page().")
-        try:
-            result = self.build_response()
-            for item in result:
+        self.__results.extend(self.page_at(page))
+
+    def get_pages(self, pages, concurrency=1):
+        """
+        Retrieves several pages from google.com in the news sections into __results.
+        The pages are downloaded in parallel, but stored in the order they were requested.
+        With a parse pool, each page goes to the pool as soon as it is downloaded and the pages are parsed in parallel too.
+        Parameters:
+        pages = iterable with the numbers of the pages to be retrieved
+        concurrency = number of pages downloaded in parallel
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        urls = [self.__page_url(page) for page in pages]
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [executor.submit(self.__fetch, url) for url in urls]
+            downloads = []
+            for url, future in zip(urls, futures):
                 try:
-                    tmp_text = item.find("h3").text.replace("\n","")
-                except Exception:
-                    tmp_text = ''
+                    download = future.result()
+                except Exception as e_fetch:
+                    download = e_fetch
+                if self.parse_pool is None:
+                    self.__store_download(url, download)
+                    continue
                 try:
-                    tmp_link = item.get("href").replace('/url?esrc=s&q=&rct=j&sa=U&url=','')
-                except Exception:
-                    tmp_link = ''
+                    parsing = self.__submit_parse(download) if not isinstance(download, Exception) else None
+                except Exception as e_pool:
+                    download, parsing = e_pool, None
+                downloads.append((url, download, parsing))
+            for url, download, parsing in downloads:
+                self.__store_download(url, download, parsing)
+
+    def fetch_until(self, cutoff, max_pages=10, key=None, prefetch=True, first=1):
+        """
+        Retrieves pages from google.com in the news section into __results, from the first one, until a page
+        whose oldest result is older than cutoff, an empty page or max_pages. Results older than cutoff are left out.
+        The oldest result of a page is looked for among all its results, the ones the filters reject included;
+        search_archived goes on from the dates of all of them.
+        While a page is parsed the next one is already being downloaded; it is thrown away when the page parsed is the last.
+        Returns the number of pages retrieved.
+        Parameters:
+        cutoff = datetime, results older than it are not wanted
+        max_pages = last page to be retrieved
+        key = the search term, None to go on with the one of the last search
+        prefetch = download the next page while parsing the current one
+        first = page to start from, when the newer ones were retrieved before
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        if key is not None:
+            self.__set_key(key)
+        self.__complete = False
+        self.__page_dates = []
+        executor = ThreadPoolExecutor(max_workers=1)
+        pending = None
+        try:
+            pending = executor.submit(self.__fetch, self.__page_url(first))
+            page = first
+            while True:
+                self.url = self.__page_url(page)
                 try:
-                    tmp_media = item.find('div').find('div').find('div').find_next_sibling('div').text
-                except Exception:
-                    tmp_media = ''
+                    self.page = pending.result()
+                except Exception as e_fetch:
+                    self.__handle_error(e_fetch)
+                    return page - first
+                pending = None
+                if prefetch and page < max_pages:
+                    pending = executor.submit(self.__fetch, self.__page_url(page + 1))
+                plan = search_plan(dates=True)
                 try:
-                    tmp_date = item.find('div').find_next_sibling('div').find('span').text
-                    tmp_date,tmp_datetime=lexical_date_parser(tmp_date)
-                except Exception:
-                    tmp_date = ''
-                    tmp_datetime=None
+                    items = self.__page_items(self.page, plan, self.url)
+                except Exception as e_parser:
+                    self.__handle_error(e_parser)
+                    return page - first + 1
+                self.__results.extend(item for item in items
+                                      if not (isinstance(item.datetime, datetime.datetime) and item.datetime < cutoff))
+                dated = plan.dates
+                self.__page_dates.extend(dated)
+                empty = not (plan.rejected or plan.duplicates or any(item.title for item in items))
+                self.__complete = empty or bool(dated and min(dated) < cutoff)
+                if self.__complete or page >= max_pages:
+                    return page - first + 1
+                if pending is None:
+                    pending = executor.submit(self.__fetch, self.__page_url(page + 1))
+                page += 1
+        finally:
+            # a page prefetched for nothing is dropped if it has not started yet, otherwise it finishes
+            # in the background and goes to the cache when there is one
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_results(self, key, max_pages=None, until=None, buffer=2, sink=None):
+        """
+        Searches for a term in google.com in the news section and yields the results page after page,
+        without keeping them in __results. The next pages are downloaded in the background while the
+        current one is consumed, holding at most `buffer` parsed pages in memory.
+        Parameters:
+        key = the search term
+        max_pages = last page to be retrieved, None to go on until an empty page
+        until = datetime, stops at the first result older than it (google returns them sorted by date)
+        buffer = number of parsed pages waiting to be consumed
+        sink = function called with each result before it is yielded
+        """
+        import queue
+        import threading
+        self.__set_key(key)
+        pages = queue.Queue(maxsize=max(1, buffer))
+        stop = threading.Event()
+
+        def put(entry):
+            while not stop.is_set():
                 try:
-                    tmp_desc = self.remove_after_last_fullstop(item.find('div').find_next_sibling('div').find('div').find_next_sibling('div').find('div').find('div').find('div').text).replace('\n','')
-                except Exception:
-                    tmp_desc = ''
+                    pages.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            page = 1
+            while max_pages is None or page <= max_pages:
+                url = self.__page_url(page)
+                plan = search_plan()
                 try:
-                    tmp_img = item.find("img").get("src")
-                except Exception:
-                    tmp_img = ''
-                self.__texts.append(tmp_text)
-                self.__links.append(tmp_link)
-                self.__results.append({'title': tmp_text, 'media': tmp_media,'date': tmp_date,'datetime':define_date(tmp_date),'desc': tmp_desc, 'link': tmp_link,'img': tmp_img})
-            self.response.close()
-        except Exception as e_parser:
-            print(e_parser)
-            if self.__exception:
-                raise Exception(e_parser)
-            else:
-                pass
+                    entry = (url, self.__fetch_items(url, plan)[1])
+                except Exception as e_fetch:
+                    entry = (url, e_fetch)
+                # a page whose results were all filtered out or duplicates is not the last one
+                if (not put(entry) or isinstance(entry[1], Exception) or
+                        not (plan.rejected or plan.duplicates or any(item.title for item in entry[1]))):
+                    break
+                page += 1
+            put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                entry = pages.get()
+                if entry is None:
+                    return
+                self.url, items = entry
+                if isinstance(items, Exception):
+                    self.__handle_error(items)
+                    return
+                for item in items:
+                    if until is not None and isinstance(item.datetime, datetime.datetime) and item.datetime < until:
+                        return
+                    if sink is not None:
+                        sink(item)
+                    yield item
+        finally:
+            stop.set()
+
+    def poll(self, key, store, pages=5, name=None):
+        """
+        Searches for key and returns only the results the previous polls of the same search have not seen,
+        also adding them to __results. google sorts the results by date, so the pages are retrieved one at a
+        time and the poll stops at the first page reaching results seen before, or older than the newest one seen
+        (among all the results of the page, the ones the filters reject included): most polls cost one request.
+        When a page fails, the watermark is left as it was, so the results of that poll come back next time.
+        Parameters:
+        key = the search term
+        store = WatermarkStore keeping what each search has seen
+        pages = maximum number of pages retrieved
+        name = key of the search in store, by default the term with the language, region and period
+        """
+        self.__set_key(key)
+        if name is None:
+            name = '{} {} {} {}'.format(key, self.__lang, self.headers.get('Accept-Language', ''), self.__period)
+        mark = store.get(name) or Watermark()
+        new = []
+        for page in range(1, pages + 1):
+            self.url = self.__page_url(page)
+            plan = search_plan(dates=True)
+            try:
+                self.page, items = self.__fetch_items(self.url, plan)
+            except Exception as e_fetch:
+                self.__handle_error(e_fetch)
+                return new
+            items = [item for item in items if item.title and item.link]
+            if not items and not plan.rejected and not plan.duplicates:
+                break
+            fresh = [item for item in items if not mark.seen(item.link)]
+            new.extend(fresh)
+            self.__results.extend(fresh)
+            # this page reached what the previous polls covered, the next ones are older still
+            if len(fresh) < len(items) or (mark.newest is not None and plan.dates and min(plan.dates) < mark.newest):
+                break
+        if new:
+            mark.add(new)
+            store.set(name, mark)
+        return new
 
     def getpage(self, page=1):
         """Don't remove this, will affect old version user when upgrade"""
         self.get_page(page)
 
     def get_news(self, key="",deamplify=False):
+        from dateutil.parser import parse
         if key != '':
             if self.__period != "":
                 key += f" when:{self.__period}"
         else:
             if self.__period != "":
                 key += f"when:{self.__period}"
-        key = urllib.request.quote(key.encode(self.__encode))
+        key = quote(key.encode(self.__encode))
         start = f'{self.__start[-4:]}-{self.__start[:2]}-{self.__start[3:5]}'
         end = f'{self.__end[-4:]}-{self.__end[:2]}-{self.__end[3:5]}'
         
@@ -304,134 +986,100 @@ class GoogleNews:
                 
             
         try:
-            self.req = urllib.request.Request(self.url, headers=self.headers)
-            self.response = urllib.request.urlopen(self.req)
-            self.page = self.response.read()
-            self.content = Soup(self.page, "html.parser")
-            articles = self.content.select('article')
+            self.page = self.__download(self.url)
+            observer = self.observer
+            if observer is not None:
+                started = time.perf_counter()
+            articles = html_parser.news_items(self.page, self.__parser)
+            if observer is not None:
+                parsed = time.perf_counter()
+                observer.phase('parse', parsed - started)
+                kept, missing = len(self.__results), dict.fromkeys(FIELDS, 0)
+            plan = news_plan()
+            accept = self.__accept_news if self.__filtered() else None
             for article in articles:
-                try:
-                    # title
-                    try:
-                        title=article.findAll('div')[2].findAll('a')[0].text
-                    except:
-                        try:
-                            title=article.findAll('a')[1].text
-                        except:
-                            title=None
-                    # description
-                    try:
-                        desc=None
-                    except:
-                        desc=None
-                    # date
-                    try:
-                        date = article.find("time").text
-                        # date,datetime_tmp = lexial_date_parser(date)
-                    except:
-                        date = None
-                    # datetime
-                    try:
-                        datetime_chars=article.find('time').get('datetime')
-                        datetime_obj = parse(datetime_chars).replace(tzinfo=None)
-                    except:
-                        datetime_obj=None
-                    # link
-                    if deamplify:
-                        try:
-                            link = 'https://news.google.com/' + article.find('div').find("a").get("href")[2:]
-                        except Exception as deamp_e:
-                            print(deamp_e)
-                            link = article.find("article").get("jslog").split('2:')[1].split(';')[0]
-                    else:
-                        try:
-                            link = 'https://news.google.com/' + article.find('div').find("a").get("href")[2:]
-                        except Exception as deamp_e:
-                            print(deamp_e)
-                            link = None
-                    self.__texts.append(title)
-                    self.__links.append(link)
-                    if link.startswith('https://www.youtube.com/watch?v='):
-                        desc = 'video'
-                    # image
-                    try:
-                        img = 'https://news.google.com'+article.find("figure").find("img").get("src")
-                    except:
-                        img = None
-                    # site
-                    try:
-                        site=article.find("time").parent.find("a").text
-                    except:
-                        site=None
-                    try:
-                        media=article.find("div").findAll("div")[1].find("div").find("div").find("div").text
-                    except:
-                        try:
-                            media=article.findAll("div")[1].find("div").find("div").find("div").text
-                        except:
-                            media=None
-                    # reporter
+                fields = plan.extract(article, accept)
+                if fields is REJECTED:
+                    continue
+                title, href, media, date, datetime_chars, site, reporter, src, jslog = fields
+                if href is not None:
+                    link = 'https://news.google.com/' + href[2:]
+                elif deamplify and jslog is not None and '2:' in jslog:
+                    link = jslog.split('2:')[1].split(';')[0]
+                    if self.__link_filter is not None and not self.__link_filter(link):
+                        continue
+                else:
+                    logging.debug('GoogleNews: article without a link skipped: %r', title)
+                    continue
+                datetime_obj = None
+                if datetime_chars is not None:
                     try:
-                        reporter = article.findAll('span')[2].text
-                    except:
-                        reporter = None
-                    # collection
-                    self.__results.append({'title':title,
-                                           'desc':desc,
-                                           'date':date,
-                                           'datetime':define_date(date),
-                                           'link':link,
-                                           'img':img,
-                                           'media':media,
-                                           'site':site,
-                                           'reporter':reporter})
-                except Exception as e_article:
-                    print(e_article)
-            self.response.close()
+                        datetime_obj = parse(datetime_chars).astimezone().replace(tzinfo=None)
+                    except (ValueError, OverflowError):
+                        datetime_obj = None
+                # collection
+                item = NewsItem(title=title,
+                                desc='video' if link.startswith('https://www.youtube.com/watch?v=') else None,
+                                date=date,
+                                datetime=datetime_obj if datetime_obj is not None else define_date(date, self.__lang),
+                                link=link,
+                                img='https://news.google.com'+src if src is not None else None,
+                                media=media,
+                                site=site,
+                                reporter=reporter)
+                item.canonical = canonical_url(link)
+                if observer is not None:
+                    for field in ('title', 'media', 'date'):
+                        if getattr(item, field) is None:
+                            missing[field] += 1
+                    if date is not None and not isinstance(item.datetime, datetime.datetime):
+                        missing['datetime'] += 1
+                if self.__dedup is not None and self.__dedup.add(item) is not None:
+                    continue
+                self.__results.append(item)
+            if observer is not None:
+                # the dates of news.google.com are read with the fields, they are timed as extraction
+                done = time.perf_counter()
+                observer.phase('extract', done - parsed)
+                self.__report_missing(observer, missing)
+                observer.page(self.url, done - started, len(self.__results) - kept, plan.rejected)
         except Exception as e_parser:
-            print(e_parser)
-            if self.__exception:
-                raise Exception(e_parser)
-            else:
-                pass
+            self.__handle_error(e_parser)
 
     def total_count(self):
         return self.__totalcount
 
-    def result(self,sort=False):
+    def cache_stats(self):
+        """Returns the hits, misses, evictions and size of the cache, None without a cache."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def result(self,sort=False,limit=None):
         """Don't remove this, will affect old version user when upgrade"""
-        return self.results(sort)
+        return self.results(sort, limit)
 
-    def results(self,sort=False):
+    def results(self,sort=False,limit=None):
         """Returns the __results.
-        New feature: include datatime and sort the articles in decreasing order"""
-        results=self.__results
+        Parameters:
+        sort = newest first, by the timestamp of each result; results without a known date go last
+        limit = only the first limit results; with sort they are picked with a heap, __results keeps its order"""
+        if sort and limit is not None:
+            return newest(self.__results, limit)
         if sort:
-            try:
-                results.sort(key = lambda x:x['datetime'],reverse=True)
-            except Exception as e_sort:
-                print(e_sort)
-                if self.__exception:
-                    raise Exception(e_sort)
-                else:
-                    pass
-                results=self.__results
-        return results
+            self.__results.sort(key=lambda item: item.timestamp, reverse=True)
+        return self.__results if limit is None else self.__results[:limit]
 
     def get_texts(self):
-        """Returns only the __texts of the __results."""
-        return self.__texts
+        """Returns only the titles of the __results, as a read-only list view."""
+        return FieldView(self.__results, 'title')
 
     def gettext(self):
         """Don't remove this, will affect old version user when upgrade"""
         return self.get_texts()
 
     def get_links(self):
-        """Returns only the __links of the __results."""
-        return self.__links
+        """Returns only the links of the __results, as a read-only list view."""
+        return FieldView(self.__results, 'link')
 
     def clear(self):
-        self.__texts = []
-        self.__links = []
         self.__results = []
         self.__totalcount = 0
@@ -0,0 +1,208 @@
+### MODULES
+import time
+from .cache import SQLiteConnections
+from .item import NewsItem, UNKNOWN_TIMESTAMP
+from .dedup import canonical_url
+from .dates import parse_iso
+
+### METHODS
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS articles (id INTEGER PRIMARY KEY, canonical TEXT NOT NULL UNIQUE,
+       title TEXT, media TEXT, date TEXT, datetime TEXT, timestamp REAL NOT NULL, desc TEXT, link TEXT, img TEXT,
+       seen REAL NOT NULL)''',
+    'CREATE INDEX IF NOT EXISTS articles_timestamp ON articles (timestamp)',
+    'CREATE INDEX IF NOT EXISTS articles_media ON articles (media COLLATE NOCASE, timestamp)',
+    # which searches returned each article
+    '''CREATE TABLE IF NOT EXISTS hits (search TEXT NOT NULL, article INTEGER NOT NULL,
+       PRIMARY KEY (search, article)) WITHOUT ROWID''',
+    # time windows each search has already retrieved, as epoch seconds
+    'CREATE TABLE IF NOT EXISTS coverage (search TEXT NOT NULL, start REAL NOT NULL, end REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS coverage_search ON coverage (search, start)',
+    # results google showed each search in the day of `end` dated at or after it, the filtered out ones included:
+    # the retrieval of the time before `end` starts on the page after them
+    '''CREATE TABLE IF NOT EXISTS offsets (search TEXT NOT NULL, end REAL NOT NULL, rows INTEGER NOT NULL,
+       PRIMARY KEY (search, end)) WITHOUT ROWID''',
+    # full text index of the titles and descriptions, kept in sync with articles by the triggers
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, desc, content='articles', content_rowid='id',
+       tokenize='unicode61 remove_diacritics 1')''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+       INSERT INTO articles_fts (rowid, title, desc) VALUES (new.id, new.title, new.desc); END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+       INSERT INTO articles_fts (articles_fts, rowid, title, desc) VALUES ('delete', old.id, old.title, old.desc); END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+       INSERT INTO articles_fts (articles_fts, rowid, title, desc) VALUES ('delete', old.id, old.title, old.desc);
+       INSERT INTO articles_fts (rowid, title, desc) VALUES (new.id, new.title, new.desc); END''',
+)
+
+# a newer parse replaces the texts, but an article keeps the first date that could be converted:
+# google shows recent dates as 'há 2 horas', older ones as '3 dias atrás', less precise
+UPSERT = '''INSERT INTO articles (canonical, title, media, date, datetime, timestamp, desc, link, img, seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (canonical) DO UPDATE SET title = excluded.title, media = excluded.media, desc = excluded.desc,
+            link = excluded.link, img = coalesce(excluded.img, articles.img),
+            date = CASE WHEN articles.datetime IS NULL THEN excluded.date ELSE articles.date END,
+            timestamp = CASE WHEN articles.datetime IS NULL THEN excluded.timestamp ELSE articles.timestamp END,
+            datetime = coalesce(articles.datetime, excluded.datetime)'''
+
+COLUMNS = 'a.canonical, a.title, a.media, a.date, a.datetime, a.desc, a.link, a.img'
+
+# the date text of a dated article is written from its datetime when read: the text google showed, 'há 2 horas',
+# was only true when it was scraped
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def fts_query(text):
+    """FTS5 query matching the texts that have every word of text, in any order; the words are quoted, not parsed."""
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in (text or '').split())
+
+
+def uncovered(windows, start, end, min_gap=0):
+    """
+    Parts of [start, end] outside the (start, end) windows, newest first. Gaps shorter than min_gap seconds
+    are left out: a window retrieved a moment ago is recent enough.
+    """
+    gaps, cursor = [], start
+    for window_start, window_end in sorted(windows):
+        if window_end <= cursor:
+            continue
+        if window_start >= end:
+            break
+        if window_start > cursor:
+            gaps.append((cursor, window_start))
+        cursor = max(cursor, window_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return [(gap_start, gap_end) for gap_start, gap_end in reversed(gaps) if gap_end - gap_start >= min_gap]
+
+### CLASSEs
+
+class SQLiteArchive:
+    """
+    Every search result GoogleNews retrieved, kept in a SQLite file: one row per article, keyed by its canonical
+    link, with a full text index of the titles and descriptions and indexes on the date and the media.
+    The archive also remembers which time windows each search already retrieved, so GoogleNews.search_archived()
+    only asks google for the part of a window it has not seen. Shared by the threads and processes on the host.
+    Parameters:
+    path = the database file, created when missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.__connection = SQLiteConnections(path)
+        with self.__connection() as db:
+            for statement in SCHEMA:
+                db.execute(statement)
+
+    def add(self, items, search=None):
+        """
+        Stores items, NewsItems, updating the ones already archived. Results without a link or a title are left out.
+        A result without a known date is archived at the time it was first seen.
+        Parameters:
+        search = key of the search that returned them, see GoogleNews.archive_key()
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            link = item.canonical or canonical_url(item.link)
+            if not link or not item.title:
+                continue
+            dated = item.timestamp != UNKNOWN_TIMESTAMP
+            rows.append((link, item.title, item.media, item.date, item.datetime.isoformat() if dated else None,
+                         item.timestamp if dated else now, item.desc, item.link, item.img, now))
+        if not rows:
+            return 0
+        with self.__connection() as db:
+            db.executemany(UPSERT, rows)
+            if search is not None:
+                db.executemany('INSERT OR IGNORE INTO hits (search, article) SELECT ?, id FROM articles WHERE canonical = ?',
+                               [(search, row[0]) for row in rows])
+        return len(rows)
+
+    def cover(self, search, start, end):
+        """Records that search retrieved every result between the epoch seconds start and end."""
+        with self.__connection() as db:
+            # the windows touching this one are merged into it, each search keeps a few disjoint windows
+            merged = db.execute('SELECT min(start), max(end) FROM coverage WHERE search = ? AND start <= ? AND end >= ?',
+                                (search, end, start)).fetchone()
+            start = min(start, merged[0]) if merged[0] is not None else start
+            end = max(end, merged[1]) if merged[1] is not None else end
+            db.execute('DELETE FROM coverage WHERE search = ? AND start <= ? AND end >= ?', (search, end, start))
+            db.execute('INSERT INTO coverage (search, start, end) VALUES (?, ?, ?)', (search, start, end))
+            # a retrieval only starts at the start of a window
+            db.execute('DELETE FROM offsets WHERE search = ? AND end > ? AND end <= ?', (search, start, end))
+
+    def offset(self, search, end):
+        """Results google showed search in the day of the epoch seconds end, dated at or after it; 0 if unknown."""
+        row = self.__connection().execute('SELECT rows FROM offsets WHERE search = ? AND end = ?', (search, end)).fetchone()
+        return row[0] if row is not None else 0
+
+    def set_offset(self, search, end, rows):
+        """Records that google showed search rows results in the day of the epoch seconds end, dated at or after it."""
+        with self.__connection() as db:
+            db.execute('INSERT OR REPLACE INTO offsets (search, end, rows) VALUES (?, ?, ?)', (search, end, rows))
+
+    def gaps(self, search, start, end, min_gap=0):
+        """Windows of [start, end], epoch seconds, that search has not retrieved yet, newest first; see uncovered()."""
+        windows = self.__connection().execute('SELECT start, end FROM coverage WHERE search = ? AND start < ? AND end > ?',
+                                              (search, end, start)).fetchall()
+        return uncovered(windows, start, end, min_gap)
+
+    def results(self, search, start, end=None, media=None, limit=None):
+        """
+        NewsItems search returned dated between the epoch seconds start and end, newest first.
+        Parameters:
+        media = only the results of this media, ignoring case
+        limit = at most this many results
+        """
+        sql = ('SELECT ' + COLUMNS + ' FROM hits h JOIN articles a ON a.id = h.article WHERE h.search = ? AND a.timestamp >= ?')
+        return self.__select(sql, [search, start], end, media, limit)
+
+    def match(self, text, start=None, end=None, media=None, limit=50):
+        """
+        NewsItems whose title or description has every word of text, newest first, from any search.
+        The words are matched without accents or case: 'inteligencia' finds 'Inteligência'.
+        Parameters:
+        start, end = only the results dated in this window, epoch seconds
+        media = only the results of this media, ignoring case
+        limit = at most this many results
+        """
+        sql = ('SELECT ' + COLUMNS + ' FROM articles_fts f JOIN articles a ON a.id = f.rowid '
+               'WHERE articles_fts MATCH ? AND a.timestamp >= ?')
+        return self.__select(sql, [fts_query(text), start if start is not None else float('-inf')], end, media, limit)
+
+    def __select(self, sql, params, end, media, limit):
+        if end is not None:
+            sql += ' AND a.timestamp <= ?'
+            params.append(end)
+        if media:
+            sql += ' AND a.media = ? COLLATE NOCASE'
+            params.append(media)
+        sql += ' ORDER BY a.timestamp DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [self.__item(row) for row in self.__connection().execute(sql, params)]
+
+    @staticmethod
+    def __item(row):
+        canonical, title, media, date, stamp, desc, link, img = row
+        if stamp:
+            stamp = parse_iso(stamp)
+            date = stamp.strftime(DATE_FORMAT)
+        item = NewsItem(title, media, date, stamp if stamp else float('nan'), desc, link, img)
+        item.canonical = canonical
+        return item
+
+    def prune(self, before):
+        """Forgets the articles dated before the epoch seconds before, and the coverage of that time."""
+        with self.__connection() as db:
+            db.execute('DELETE FROM hits WHERE article IN (SELECT id FROM articles WHERE timestamp < ?)', (before,))
+            removed = db.execute('DELETE FROM articles WHERE timestamp < ?', (before,)).rowcount
+            db.execute('DELETE FROM coverage WHERE end < ?', (before,))
+            db.execute('DELETE FROM offsets WHERE end < ?', (before,))
+            db.execute('UPDATE coverage SET start = ? WHERE start < ?', (before, before))
+        return removed
+
+    def __len__(self):
+        return self.__connection().execute('SELECT COUNT(*) FROM articles').fetchone()[0]
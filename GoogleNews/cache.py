@@ -0,0 +1,157 @@
+### MODULES
+import time
+import threading
+from collections import OrderedDict
+
+### CLASSEs
+
+class SQLiteConnections:
+    """
+    Called, returns the connection of the calling thread to the SQLite file path, opened on its first call:
+    sqlite3 connections can't be shared between threads. Used by the SQLite cache, watermark store and archive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.__local = threading.local()
+
+    def __call__(self):
+        db = getattr(self.__local, 'db', None)
+        if db is None:
+            import sqlite3
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            self.__local.db = db
+        return db
+
+
+class Cache:
+    """
+    Interface for the page caches used by GoogleNews.
+    Keys are strings identifying a request, values are the downloaded pages as bytes.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached value, or None when it is missing or expired."""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self)}
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    """
+    In-process LRU cache with a time to live.
+    Parameters:
+    ttl = seconds an entry stays valid
+    maxsize = maximum number of entries
+    max_bytes = maximum total size of the values
+    """
+
+    def __init__(self, ttl=300, maxsize=256, max_bytes=64 * 1024 * 1024):
+        super().__init__()
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def _get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                self.__remove(key)
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (time.monotonic() + self.ttl, value)
+            self.__bytes += len(value)
+            while len(self.__entries) > self.maxsize or self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def __remove(self, key):
+        expires, value = self.__entries.pop(key)
+        self.__bytes -= len(value)
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class SQLiteCache(Cache):
+    """
+    Cache kept in a SQLite file, so several processes on the same host (uvicorn workers, cron jobs) share it.
+    Parameters:
+    path = the database file, created when missing
+    ttl = seconds an entry stays valid
+    maxsize = maximum number of entries, the oldest ones are dropped first
+    """
+
+    def __init__(self, path, ttl=300, maxsize=10000):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.__connection = SQLiteConnections(path)
+        with self.__connection() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS pages_expires ON pages (expires)')
+
+    def _get(self, key):
+        row = self.__connection().execute('SELECT value FROM pages WHERE key = ? AND expires >= ?', (key, time.time())).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def set(self, key, value):
+        with self.__connection() as db:
+            db.execute('INSERT OR REPLACE INTO pages (key, value, expires) VALUES (?, ?, ?)', (key, value, time.time() + self.ttl))
+            removed = db.execute('DELETE FROM pages WHERE expires < ?', (time.time(),)).rowcount
+            removed += db.execute('DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY expires DESC LIMIT -1 OFFSET ?)', (self.maxsize,)).rowcount
+        with self._stats_lock:
+            self.evictions += removed
+
+    def clear(self):
+        with self.__connection() as db:
+            db.execute('DELETE FROM pages')
+
+    def __len__(self):
+        return self.__connection().execute('SELECT COUNT(*) FROM pages').fetchone()[0]
@@ -0,0 +1,189 @@
+### MODULES
+import re
+import datetime
+from functools import lru_cache
+
+### METHODS
+
+# relative dates as google writes them, per language: (pattern, [(unit prefix, relativedelta argument)])
+RELATIVE = {
+    'en': (r'^(?:about\s+)?(\d+)\s+([a-z]+)\s+ago$',
+           [('sec', 'seconds'), ('min', 'minutes'), ('h', 'hours'), ('day', 'days'), ('week', 'weeks'), ('mo', 'months'), ('y', 'years')]),
+    'pt': (r'^(?:há\s+)?(\d+)\s+([a-zçêã]+)(?:\s+atrás)?$',
+           [('seg', 'seconds'), ('min', 'minutes'), ('hora', 'hours'), ('dia', 'days'), ('semana', 'weeks'), ('m', 'months'), ('ano', 'years')]),
+    'es': (r'^(?:hace\s+)?(\d+)\s+([a-zíñ]+)$',
+           [('seg', 'seconds'), ('min', 'minutes'), ('hora', 'hours'), ('d', 'days'), ('semana', 'weeks'), ('mes', 'months'), ('año', 'years')]),
+    'it': (r'^(\d+)\s+([a-z]+)\s+fa$',
+           [('second', 'seconds'), ('minut', 'minutes'), ('or', 'hours'), ('giorn', 'days'), ('settiman', 'weeks'), ('mes', 'months'), ('ann', 'years')]),
+    'fr': (r'^il\s+y\s+a\s+(\d+)\s+([a-z]+)$',
+           [('sec', 'seconds'), ('min', 'minutes'), ('h', 'hours'), ('j', 'days'), ('sem', 'weeks'), ('mois', 'months'), ('an', 'years')]),
+    'de': (r'^vor\s+(\d+)\s+([a-z]+)$',
+           [('sek', 'seconds'), ('min', 'minutes'), ('std', 'hours'), ('stunde', 'hours'), ('tag', 'days'), ('woche', 'weeks'), ('monat', 'months'), ('jahr', 'years')]),
+}
+RELATIVE = {lang: (re.compile(pattern), units) for lang, (pattern, units) in RELATIVE.items()}
+
+# words meaning "today" or "yesterday", as a number of days ago
+DAYS_AGO = {
+    'en': {'just now': 0, 'today': 0, 'yesterday': 1},
+    'pt': {'agora': 0, 'hoje': 0, 'ontem': 1},
+    'es': {'ahora': 0, 'hoy': 0, 'ayer': 1},
+    'it': {'ora': 0, 'oggi': 0, 'ieri': 1},
+    'fr': {"à l'instant": 0, "aujourd'hui": 0, 'hier': 1},
+    'de': {'gerade eben': 0, 'heute': 0, 'gestern': 1},
+}
+
+MONTHS = {
+    'en': ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'],
+    'pt': ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez'],
+    'es': ['ene', 'feb', 'mar', 'abr', 'may', 'jun', 'jul', 'ago', 'sep', 'oct', 'nov', 'dic'],
+    'it': ['gen', 'feb', 'mar', 'apr', 'mag', 'giu', 'lug', 'ago', 'set', 'ott', 'nov', 'dic'],
+    'fr': ['jan', 'fév', 'mar', 'avr', 'mai', 'jui', 'jul', 'aoû', 'sep', 'oct', 'nov', 'déc'],
+    'de': ['jan', 'feb', 'mär', 'apr', 'mai', 'jun', 'jul', 'aug', 'sep', 'okt', 'nov', 'dez'],
+}
+MONTHS = {lang: {name: number for number, name in enumerate(names, 1)} for lang, names in MONTHS.items()}
+# the three letter prefix is ambiguous for juin/juillet
+MONTHS['fr'].update({'juin': 6, 'juil': 7})
+
+DAY_MONTH_YEAR = re.compile(r'^(\d{1,2})\.?(?:\s+de)?\s+([^\W\d]+)\.?(?:\s+de)?,?(?:\s+(\d{4}))?$')
+MONTH_DAY_YEAR = re.compile(r'^([^\W\d]+)\.?\s+(\d{1,2}),?(?:\s+(\d{4}))?$')
+NUMERIC = re.compile(r'^(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})$')
+
+# two fixed "now" used to tell the relative dates dateparser understands from the absolute ones
+BASES = (datetime.datetime(2000, 1, 1), datetime.datetime(2001, 1, 1))
+
+
+def base_lang(lang):
+    """'pt-BR' -> 'pt'"""
+    return (lang or 'en').split('-')[0].split('_')[0].lower()
+
+
+def parse_iso(text):
+    """
+    datetime.isoformat() text of a naive datetime back into it, with or without microseconds.
+    datetime.fromisoformat() would do, but only from Python 3.7.
+    """
+    return datetime.datetime.strptime(text, '%Y-%m-%dT%H:%M:%S.%f' if '.' in text else '%Y-%m-%dT%H:%M:%S')
+
+
+def parse_date(text, lang='en', now=None):
+    """
+    Converts a date as shown by google ('3 hours ago', 'há 2 dias', '15 de dez. de 2024') into a datetime.
+    Returns None when the text is not a date.
+    Parameters:
+    text = the date text
+    lang = language of the text, tried before english
+    now = reference time for relative dates, defaults to datetime.now()
+    """
+    if not text:
+        return None
+    spec = date_spec(text.strip().lower(), base_lang(lang))
+    if spec is None:
+        return None
+    kind, value = spec
+    if now is None:
+        now = datetime.datetime.now()
+    if kind == 'ago':
+        return now - value
+    if kind == 'dateparser':
+        return _dateparser(text.strip().lower(), base_lang(lang), now)
+    if kind == 'month_day':
+        month, day = value
+        try:
+            date = datetime.datetime(now.year, month, day)
+        except ValueError:
+            return None
+        # 'Dec 30' read on January 2nd is from last year
+        if date > now + datetime.timedelta(days=1):
+            from dateutil.relativedelta import relativedelta
+            date -= relativedelta(years=1)
+        return date
+    return value
+
+
+@lru_cache(maxsize=4096)
+def date_spec(text, lang):
+    """
+    Parses text once per (text, lang) into a description that does not depend on the current time:
+    ('ago', relativedelta or timedelta), ('month_day', (month, day)), ('at', datetime) or ('dateparser', None) for
+    the relative dates that only dateparser can place. None when it is not a date.
+    """
+    for table in (lang, 'en') if lang != 'en' else ('en',):
+        spec = _table_spec(text, table)
+        if spec is not None:
+            return spec
+    return _dateparser_spec(text, lang)
+
+
+def _table_spec(text, lang):
+    from dateutil.relativedelta import relativedelta
+    if lang in DAYS_AGO and text in DAYS_AGO[lang]:
+        return ('ago', relativedelta(days=DAYS_AGO[lang][text]))
+    if lang in RELATIVE:
+        pattern, units = RELATIVE[lang]
+        match = pattern.match(text)
+        if match:
+            for prefix, unit in units:
+                if match.group(2).startswith(prefix):
+                    return ('ago', relativedelta(**{unit: int(match.group(1))}))
+    if lang in MONTHS:
+        match = DAY_MONTH_YEAR.match(text)
+        if match:
+            day, month, year = match.groups()
+        else:
+            match = MONTH_DAY_YEAR.match(text)
+            if match:
+                month, day, year = match.groups()
+        if match:
+            month = _month(month, lang)
+            if month:
+                if year is None:
+                    return ('month_day', (month, int(day)))
+                return _absolute(int(year), month, int(day))
+    match = NUMERIC.match(text)
+    if match:
+        day, month, year = match.groups()
+        return _absolute(int(year), int(month), int(day))
+    return None
+
+
+def _month(name, lang):
+    months = MONTHS[lang]
+    name = name.rstrip('.')
+    return months.get(name) or months.get(name[:4]) or months.get(name[:3])
+
+
+def _absolute(year, month, day):
+    try:
+        return ('at', datetime.datetime(year, month, day))
+    except ValueError:
+        return None
+
+
+def _dateparser_spec(text, lang):
+    """Slow path for the formats the tables do not know."""
+    first = _dateparser(text, lang, BASES[0])
+    if first is None:
+        return None
+    second = _dateparser(text, lang, BASES[1])
+    if first == second:
+        return ('at', first)
+    if BASES[0] - first == BASES[1] - second:
+        return ('ago', BASES[0] - first)
+    # relative, but not a fixed offset ('friday'): dateparser reads it again against the current time on every call
+    return ('dateparser', None)
+
+
+def _dateparser(text, lang, base):
+    import dateparser
+    settings = {'RELATIVE_BASE': base} if base else None
+    try:
+        try:
+            parsed = dateparser.parse(text, languages=[lang], settings=settings)
+        except ValueError:
+            # language unknown to dateparser
+            parsed = dateparser.parse(text, settings=settings)
+    except Exception:
+        return None
+    if parsed is None:
+        return None
+    return parsed.replace(tzinfo=None)
@@ -0,0 +1,236 @@
+### MODULES
+import re
+import threading
+# hashlib is imported on first use, it is a noticeable part of the import time
+import unicodedata
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+### METHODS
+
+# query parameters that only track the visitor, they don't change the article
+TRACKING_PARAMS = frozenset(['ved', 'usg', 'fbclid', 'gclid', 'dclid', 'ocid', 'cmpid', 'mc_cid', 'mc_eid', 'igshid',
+                             'ref', 'ref_src', 'src', 'amp', 'outputtype', 'output', 'origin', 'ito'])
+HOST_PREFIXES = ('www.', 'm.', 'amp.', 'mobile.')
+GOOGLE_REDIRECT = '/url?esrc=s&q=&rct=j&sa=U&url='
+GOOGLE_PARAMS = frozenset(['ved', 'usg'])
+
+WORD = re.compile(r'\w+')
+
+# simhash counts the votes of the bits in LANE bits wide slots of one integer,
+# _spread() spreads the bits of a byte one per slot, built on first use to keep the import light
+LANE = 32
+_SPREAD = []
+
+
+def clean_url(link):
+    """
+    Link without google's redirect and the parameters google adds to it (ved, usg), otherwise as the outlet
+    published it: unlike canonical_url(), the result is an address that exists.
+    """
+    if not link:
+        return ''
+    # google appends its parameters to the target with & even when it has no query
+    link = link.replace(GOOGLE_REDIRECT, '').split('&ved=')[0].split('&usg=')[0]
+    base, found, query = link.partition('?')
+    if not found:
+        return link
+    query = '&'.join(param for param in query.split('&') if param.split('=', 1)[0] not in GOOGLE_PARAMS)
+    return base + ('?' + query if query else '')
+
+
+def canonical_url(link):
+    """
+    Canonical form of an article link, equal for the variants of the same page: google's redirect and tracking
+    parameters, utm_* and other tracking parameters, http/https, www./m./amp. hosts, /amp paths, fragments
+    and trailing slashes are left out, the remaining parameters are sorted.
+    """
+    link = clean_url(link)
+    if not link:
+        return ''
+    try:
+        parts = urlsplit(link.strip())
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return link
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = parts.path
+    if path.endswith('/amp') or path.endswith('/amp/'):
+        path = path[:path.rindex('/amp')]
+    path = path.rstrip('/')
+    query = '&'.join(sorted(param for param in parts.query.split('&') if param and not _tracking(param)))
+    return 'https://' + host + path + ('?' + query if query else '')
+
+
+def _tracking(param):
+    name = param.split('=', 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith('utm_')
+
+
+def tokens(text):
+    """
+    Words of text, lower case and without accents, so that small spelling variants give the same tokens.
+    Words of one or two letters are left out, numbers are kept: 'R$ 5 mi' and 'R$ 50 mi' are different stories.
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return [word for word in WORD.findall(text) if len(word) > 2 or word.isdigit()]
+
+
+def simhash(words, bits=64):
+    """
+    Simhash fingerprint of a list of words: texts sharing most of their words and word pairs
+    get fingerprints differing in a few bits.
+    """
+    features = words + [a + ' ' + b for a, b in zip(words, words[1:])]
+    import hashlib
+    spread = _SPREAD or _spread()
+    votes = 0
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=bits // 8).digest()
+        for index, byte in enumerate(digest):
+            votes += spread[byte] << (index * 8 * LANE)
+    fingerprint = 0
+    mask = (1 << LANE) - 1
+    for bit in range(bits):
+        if 2 * (votes >> (bit * LANE) & mask) > len(features):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _spread():
+    _SPREAD[:] = [sum(1 << (bit * LANE) for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+    return _SPREAD
+
+
+def strip_outlet(title):
+    """Title without the outlet name some sites append to it: 'Startup capta R$ 50 mi - Valor Econômico'."""
+    for separator in (' - ', ' | ', ' – '):
+        head, found, tail = (title or '').rpartition(separator)
+        if found and head and len(tail.split()) <= 4:
+            return head
+    return title
+
+
+def _host(link):
+    """Host of a canonical link, '' when it has none."""
+    try:
+        return urlsplit(link).netloc if link else ''
+    except ValueError:
+        return ''
+
+
+if hasattr(int, 'bit_count'):
+    def hamming(a, b):
+        return (a ^ b).bit_count()
+else:
+    # python < 3.10
+    def hamming(a, b):
+        return bin(a ^ b).count('1')
+
+### CLASSEs
+
+class DedupIndex:
+    """
+    Remembers the last max_items results and tells whether a new one is the same article as one of them:
+    the same canonical link, the same title (syndicated copies on other outlets), or a description whose simhash
+    differs in at most `distance` bits. A title a few bits away only counts on the same host or with a description
+    as close: headlines differing in one word, 'Fintech recebe aporte' and 'Healthtech recebe aporte', are other
+    stories. Texts shorter than min_words words are only matched by link.
+    The fingerprints are cut in distance + 1 bands and indexed by band: two fingerprints within `distance` bits
+    share at least one band, so each lookup only compares with the entries in a few buckets.
+    Safe to use from several threads.
+    """
+
+    BITS = 64
+
+    def __init__(self, max_items=10000, distance=3, min_words=4):
+        self.max_items = max_items
+        self.distance = distance
+        self.min_words = min_words
+        self.duplicates = 0
+        self.__bands = distance + 1
+        self.__width = self.BITS // self.__bands
+        self.__entries = OrderedDict()
+        self.__links = {}
+        self.__buckets = {}
+        self.__next = 0
+        self.__lock = threading.Lock()
+
+    def add(self, item):
+        """
+        Returns the indexed item that item duplicates, or None after adding item to the index.
+        item is a NewsItem, or any object with link, title and desc attributes.
+        """
+        link = getattr(item, 'canonical', None) or canonical_url(item.link)
+        fingerprints = [('title', self.__fingerprint(strip_outlet(getattr(item, 'title', None)))),
+                        ('desc', self.__fingerprint(getattr(item, 'desc', None)))]
+        fingerprints = [(field, value) for field, value in fingerprints if value is not None]
+        host = _host(link)
+        with self.__lock:
+            original = self.__find(link, host, fingerprints)
+            if original is not None:
+                self.duplicates += 1
+                return original
+            self.__insert(item, link, host, fingerprints)
+            return None
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__links.clear()
+            self.__buckets.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __fingerprint(self, text):
+        words = tokens(text)
+        return simhash(words, self.BITS) if len(words) >= self.min_words else None
+
+    def __keys(self, field, value):
+        mask = (1 << self.__width) - 1
+        return [(field, band, value >> (band * self.__width) & mask) for band in range(self.__bands)]
+
+    def __find(self, link, host, fingerprints):
+        if link and link in self.__links:
+            return self.__entries[self.__links[link]][0]
+        desc = dict(fingerprints).get('desc')
+        for field, value in fingerprints:
+            for key in self.__keys(field, value):
+                for entry_id in self.__buckets.get(key, ()):
+                    entry = self.__entries[entry_id]
+                    distance = hamming(entry[2][field], value)
+                    if distance > self.distance:
+                        continue
+                    if field == 'desc' or distance == 0 or (host and host == entry[3]):
+                        return entry[0]
+                    if desc is not None and 'desc' in entry[2] and hamming(entry[2]['desc'], desc) <= self.distance:
+                        return entry[0]
+        return None
+
+    def __insert(self, item, link, host, fingerprints):
+        entry_id = self.__next
+        self.__next += 1
+        self.__entries[entry_id] = (item, link, dict(fingerprints), host)
+        if link:
+            self.__links[link] = entry_id
+        for field, value in fingerprints:
+            for key in self.__keys(field, value):
+                self.__buckets.setdefault(key, set()).add(entry_id)
+        while len(self.__entries) > self.max_items:
+            self.__evict()
+
+    def __evict(self):
+        entry_id, (item, link, fingerprints, host) = self.__entries.popitem(last=False)
+        if self.__links.get(link) == entry_id:
+            del self.__links[link]
+        for field, value in fingerprints.items():
+            for key in self.__keys(field, value):
+                bucket = self.__buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self.__buckets[key]
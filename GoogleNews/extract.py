@@ -0,0 +1,195 @@
+### MODULES
+
+### METHODS
+
+# A layout reads every field of one result in a single walk over its nodes.
+# It returns None when the result does not have the layout's structure, and None
+# for each field that is absent, so missing fields cost a check instead of an exception.
+# With accept, a layout reads the link and the media first and returns REJECTED without
+# reading the rest when accept(link, media) is false.
+
+REJECTED = ()
+
+
+def search_layout_2024(item, accept=None):
+    """
+    google.com news results since 2024:
+    <a data-ved href>
+      <div><div><div>img</div><div>media</div></div></div>
+      <div><div><h3>title</h3></div><div><div><div><div>desc</div></div></div><div><span>date</span></div></div></div>
+    </a>
+    Returns (title, link, media, date, desc, img).
+    """
+    head = item.find('div')
+    if head is None:
+        return None
+    body = head.find_next_sibling('div')
+    if body is None:
+        return None
+    link = item.get('href')
+    logo = _down(head, 2)
+    media = _text(logo.find_next_sibling('div')) if logo is not None else None
+    if accept is not None and not accept(link, media):
+        return REJECTED
+    desc = body.find('div')
+    if desc is not None:
+        desc = _down(desc.find_next_sibling('div'), 3)
+    return (_text(item.find('h3')), link, media, _text(body.find('span')), _text(desc), _image(item))
+
+
+def search_date_2024(item):
+    """Only the date text of a search_layout_2024 result, for the results accept turned down."""
+    head = item.find('div')
+    body = head.find_next_sibling('div') if head is not None else None
+    return _text(body.find('span')) if body is not None else None
+
+
+def search_layout_generic(item, accept=None):
+    """Any other link: only what can be read without knowing the layout."""
+    link = item.get('href')
+    if accept is not None and not accept(link, None):
+        return REJECTED
+    return (_text(item.find('h3')), link, None, None, None, _image(item))
+
+
+def news_layout_2024(article, accept=None):
+    """
+    news.google.com articles since 2024:
+    <article jslog>
+      <div><a href="./read/..."></a></div>
+      <figure><img src></figure>
+      <div><div><div><div>...media</div></div><a>title</a></div><div><time datetime>date</time><span>reporter</span></div></div>
+    </article>
+    Returns (title, link, media, date, datetime, site, reporter, img, jslog).
+    """
+    divs = article.find_all('div')
+    anchors = divs[2].find_all('a') if len(divs) > 2 else None
+    if not anchors:
+        return None
+    link = _href(divs[0].find('a'))
+    media = _news_media(divs)
+    if accept is not None and not accept(link, media):
+        return REJECTED
+    return (anchors[0].text, link, media) + _news_common(article)
+
+
+def news_layout_generic(article, accept=None):
+    """Any other article: the same lookups, without assuming where the title is."""
+    divs = article.find_all('div')
+    link = _href(divs[0].find('a')) if divs else None
+    media = _news_media(divs)
+    if accept is not None and not accept(link, media):
+        return REJECTED
+    return (_text(_nth(article.find_all('a'), 1)), link, media) + _news_common(article)
+
+
+def _news_media(divs):
+    media = None
+    if divs:
+        head_divs = divs[0].find_all('div')
+        if len(head_divs) > 1:
+            media = _down(head_divs[1], 3)
+    if media is None and len(divs) > 1:
+        media = _down(divs[1], 3)
+    return _text(media)
+
+
+def _news_common(article):
+    time = article.find('time')
+    site = None
+    if time is not None and time.parent is not None:
+        site = _text(time.parent.find('a'))
+    figure = article.find('figure')
+    return (_text(time), time.get('datetime') if time is not None else None, site,
+            _text(_nth(article.find_all('span'), 2)), _src(figure.find('img')) if figure is not None else None,
+            article.get('jslog'))
+
+
+def _down(node, levels):
+    """node.find('div').find('div')... levels times, None as soon as one is missing."""
+    for _ in range(levels):
+        if node is None:
+            return None
+        node = node.find('div')
+    return node
+
+
+def _nth(nodes, index):
+    return nodes[index] if len(nodes) > index else None
+
+
+def _text(node):
+    return node.text if node is not None else None
+
+
+def _src(img):
+    return img.get('src') if img is not None else None
+
+
+def _image(item):
+    # google.com results: '' without an image, None for an image without src
+    img = item.find('img')
+    return img.get('src') if img is not None else ''
+
+
+def _href(anchor):
+    return anchor.get('href') if anchor is not None else None
+
+### CLASSEs
+
+class ExtractionPlan:
+    """
+    Reads the results of one page. The first layout that fits a result is kept for the next ones,
+    the others are only tried when it stops fitting; the fallback is used for results no layout fits.
+    rejected counts the results accept turned down, duplicates the ones GoogleNews' dedup index left out:
+    a page with either is not the end of the results, even when nothing is left of it.
+    date_readers maps layouts to functions reading only the date text of a result: when rejected_dates is a list,
+    the date of each rejected result is added to it, for the callers that need how far back the page goes.
+    dates is then set by parse_search_rows: the datetimes of every dated result of the page, rejected or not.
+    """
+
+    def __init__(self, layouts, fallback, date_readers=None):
+        self.layouts = layouts
+        self.fallback = fallback
+        self.date_readers = date_readers or {}
+        self.layout = None
+        self.rejected = 0
+        self.duplicates = 0
+        self.rejected_dates = None
+        self.dates = None
+
+    def extract(self, node, accept=None):
+        """Returns the fields of node, or REJECTED when accept(link, media) is false."""
+        layout, fields = self.__extract(node, accept)
+        if fields is REJECTED:
+            self.rejected += 1
+            if self.rejected_dates is not None:
+                reader = self.date_readers.get(layout)
+                self.rejected_dates.append(reader(node) if reader is not None else None)
+        return fields
+
+    def __extract(self, node, accept):
+        if self.layout is not None:
+            fields = self.layout(node, accept)
+            if fields is not None:
+                return self.layout, fields
+        for layout in self.layouts:
+            if layout is self.layout:
+                continue
+            fields = layout(node, accept)
+            if fields is not None:
+                self.layout = layout
+                return layout, fields
+        return self.fallback, self.fallback(node, accept)
+
+
+def search_plan(dates=False):
+    """Plan of the google.com results; with dates, it keeps the dates of the rejected ones too, see ExtractionPlan."""
+    plan = ExtractionPlan([search_layout_2024], search_layout_generic, {search_layout_2024: search_date_2024})
+    if dates:
+        plan.rejected_dates = []
+    return plan
+
+
+def news_plan():
+    return ExtractionPlan([news_layout_2024], news_layout_generic)
@@ -0,0 +1,46 @@
+### MODULES
+from urllib.parse import urlsplit
+
+### CLASSEs
+
+class DomainFilter:
+    """
+    Accepts the links whose host is one of the domains or a subdomain of one:
+    DomainFilter(['globo.com']) accepts https://valor.globo.com/x but not https://notglobo.com/x.
+    The domains are kept in a set, so a link costs one lookup per label of its host however many domains there are.
+    """
+
+    def __init__(self, domains):
+        self.domains = frozenset(domain.strip().lower().strip('.') for domain in domains if domain.strip())
+        self.__labels = max((domain.count('.') + 1 for domain in self.domains), default=0)
+
+    def __call__(self, link):
+        if not link:
+            return False
+        try:
+            host = urlsplit(link).hostname
+        except ValueError:
+            return False
+        if not host:
+            return False
+        labels = host.split('.')
+        for start in range(max(0, len(labels) - self.__labels), len(labels)):
+            if '.'.join(labels[start:]) in self.domains:
+                return True
+        return False
+
+    def __repr__(self):
+        return 'DomainFilter({!r})'.format(sorted(self.domains))
+
+
+class MediaFilter:
+    """Accepts the results whose media name contains name, ignoring case."""
+
+    def __init__(self, name):
+        self.name = name.lower()
+
+    def __call__(self, media):
+        return self.name in (media or '').lower()
+
+    def __repr__(self):
+        return 'MediaFilter({!r})'.format(self.name)
@@ -0,0 +1,135 @@
+### MODULES
+import datetime as _datetime
+from collections.abc import Mapping, Sequence
+
+### METHODS
+
+# timestamp of the results without a known date: they sort after every dated one
+UNKNOWN_TIMESTAMP = float('-inf')
+
+
+def timestamp_of(value):
+    """Epoch seconds of a datetime, UNKNOWN_TIMESTAMP for anything else (None, nan, a date google showed as text)."""
+    if not isinstance(value, _datetime.datetime):
+        return UNKNOWN_TIMESTAMP
+    try:
+        return value.timestamp()
+    except (OverflowError, OSError, ValueError):
+        return UNKNOWN_TIMESTAMP
+
+
+def newest(results, limit=None, key=None):
+    """
+    results from the newest to the oldest by their timestamp, the ones without a known date last,
+    results with the same timestamp in their original order.
+    With limit only the first limit ones are returned, picked with a heap instead of sorting all of them.
+    key reads the timestamp of each result, for results wrapped in other objects; by default result.timestamp.
+    """
+    key = key if key is not None else _timestamp
+    if limit is None:
+        return sorted(results, key=key, reverse=True)
+    import heapq
+    return heapq.nlargest(limit, results, key=key)
+
+
+def _timestamp(item):
+    return item.timestamp
+
+### CLASSEs
+
+class NewsItem(Mapping):
+    """
+    One result, stored in slots instead of a dict.
+    Still reads like the dicts older versions returned: item['title'], item.get('desc'), dict(item).
+    Results from google.com have title, media, date, datetime, desc, link and img;
+    results from news.google.com also have site and reporter.
+    canonical is the canonical form of the link, set by GoogleNews when parsing, and timestamp the epoch seconds
+    of datetime (UNKNOWN_TIMESTAMP without a date), computed whenever datetime is set; they are not dict keys.
+    It is not a dict: json.dumps() and other code checking for dict take item.to_dict().
+    """
+
+    __slots__ = ('title', 'media', 'date', '_datetime', 'desc', 'link', 'img', 'site', 'reporter', 'canonical',
+                 'timestamp')
+
+    # what item[key] = value can set
+    SETTABLE = frozenset(['title', 'media', 'date', 'datetime', 'desc', 'link', 'img', 'site', 'reporter', 'canonical'])
+
+    SEARCH_FIELDS = ('title', 'media', 'date', 'datetime', 'desc', 'link', 'img')
+    NEWS_FIELDS = ('title', 'desc', 'date', 'datetime', 'link', 'img', 'media', 'site', 'reporter')
+
+    def __init__(self, title='', media='', date='', datetime=None, desc='', link='', img='', **news_fields):
+        self.title = title
+        self.media = media
+        self.date = date
+        self.datetime = datetime
+        self.desc = desc
+        self.link = link
+        self.img = img
+        self.canonical = None
+        if news_fields:
+            self.site = news_fields.get('site')
+            self.reporter = news_fields.get('reporter')
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @datetime.setter
+    def datetime(self, value):
+        self._datetime = value
+        self.timestamp = timestamp_of(value)
+
+    def fields(self):
+        """Names of the fields this item has, in the order of the old dicts."""
+        return self.NEWS_FIELDS if hasattr(self, 'site') else self.SEARCH_FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.fields()}
+
+    def __getitem__(self, key):
+        if key not in self.fields():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.SETTABLE:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.fields())
+
+    def __len__(self):
+        return len(self.fields())
+
+    def __contains__(self, key):
+        return key in self.fields()
+
+    def __repr__(self):
+        return 'NewsItem({!r})'.format(self.to_dict())
+
+
+class FieldView(Sequence):
+    """Read-only list of one field of the results, computed when read instead of stored a second time."""
+
+    __slots__ = ('_results', '_field')
+
+    def __init__(self, results, field):
+        self._results = results
+        self._field = field
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(item, self._field) for item in self._results[index]]
+        return getattr(self._results[index], self._field)
+
+    def __len__(self):
+        return len(self._results)
+
+    def __eq__(self, other):
+        if isinstance(other, (FieldView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
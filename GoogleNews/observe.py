@@ -0,0 +1,115 @@
+### MODULES
+import threading
+
+### METHODS
+
+# Phases GoogleNews reports to its observer:
+# wait     waiting for the rate limiter
+# connect  opening a connection, DNS and TLS included (PooledTransport with an observer)
+# request  downloading a page through the transport, connect included
+# cache    looking a page up in the cache
+# parse    building the tree of a page
+# extract  reading the fields of the results of a page
+# dates    converting the dates of the results of a page
+# archive  storing the results of a page in the archive, or reading a search from it
+PHASES = ('wait', 'connect', 'request', 'cache', 'parse', 'extract', 'dates', 'archive')
+
+# Fields reported as missing: the field was not found in a result, or for datetime,
+# the date was found but could not be converted
+FIELDS = ('title', 'link', 'media', 'date', 'datetime', 'desc')
+
+# Upper bounds in seconds, like the default buckets of the Prometheus clients
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+### CLASSEs
+
+class Observer:
+    """
+    Receives what GoogleNews measures while it works; every method does nothing, subclasses override the
+    ones they need. GoogleNews only reads the clock when it has an observer, without one the instrumentation
+    costs a check for None. Methods are called from the threads doing the work, they must be thread safe.
+    """
+
+    def phase(self, name, seconds):
+        """name is one of PHASES, or a phase of the application using GoogleNews."""
+
+    def page(self, url, seconds, results, rejected):
+        """A page was parsed: seconds from the downloaded page to its results, how many were kept and filtered out."""
+
+    def missing(self, field, count=1):
+        """count results of a page lacked field, one of FIELDS."""
+
+    def error(self, error):
+        """An error GoogleNews reported instead of raising it, or before raising it."""
+
+
+class Histogram:
+    """Counts of observed values under each bucket bound, their sum and their number. Thread safe."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.__counts = [0] * (len(self.buckets) + 1)
+        self.__sum = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value):
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        with self.__lock:
+            self.__counts[index] += 1
+            self.__sum += value
+
+    def snapshot(self):
+        """Returns ([(bound, cumulative count)], sum, count), the last bound being float('inf')."""
+        with self.__lock:
+            counts, total = list(self.__counts), self.__sum
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, total, running
+
+
+class HistogramObserver(Observer):
+    """
+    Aggregates the measures of any number of GoogleNews: a Histogram per phase and one of the page times,
+    the number of pages, of empty pages and of results, the missing fields and the errors by type.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.phases = {}
+        self.pages = Histogram(buckets)
+        self.empty_pages = 0
+        self.results = 0
+        self.rejected = 0
+        self.missing_fields = {}
+        self.errors = {}
+        self.__lock = threading.Lock()
+
+    def phase(self, name, seconds):
+        histogram = self.phases.get(name)
+        if histogram is None:
+            with self.__lock:
+                histogram = self.phases.setdefault(name, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def page(self, url, seconds, results, rejected):
+        self.pages.observe(seconds)
+        with self.__lock:
+            self.results += results
+            self.rejected += rejected
+            if not results and not rejected:
+                self.empty_pages += 1
+
+    def missing(self, field, count=1):
+        with self.__lock:
+            self.missing_fields[field] = self.missing_fields.get(field, 0) + count
+
+    def error(self, error):
+        name = type(error).__name__
+        with self.__lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
@@ -0,0 +1,117 @@
+### MODULES
+import re
+
+### METHODS
+
+PARSERS = ('html.parser', 'lxml', 'selectolax')
+
+RESULT_STATS = re.compile(rb'id="result-stats"[^>]*>([^<]*)')
+
+
+def check_parser(parser):
+    """Raises if the parser engine is unknown or its package is not installed."""
+    if parser not in PARSERS:
+        raise ValueError("Unknown parser '{}', use one of: {}".format(parser, ', '.join(PARSERS)))
+    if parser == 'lxml':
+        import lxml
+    elif parser == 'selectolax':
+        _lexbor()
+
+
+def total_count(page):
+    """Reads the number of results from the result-stats div, None when google omits it."""
+    stats = RESULT_STATS.search(page)
+    if stats:
+        stats = re.search(r'[\d,]+', stats.group(1).decode('utf-8', 'ignore'))
+    if not stats:
+        return None
+    return int(stats.group().replace(',', ''))
+
+
+def search_items(page, parser='html.parser'):
+    """Returns the a[data-ved] result nodes of a google.com search page."""
+    if parser == 'selectolax':
+        return [LexborNode(node) for node in _lexbor()(page).css('a[data-ved]')]
+    from bs4 import BeautifulSoup as Soup, SoupStrainer
+    # only the result links are turned into a tree, the rest of the page is skipped
+    strainer = SoupStrainer('a', attrs={'data-ved': True})
+    return Soup(page, parser, parse_only=strainer).find_all('a', attrs={'data-ved': True})
+
+
+def news_items(page, parser='html.parser'):
+    """Returns the article nodes of a news.google.com page."""
+    if parser == 'selectolax':
+        return [LexborNode(node) for node in _lexbor()(page).css('article')]
+    from bs4 import BeautifulSoup as Soup, SoupStrainer
+    return Soup(page, parser, parse_only=SoupStrainer('article')).find_all('article')
+
+
+def _lexbor():
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise ImportError("parser='selectolax' needs the selectolax package: pip install selectolax")
+    return LexborHTMLParser
+
+### CLASSEs
+
+class LexborNode:
+    """
+    Wraps a selectolax node with the part of the BeautifulSoup Tag API used to read results,
+    so the same extraction code runs on both engines.
+    """
+
+    __slots__ = ('node',)
+
+    SKIPPED_TEXT = ('script', 'style', 'template')
+
+    def __init__(self, node):
+        self.node = node
+
+    def find_all(self, name):
+        nodes = self.node.css(name)
+        # unlike BeautifulSoup, selectolax matches the node itself too
+        if nodes and nodes[0].mem_id == self.node.mem_id:
+            nodes = nodes[1:]
+        return [LexborNode(node) for node in nodes]
+
+    findAll = find_all
+
+    def find(self, name):
+        first = self.node.css_first(name)
+        if first is None:
+            return None
+        if first.mem_id != self.node.mem_id:
+            return LexborNode(first)
+        nodes = self.find_all(name)
+        return nodes[0] if nodes else None
+
+    def find_next_sibling(self, name):
+        node = self.node.next
+        while node is not None:
+            if node.tag == name:
+                return LexborNode(node)
+            node = node.next
+        return None
+
+    def get(self, attr, default=None):
+        attributes = self.node.attributes
+        if attr not in attributes:
+            return default
+        # valueless attributes are None in selectolax and '' in BeautifulSoup
+        return attributes[attr] or ''
+
+    @property
+    def parent(self):
+        parent = self.node.parent
+        return None if parent is None else LexborNode(parent)
+
+    @property
+    def text(self):
+        if self.node.css_first(', '.join(self.SKIPPED_TEXT)) is None:
+            return self.node.text(deep=True)
+        texts = []
+        for node in self.node.traverse(include_text=True):
+            if node.is_text_node and node.parent.tag not in self.SKIPPED_TEXT:
+                texts.append(node.text_content or '')
+        return ''.join(texts)
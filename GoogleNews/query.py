@@ -0,0 +1,51 @@
+### MODULES
+
+### CLASSEs
+
+class Query:
+    """
+    One search of GoogleNews.search_many: the term and the settings that differ from the GoogleNews running it.
+    Parameters:
+    key = the search term
+    lang = language, None for the one of the GoogleNews
+    region = region, e.g. 'BR', None for the one of the GoogleNews
+    start, end = time range as mm/dd/yyyy, both or neither, None for the one of the GoogleNews
+    period = e.g. '7d', it replaces the time range of the GoogleNews; None for the one of the GoogleNews
+    Raises ValueError for only one of start and end, or a period with a time range.
+    """
+
+    __slots__ = ('key', 'lang', 'region', 'start', 'end', 'period')
+
+    def __init__(self, key, lang=None, region=None, start=None, end=None, period=None):
+        if (start is None) != (end is None):
+            raise ValueError('a Query needs both start and end, or neither: {!r}'.format(key))
+        if start is not None and period is not None:
+            raise ValueError('a Query takes a time range or a period, not both: {!r}'.format(key))
+        self.key = key
+        self.lang = lang
+        self.region = region
+        self.start = start
+        self.end = end
+        self.period = period
+
+    @classmethod
+    def of(cls, query):
+        """query as a Query: a Query, a search term, or a dict with the parameters of Query."""
+        if isinstance(query, cls):
+            return query
+        if isinstance(query, dict):
+            return cls(**query)
+        return cls(query)
+
+    def __eq__(self, other):
+        if not isinstance(other, Query):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        settings = ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__[1:]
+                             if getattr(self, name) is not None)
+        return 'Query({!r}{})'.format(self.key, ', ' + settings if settings else '')
@@ -0,0 +1,161 @@
+### MODULES
+import os
+import time
+import random
+import threading
+
+### METHODS
+
+# Markers of the page google.com/sorry shows instead of the results when it suspects a bot
+BLOCK_MARKERS = (b'id="captcha-form"', b'unusual traffic from your computer network', b'//www.google.com/sorry/')
+
+# HTTP statuses google uses to throttle
+THROTTLE_STATUSES = (429, 503)
+
+
+def is_block_page(page):
+    """True when page is google's captcha page instead of the one asked for."""
+    head = page[:64 * 1024]
+    return any(marker in head for marker in BLOCK_MARKERS)
+
+
+def retry_after(error):
+    """Seconds of the Retry-After header of an HTTP error, None when it has none in seconds."""
+    headers = getattr(error, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def shared_limiter():
+    """The RateLimiter used by every GoogleNews that is not given its own."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = RateLimiter(rate=float(os.environ.get('GOOGLENEWS_RATE', 1.0)),
+                                      burst=int(os.environ.get('GOOGLENEWS_BURST', 5)))
+    return _shared
+
+### CLASSEs
+
+class BlockedError(Exception):
+    """
+    Google refused the request: it answered with its captcha page or a throttling status (429/503),
+    or the host is paused after that for longer than the limiter accepts to wait.
+    retry_after is the number of seconds before the next request is let through, when known.
+    """
+
+    def __init__(self, message, host=None, retry_after=None):
+        super().__init__(message)
+        self.host = host
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Token bucket per host, shared by all the threads (and GoogleNews instances) using it.
+    Each host gets up to `rate` requests per second, `burst` of them at once. When a host throttles, the
+    host is paused for an exponential backoff with random jitter (or its Retry-After) and its rate is halved;
+    each successful request then brings the rate back up by a tenth of `rate`.
+    Parameters:
+    rate = requests per second per host, None for no limit
+    burst = requests allowed at once after an idle period
+    backoff = seconds of the first pause after a throttle, doubled on each consecutive one
+    max_backoff = longest pause
+    max_wait = seconds a request waits for its turn, paused host and queue for the tokens together; BlockedError is
+               raised as soon as it would wait longer, None to wait as long as it takes
+    jitter = fraction of the pause added at random, so that clients don't all come back at the same time
+    """
+
+    def __init__(self, rate=1.0, burst=5, backoff=5.0, max_backoff=600.0, max_wait=30.0, jitter=0.5):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.jitter = jitter
+        self.requests = 0
+        self.throttles = 0
+        self.waited = 0.0
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+
+    def acquire(self, host):
+        """Waits until a request to host is allowed. Raises BlockedError when that would take more than max_wait."""
+        started = time.monotonic()
+        while True:
+            with self.__lock:
+                state = self.__state(host)
+                now = time.monotonic()
+                wait = state.resume_at - now
+                if wait <= 0:
+                    if self.rate is None:
+                        self.requests += 1
+                        return
+                    state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+                    state.updated = now
+                    if state.tokens >= 1:
+                        state.tokens -= 1
+                        self.requests += 1
+                        return
+                    wait = (1 - state.tokens) / state.rate
+                    if self.max_wait is not None and now - started + wait > self.max_wait:
+                        # the other threads waiting for this host take the tokens first
+                        raise BlockedError('no request to {} allowed within {:.0f}s'.format(host, self.max_wait), host, wait)
+                elif self.max_wait is not None and now - started + wait > self.max_wait:
+                    raise BlockedError('{} is paused for {:.0f}s after being throttled'.format(host, wait), host, wait)
+                self.waited += wait
+            time.sleep(wait)
+
+    def throttled(self, host, retry_after=None):
+        """Reports that host throttled a request. Returns the seconds the host is paused for."""
+        with self.__lock:
+            state = self.__state(host)
+            state.backoff = min(self.max_backoff, state.backoff * 2 if state.backoff else self.backoff)
+            pause = retry_after if retry_after is not None else state.backoff * (1 + random.uniform(0, self.jitter))
+            state.resume_at = max(state.resume_at, time.monotonic() + pause)
+            # the bucket starts empty when the pause ends, the pause itself earns no tokens
+            state.tokens = 0
+            state.updated = state.resume_at
+            if self.rate is not None:
+                state.rate = max(self.rate / 64, state.rate / 2)
+            self.throttles += 1
+            return pause
+
+    def succeeded(self, host):
+        """Reports a request host answered normally."""
+        with self.__lock:
+            state = self.__state(host)
+            state.backoff = 0
+            if self.rate is not None:
+                state.rate = min(self.rate, state.rate + self.rate / 10)
+
+    def stats(self):
+        with self.__lock:
+            hosts = {host: {'rate': state.rate, 'paused_for': max(0.0, state.resume_at - time.monotonic())}
+                     for host, state in self.__hosts.items()}
+        return {'requests': self.requests, 'throttles': self.throttles, 'waited': self.waited, 'hosts': hosts}
+
+    def __state(self, host):
+        state = self.__hosts.get(host)
+        if state is None:
+            state = self.__hosts[host] = _HostState(self.rate, self.burst)
+        return state
+
+
+class _HostState:
+    __slots__ = ('rate', 'tokens', 'updated', 'backoff', 'resume_at')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.backoff = 0
+        self.resume_at = 0.0
+
+
+_shared = None
+_shared_lock = threading.Lock()
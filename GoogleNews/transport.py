@@ -0,0 +1,180 @@
+### MODULES
+import io
+import time
+import queue
+import threading
+from urllib.parse import urljoin, urlsplit
+# ssl, http.client and urllib.request are imported on first use, they add up to a large part of the import time
+
+### CLASSEs
+
+class Transport:
+    """
+    Interface used by GoogleNews to download pages.
+    Implementations must be safe to call from several threads at the same time.
+    rate_limited tells GoogleNews to pace the requests through its RateLimiter, for transports going to google.
+    """
+
+    rate_limited = False
+
+    def fetch(self, url, headers):
+        """
+        Downloads url and returns the body as bytes.
+        Raises urllib.error.HTTPError for error statuses, like urlopen() does.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class UrllibTransport(Transport):
+    """One connection per request through urlopen(). Honours the proxy environment variables."""
+
+    rate_limited = True
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def fetch(self, url, headers):
+        import urllib.request
+        req = urllib.request.Request(url, headers=headers)
+        if self.timeout is None:
+            response = urllib.request.urlopen(req)
+        else:
+            response = urllib.request.urlopen(req, timeout=self.timeout)
+        try:
+            return response.read()
+        finally:
+            response.close()
+
+
+class PooledTransport(Transport):
+    """
+    Keeps HTTP/1.1 keep-alive connections open and reuses them, one pool per host.
+    Parameters:
+    pool_size = idle connections kept per host, extra connections are opened on demand and closed after use
+    timeout = seconds to wait when connecting and for each read
+    max_redirects = redirects followed before giving up
+    observer = an Observer told how long opening each connection takes ('connect' phase), None for none
+    proxies = {'http': url, 'https': url} of the proxies, None to read them from the environment like urlopen()
+              (http_proxy, https_proxy and no_proxy)
+    """
+
+    rate_limited = True
+
+    def __init__(self, pool_size=4, timeout=10.0, max_redirects=5, observer=None, proxies=None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.observer = observer
+        self.proxies = proxies
+        self.connections_opened = 0
+        self.__pools = {}
+        self.__lock = threading.Lock()
+        self.__ssl_context = None
+
+    def fetch(self, url, headers):
+        import urllib.error
+        for _ in range(self.max_redirects + 1):
+            status, reason, response_headers, body = self.__request(url, headers)
+            location = response_headers.get('Location')
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            if status >= 400:
+                raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+            return body
+        raise urllib.error.HTTPError(url, status, 'Too many redirects', response_headers, io.BytesIO(body))
+
+    def close(self):
+        with self.__lock:
+            pools, self.__pools = self.__pools, {}
+        for pool in pools.values():
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def __pool(self, key):
+        with self.__lock:
+            if key not in self.__pools:
+                self.__pools[key] = queue.LifoQueue()
+            return self.__pools[key]
+
+    def __proxy(self, scheme, host):
+        """(host, port) of the proxy to reach host through, None to connect directly."""
+        import urllib.request
+        if self.proxies is None:
+            self.proxies = urllib.request.getproxies()
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parts = urlsplit(proxy if '://' in proxy else 'http://' + proxy)
+        return parts.hostname, parts.port or 8080
+
+    def __connect(self, scheme, host, port, proxy=None):
+        import http.client
+        with self.__lock:
+            self.connections_opened += 1
+            if scheme == 'https' and self.__ssl_context is None:
+                import ssl
+                self.__ssl_context = ssl.create_default_context()
+        if scheme == 'https' and proxy is not None:
+            # a CONNECT tunnel through the proxy, TLS with the host inside it
+            conn = http.client.HTTPSConnection(proxy[0], proxy[1], timeout=self.timeout, context=self.__ssl_context)
+            conn.set_tunnel(host, port)
+        elif scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.__ssl_context)
+        elif proxy is not None:
+            conn = http.client.HTTPConnection(proxy[0], proxy[1], timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        if self.observer is not None:
+            # connected now instead of on the first request, to time the DNS lookup and handshakes apart
+            started = time.perf_counter()
+            conn.connect()
+            self.observer.phase('connect', time.perf_counter() - started)
+        return conn
+
+    def __request(self, url, headers):
+        import http.client
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError('Unsupported URL scheme: {}'.format(url))
+        proxy = self.__proxy(parts.scheme, parts.hostname)
+        key = (parts.scheme, parts.hostname, parts.port, proxy)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        if proxy is not None and parts.scheme == 'http':
+            # plain http goes to the proxy with the whole url
+            path = url.split('#')[0]
+        pool = self.__pool(key)
+        try:
+            conn, reused = pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self.__connect(*key), False
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # the server dropped an idle keep-alive connection, try once more on a fresh one
+            conn = self.__connect(*key)
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except Exception:
+                conn.close()
+                raise
+        if response.will_close or pool.qsize() >= self.pool_size:
+            conn.close()
+        else:
+            pool.put(conn)
+        return response.status, response.reason, response.headers, body
@@ -0,0 +1,125 @@
+### MODULES
+import datetime
+import threading
+from .cache import SQLiteConnections
+from .dates import parse_iso
+# json and hashlib are imported on first use, they are a noticeable part of the import time
+
+### METHODS
+
+def link_hash(link):
+    """
+    Short hash identifying a result by its link. google appends its own tracking parameters
+    (&ved=, &usg=) to the links, they change on every request and are left out.
+    """
+    import hashlib
+    link = link.split('&ved=')[0].split('&usg=')[0]
+    return hashlib.blake2b(link.encode('utf-8', 'replace'), digest_size=8).hexdigest()
+
+### CLASSEs
+
+class Watermark:
+    """
+    What the previous polls of one search have seen: the datetime of the newest result
+    and the hashes of the links of the latest results, at most max_links of them.
+    """
+
+    def __init__(self, newest=None, links=(), max_links=1000):
+        self.newest = newest
+        self.links = list(links)[:max_links]
+        self.max_links = max_links
+        self.__seen = set(self.links)
+
+    def seen(self, link):
+        return link_hash(link) in self.__seen
+
+    def add(self, items):
+        """Records the results of a poll, items being the new ones, newest first."""
+        hashes = [link_hash(item.link) for item in items if item.link]
+        self.links = (hashes + self.links)[:self.max_links]
+        self.__seen = set(self.links)
+        for item in items:
+            if isinstance(item.datetime, datetime.datetime) and (self.newest is None or item.datetime > self.newest):
+                self.newest = item.datetime
+
+    def to_json(self):
+        import json
+        return json.dumps({'newest': self.newest.isoformat() if self.newest is not None else None, 'links': self.links})
+
+    @classmethod
+    def from_json(cls, text, max_links=1000):
+        import json
+        data = json.loads(text)
+        newest = parse_iso(data['newest']) if data.get('newest') else None
+        return cls(newest, data.get('links', ()), max_links)
+
+
+class WatermarkStore:
+    """
+    Interface for the stores keeping the watermark of each polled search.
+    Keys are strings identifying a search, values are Watermark objects.
+    """
+
+    def get(self, key):
+        """Returns the Watermark of the search, or None when it was never polled."""
+        raise NotImplementedError
+
+    def set(self, key, watermark):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class MemoryWatermarkStore(WatermarkStore):
+    """Watermarks kept in memory, for the lifetime of the process."""
+
+    def __init__(self):
+        self.__marks = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            text = self.__marks.get(key)
+        return Watermark.from_json(text) if text is not None else None
+
+    def set(self, key, watermark):
+        # stored serialized, so that the caller can't change a stored watermark by mistake
+        with self.__lock:
+            self.__marks[key] = watermark.to_json()
+
+    def delete(self, key):
+        with self.__lock:
+            self.__marks.pop(key, None)
+
+    def __len__(self):
+        return len(self.__marks)
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """
+    Watermarks kept in a SQLite file, so they survive restarts and are shared by the processes polling on the same host.
+    Parameters:
+    path = the database file, created when missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.__connection = SQLiteConnections(path)
+        with self.__connection() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS watermarks (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def get(self, key):
+        row = self.__connection().execute('SELECT value FROM watermarks WHERE key = ?', (key,)).fetchone()
+        return Watermark.from_json(row[0]) if row is not None else None
+
+    def set(self, key, watermark):
+        with self.__connection() as db:
+            db.execute('INSERT OR REPLACE INTO watermarks (key, value) VALUES (?, ?)', (key, watermark.to_json()))
+
+    def delete(self, key):
+        with self.__connection() as db:
+            db.execute('DELETE FROM watermarks WHERE key = ?', (key,))
+
+    def __len__(self):
+        return self.__connection().execute('SELECT COUNT(*) FROM watermarks').fetchone()[0]
@@ -1,13 +1,20 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel
-from GoogleNews import GoogleNews
+from GoogleNews import GoogleNews, PooledTransport, MemoryCache, SQLiteCache, BlockedError, shared_limiter, DomainFilter, MediaFilter, DedupIndex, newest, HistogramObserver, Query, process_pool, SQLiteArchive, canonical_url, clean_url
 import os
-from urllib.parse import urlparse, parse_qs, urlunparse
+import json
+from urllib.parse import urlparse
 import requests
-from bs4 import BeautifulSoup
-import re
+import codecs
+import asyncio
+import time
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 URLS_PERMITIDAS = [
     'braziljournal.com',
@@ -25,11 +32,62 @@ URLS_PERMITIDAS = [
     'epocanegocios.globo.com'
 ]
 
+# Conexões keep-alive com o Google compartilhadas entre todas as requisições, e as threads que
+# fazem os downloads. O event loop só espera por elas, então o worker atende várias buscas ao
+# mesmo tempo, com no máximo DOWNLOADS_PARALELOS páginas do Google sendo baixadas
+DOWNLOADS_PARALELOS = int(os.getenv('NEWS_DOWNLOADS_PARALELOS', '8'))
+
+# Tempos de cada fase das buscas (conexão, download, parsing, datas, imagens...) e contagens
+# de páginas, resultados e campos ausentes, de todas as requisições, para o /metrics
+observador = HistogramObserver()
+
+transporte = PooledTransport(pool_size=DOWNLOADS_PARALELOS, timeout=10.0, observer=observador)
+executor_google = ThreadPoolExecutor(max_workers=DOWNLOADS_PARALELOS, thread_name_prefix='google')
+
+# Os termos do /buscar-noticias/stream ficam com uma thread do começo ao fim do stream (e outra baixando
+# as páginas seguintes), por isso têm threads próprias, no máximo NEWS_STREAM_TERMOS_PARALELOS termos de
+# todos os streams ao mesmo tempo, sem ocupar as do executor_google usadas pelas outras buscas
+STREAM_TERMOS_PARALELOS = int(os.getenv('NEWS_STREAM_TERMOS_PARALELOS', '4'))
+executor_stream = ThreadPoolExecutor(max_workers=STREAM_TERMOS_PARALELOS, thread_name_prefix='stream')
+
+# Com NEWS_PROCESSOS_PARSING > 0, as páginas baixadas são lidas nesses processos em vez das threads
+# de download, usando vários núcleos nas buscas de muitas páginas e termos
+PROCESSOS_PARSING = int(os.getenv('NEWS_PROCESSOS_PARSING', '0'))
+pool_parsing = process_pool(PROCESSOS_PARSING) if PROCESSOS_PARSING > 0 else None
+
+# Cache das páginas do Google. Com NEWS_CACHE_PATH o cache fica num arquivo SQLite
+# compartilhado entre os workers do uvicorn da mesma máquina
+CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', '300'))
+if os.getenv('NEWS_CACHE_PATH'):
+    cache = SQLiteCache(os.getenv('NEWS_CACHE_PATH'), ttl=CACHE_TTL)
+else:
+    cache = MemoryCache(ttl=CACHE_TTL)
+
+# Arquivo das notícias já buscadas. Com NEWS_ARQUIVO_PATH, as notícias de cada busca ficam num arquivo
+# SQLite com índice de texto, e a busca de /buscar-noticias/ só vai ao Google pela parte do período que
+# o arquivo ainda não tem, em geral as últimas horas. Uma parte com menos de NEWS_ARQUIVO_FRESCOR
+# segundos não é buscada, o arquivo responde sozinho
+ARQUIVO_FRESCOR = float(os.getenv('NEWS_ARQUIVO_FRESCOR', str(CACHE_TTL)))
+arquivo = SQLiteArchive(os.getenv('NEWS_ARQUIVO_PATH')) if os.getenv('NEWS_ARQUIVO_PATH') else None
+
+# Quantos termos de uma busca com OR são buscados ao mesmo tempo
+MAX_TERMOS_PARALELOS = int(os.getenv('NEWS_MAX_TERMOS_PARALELOS', '8'))
+
+# Busca de imagens das notícias: quantas páginas ao mesmo tempo, quanto tempo no total
+# por requisição e por quanto tempo a imagem de cada notícia fica em cache
+IMAGENS_PARALELAS = int(os.getenv('NEWS_IMAGENS_PARALELAS', '8'))
+IMAGENS_ORCAMENTO = float(os.getenv('NEWS_IMAGENS_ORCAMENTO', '3'))
+cache_imagens = MemoryCache(ttl=int(os.getenv('NEWS_IMAGENS_TTL', '3600')), maxsize=4096)
+executor_imagens = ThreadPoolExecutor(max_workers=IMAGENS_PARALELAS, thread_name_prefix='imagens')
+# Sem achar a imagem, a página não é lida além disso
+MAX_BYTES_PAGINA = 512 * 1024
+
+# Domínios permitidos num conjunto: cada URL custa uma consulta por parte do nome do host
+dominios_permitidos = DomainFilter(URLS_PERMITIDAS)
+
 def url_permitida(url: str) -> bool:
-    """Verifica se a URL pertence às fontes permitidas"""
-    if not url:
-        return False
-    return any(dominio in url.lower() for dominio in URLS_PERMITIDAS)
+    """Verifica se a URL pertence às fontes permitidas (o domínio ou um subdomínio dele)"""
+    return dominios_permitidos(url)
 
 # Configuração da API FastAPI com metadados
 app = FastAPI(
@@ -50,6 +108,13 @@ class Noticia(BaseModel):
     id: str
     termo_busca: str
 
+# Pedido de busca em lote: vários termos numa requisição só
+class Lote(BaseModel):
+    termos: List[str]
+    dias: Optional[int] = 7
+    fonte: Optional[str] = None
+    paginas: Optional[int] = 1
+
 # Rota de verificação de saúde da API
 @app.get("/", tags=["Status"])
 async def root():
@@ -60,116 +125,313 @@ async def root():
         "docs": "/docs"
     }
 
-def limpar_url(url: str) -> str:
-    """Remove parâmetros de rastreamento do Google da URL"""
-    if not url:
-        return url
-        
-    try:
-        # Parse a URL
-        parsed = urlparse(url)
-        # Remove parâmetros de rastreamento
-        query = parse_qs(parsed.query)
-        query = {k: v for k, v in query.items() if not k in ['ved', 'usg']}
-        # Reconstrói a URL limpa
-        clean_url = parsed._replace(query='&'.join(f'{k}={v[0]}' for k, v in query.items()))
-        return urlunparse(clean_url).split('&ved=')[0].split('&usg=')[0]
-    except:
-        return url
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Status"])
+async def metricas():
+    """Métricas no formato texto do Prometheus"""
+    limitador = shared_limiter()
+    linhas = [
+        '# HELP noticias_buscas_termos_total Buscas de termos pedidas pelas requisições',
+        '# TYPE noticias_buscas_termos_total counter',
+        f'noticias_buscas_termos_total {buscas_google.chamadas}',
+        '# HELP noticias_buscas_coalescidas_total Buscas de termos atendidas por uma busca igual já em andamento',
+        '# TYPE noticias_buscas_coalescidas_total counter',
+        f'noticias_buscas_coalescidas_total {buscas_google.coalescidas}',
+        '# HELP noticias_buscas_em_andamento Buscas de termos no Google em andamento',
+        '# TYPE noticias_buscas_em_andamento gauge',
+        f'noticias_buscas_em_andamento {len(buscas_google.em_andamento)}',
+        '# HELP noticias_google_requisicoes_total Requisições ao Google liberadas pelo limitador de taxa',
+        '# TYPE noticias_google_requisicoes_total counter',
+        f'noticias_google_requisicoes_total {limitador.requests}',
+        '# HELP noticias_google_bloqueios_total Respostas do Google com captcha ou status 429/503',
+        '# TYPE noticias_google_bloqueios_total counter',
+        f'noticias_google_bloqueios_total {limitador.throttles}',
+    ]
+    linhas += linhas_histograma('noticias_fase_segundos', 'Duração de cada fase das buscas, em segundos',
+                                {f'fase="{fase}"': histograma for fase, histograma in sorted(observador.phases.items())})
+    linhas += linhas_histograma('noticias_pagina_segundos', 'Tempo do parsing de cada página do Google, em segundos',
+                                {'': observador.pages})
+    linhas += [
+        '# HELP noticias_resultados_total Notícias lidas das páginas do Google',
+        '# TYPE noticias_resultados_total counter',
+        f'noticias_resultados_total {observador.results}',
+        '# HELP noticias_paginas_vazias_total Páginas do Google sem nenhuma notícia',
+        '# TYPE noticias_paginas_vazias_total counter',
+        f'noticias_paginas_vazias_total {observador.empty_pages}',
+        '# HELP noticias_campos_ausentes_total Notícias sem um campo, ou com a data que não pôde ser convertida (datetime)',
+        '# TYPE noticias_campos_ausentes_total counter',
+    ]
+    linhas += [f'noticias_campos_ausentes_total{{campo="{campo}"}} {total}' for campo, total in sorted(observador.missing_fields.items())]
+    linhas += [
+        '# HELP noticias_erros_total Erros nas buscas, por tipo',
+        '# TYPE noticias_erros_total counter',
+    ]
+    linhas += [f'noticias_erros_total{{tipo="{tipo}"}} {total}' for tipo, total in sorted(observador.errors.items())]
+    return '\n'.join(linhas) + '\n'
 
-def extrair_imagem_da_pagina(url: str) -> Optional[str]:
-    """Extrai a primeira imagem relevante da página da notícia"""
-    try:
-        # Faz request com headers para evitar bloqueios
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Procura por meta tags de imagem primeiro
-        meta_img = soup.find('meta', property=['og:image', 'twitter:image'])
-        if meta_img and meta_img.get('content'):
-            return meta_img['content']
-            
-        # Procura por imagens no artigo
-        for img in soup.find_all('img'):
-            src = img.get('src', '')
+def linhas_histograma(nome: str, ajuda: str, histogramas: Dict[str, object]) -> List[str]:
+    """Linhas de um histograma no formato do Prometheus, um conjunto de séries para cada rótulo"""
+    linhas = [f'# HELP {nome} {ajuda}', f'# TYPE {nome} histogram']
+    for rotulo, histograma in histogramas.items():
+        baldes, soma, total = histograma.snapshot()
+        prefixo = rotulo + ',' if rotulo else ''
+        for limite, contagem in baldes:
+            le = '+Inf' if limite == float('inf') else repr(limite)
+            linhas.append(f'{nome}_bucket{{{prefixo}le="{le}"}} {contagem}')
+        sufixo = '{' + rotulo + '}' if rotulo else ''
+        linhas.append(f'{nome}_sum{sufixo} {soma}')
+        linhas.append(f'{nome}_count{sufixo} {total}')
+    return linhas
+
+def link_canonico(noticia) -> str:
+    """
+    Chave da notícia para as repetições: o link sem o redirecionamento e os parâmetros de rastreamento, calculado
+    uma vez no parsing. Reescreve o endereço (https, sem www. ou /amp), que pode não existir: não é devolvido
+    """
+    return getattr(noticia, 'canonical', None) or canonical_url(noticia.get('link'))
+
+def link_original(noticia) -> str:
+    """Link da notícia como o veículo publicou, só sem o redirecionamento e os parâmetros do Google"""
+    return clean_url(noticia.get('link'))
+
+class ProcuraImagem(HTMLParser):
+    """
+    Lê a página aos poucos, conforme chega, procurando a imagem da notícia:
+    a meta og:image (ou twitter:image) do <head> ou, sem ela, a primeira imagem relevante do corpo
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self.meta = None
+        self.img = None
+        self.fim_head = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta' and self.meta is None:
+            if attrs.get('property') in ('og:image', 'twitter:image') and attrs.get('content'):
+                self.meta = attrs['content']
+        elif tag == 'img' and self.img is None:
+            src = attrs.get('src') or ''
             # Ignora ícones e imagens pequenas
             if src and not any(x in src.lower() for x in ['icon', 'logo', 'avatar']):
                 if src.startswith('//'):
                     src = 'https:' + src
                 elif src.startswith('/'):
-                    base_url = '{uri.scheme}://{uri.netloc}'.format(uri=urlparse(url))
+                    base_url = '{uri.scheme}://{uri.netloc}'.format(uri=urlparse(self.url))
                     src = base_url + src
-                return src
-                
+                self.img = src
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.fim_head = True
+
+    def imagem(self) -> Optional[str]:
+        """A imagem encontrada até agora, ou None enquanto ainda vale a pena continuar lendo"""
+        if self.meta:
+            return self.meta
+        if self.fim_head and self.img:
+            return self.img
         return None
+
+def extrair_imagem_da_pagina(url: str) -> Optional[str]:
+    """
+    Extrai a primeira imagem relevante da página da notícia
+    A página é baixada só até achar a imagem, normalmente o fim do <head>,
+    e o resultado fica em cache por NEWS_IMAGENS_TTL segundos
+    """
+    em_cache = cache_imagens.get(url)
+    if em_cache is not None:
+        return em_cache.decode() or None
+    try:
+        # Faz request com headers para evitar bloqueios
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        procura = ProcuraImagem(url)
+        with requests.get(url, headers=headers, timeout=5, stream=True) as response:
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            lidos = 0
+            for bloco in response.iter_content(16 * 1024):
+                procura.feed(decoder.decode(bloco))
+                lidos += len(bloco)
+                if procura.imagem() or lidos >= MAX_BYTES_PAGINA:
+                    break
+        imagem = procura.meta or procura.img
     except Exception:
         return None
+    cache_imagens.set(url, (imagem or '').encode())
+    return imagem
 
-def buscar_com_termos_multiplos(googlenews: GoogleNews, termos: str) -> List[dict]:
+async def enriquecer_imagens(urls: List[str], limite: int = None, orcamento: float = None) -> Dict[str, Optional[str]]:
     """
-    Busca notícias com múltiplos termos usando OR
+    Busca as imagens de várias notícias ao mesmo tempo
+    Args:
+        urls: links das notícias
+        limite: quantas páginas são baixadas ao mesmo tempo (padrão: NEWS_IMAGENS_PARALELAS)
+        orcamento: segundos para buscar todas (padrão: NEWS_IMAGENS_ORCAMENTO); depois disso
+                   retorna só as imagens já encontradas
+    """
+    limite = limite or IMAGENS_PARALELAS
+    orcamento = IMAGENS_ORCAMENTO if orcamento is None else orcamento
+    loop = asyncio.get_running_loop()
+    semaforo = asyncio.Semaphore(limite)
+
+    def extrair_medindo(url):
+        inicio = time.perf_counter()
+        imagem = extrair_imagem_da_pagina(url)
+        observador.phase('imagem', time.perf_counter() - inicio)
+        return imagem
+
+    async def buscar(url):
+        async with semaforo:
+            return url, await loop.run_in_executor(executor_imagens, extrair_medindo, url)
+
+    tarefas = [asyncio.ensure_future(buscar(url)) for url in urls]
+    if not tarefas:
+        return {}
+    feitas, pendentes = await asyncio.wait(tarefas, timeout=orcamento)
+    # As páginas que ainda estão sendo baixadas terminam em segundo plano e vão para o cache
+    for tarefa in pendentes:
+        tarefa.cancel()
+    return dict(tarefa.result() for tarefa in feitas)
+
+def selecionar_noticias(noticias: List[dict], fonte: Optional[str] = None) -> List[tuple]:
+    """
+    Notícias das fontes permitidas (e da fonte pedida), sem links repetidos, com a posição de cada uma
+    entre as recebidas: [(posição, notícia)]
+    """
+    urls_vistas = set()
+    return [(posicao, noticia) for posicao, noticia in enumerate(noticias) if aceitar_noticia(noticia, fonte, urls_vistas)]
+
+def aceitar_noticia(noticia: dict, fonte: Optional[str], urls_vistas: set) -> bool:
+    """Se a notícia é de uma fonte permitida (e da fonte pedida) e o link ainda não está em urls_vistas, onde é guardado"""
+    if fonte and fonte.lower() not in noticia.get('media', '').lower():
+        return False
+    url = link_canonico(noticia)
+    if not url or url in urls_vistas or not url_permitida(url):
+        return False
+    urls_vistas.add(url)
+    return True
+
+def formatar_noticia(noticia: dict, termo: str, posicao: int) -> dict:
+    """Notícia no formato das respostas da API"""
+    return {
+        "id": f"{termo.replace(' OR ', '-')}-{posicao}",
+        "titulo": noticia.get('title'),
+        "data": noticia.get('date'),
+        "fonte": noticia.get('media'),
+        "descricao": noticia.get('desc'),
+        "link": link_original(noticia),
+        "imagem": None,
+        "termo_busca": termo
+    }
+
+def separar_termos(termos: str) -> List[str]:
+    """Separa os termos pelo operador OR"""
+    return [termo.strip() for termo in termos.split('OR')]
+
+def juntar_resultados(resultados: List[List[dict]]) -> List[dict]:
+    """
+    Junta os resultados dos termos na ordem dos termos, sem notícias repetidas: o mesmo link
+    em outra variante, ou a mesma notícia reproduzida por outro veículo
     """
-    # Separa os termos pelo operador OR
-    termos_lista = [termo.strip() for termo in termos.split('OR')]
-    
     todas_noticias = []
-    urls_vistas = set()  # Para evitar duplicatas
+    vistas = DedupIndex()  # Para evitar duplicatas
     
-    # Busca para cada termo
-    for termo in termos_lista:
-        googlenews.search(termo)
-        noticias = googlenews.result()
-        
+    for noticias in resultados:
         # Adiciona apenas notícias não vistas
         for noticia in noticias:
-            url = limpar_url(noticia.get('link', ''))  # Limpa a URL antes de comparar
-            if url and url not in urls_vistas:
-                urls_vistas.add(url)
+            if noticia.get('link') and vistas.add(noticia) is None:
                 todas_noticias.append(noticia)
-        
-        # Limpa resultados para próxima busca
-        googlenews.clear()
     
     return todas_noticias
 
-def converter_data_relativa(data_str: str) -> datetime:
-    """Converte data relativa para datetime"""
-    hoje = datetime.now()
-    
-    if not data_str:
-        return hoje
+class SingleFlight:
+    """
+    Junta chamadas iguais feitas ao mesmo tempo: enquanto a primeira com uma chave está em andamento,
+    as outras com a mesma chave esperam por ela e recebem o mesmo resultado, em vez de repetir a busca
+    """
+
+    def __init__(self):
+        self.em_andamento = {}
+        self.chamadas = 0
+        self.coalescidas = 0
+
+    async def executar(self, chave, funcao):
+        """Retorna await funcao(), ou o resultado da chamada com a mesma chave que já está em andamento"""
+        self.chamadas += 1
+        futuro = self.em_andamento.get(chave)
+        if futuro is not None:
+            self.coalescidas += 1
+        else:
+            futuro = asyncio.ensure_future(funcao())
+            self.em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self.em_andamento.pop(chave, None))
+        # Um cliente que desiste não cancela a busca dos outros que esperam por ela
+        return await asyncio.shield(futuro)
+
+buscas_google = SingleFlight()
+
+def normalizar_termo(termo: str) -> str:
+    """Chave de um termo: o Google não diferencia maiúsculas nem espaços repetidos"""
+    return ' '.join(termo.lower().split())
+
+async def buscar_com_termos_multiplos_async(googlenews: GoogleNews, termos: str, desde: datetime,
+                                            contexto: tuple = (), paginas: int = 1) -> List[dict]:
+    """
+    Busca notícias com múltiplos termos usando OR, sem bloquear o event loop: os termos são buscados
+    ao mesmo tempo, cada um na sua cópia do GoogleNews, com os downloads e o parsing no executor_google,
+    compartilhado por todas as requisições do worker, e juntados na ordem dos termos
+    Cada termo busca até `paginas` páginas, parando na primeira com notícias de antes de desde
+    Cada termo passa pelo buscas_google: requisições simultâneas com o mesmo termo e o mesmo
+    contexto (parâmetros que mudam a busca, como o período e a fonte) fazem uma única busca no Google
+    """
+    semaforo = asyncio.Semaphore(MAX_TERMOS_PARALELOS)
+    loop = asyncio.get_running_loop()
+
+    async def buscar(termo):
+        async with semaforo:
+            cliente = googlenews.clone()
+            cliente.enableException(True)
+            try:
+                if arquivo is not None:
+                    # Do arquivo, indo ao Google só pela parte do período que ele ainda não tem
+                    await loop.run_in_executor(executor_google, partial(cliente.search_archived, termo, desde, paginas,
+                                                                        ARQUIVO_FRESCOR))
+                else:
+                    # Página a página, com a próxima já sendo baixada enquanto a atual é lida
+                    await loop.run_in_executor(executor_google, partial(cliente.fetch_until, desde, paginas, termo))
+            except BlockedError:
+                raise
+            except Exception:
+                # Outros erros já foram impressos, ficam só as páginas que vieram
+                pass
+            return cliente.result()
+
+    async def buscar_uma_vez(termo):
+        chave = (normalizar_termo(termo), paginas) + tuple(contexto)
+        return list(await buscas_google.executar(chave, lambda: buscar(termo)))
+
+    resultados = await asyncio.gather(*(buscar_uma_vez(termo) for termo in separar_termos(termos)))
+    return juntar_resultados(resultados)
+
+def configurar_busca(dias: int, fonte: Optional[str] = None):
+    """GoogleNews em PT-BR com o período dos últimos `dias` e os filtros de fonte, e o início e o fim do período"""
+    # Usa as conexões, o cache e o observador compartilhados entre as requisições
+    googlenews = GoogleNews(lang='pt', region='BR', transport=transporte, cache=cache, observer=observador)
+    googlenews.set_parse_pool(pool_parsing)
+    googlenews.set_archive(arquivo)
     
-    try:
-        if 'minuto' in data_str or 'minutos' in data_str:
-            minutos = int(re.findall(r'\d+', data_str)[0])
-            return hoje - timedelta(minutes=minutos)
-        elif 'hora' in data_str or 'horas' in data_str:
-            horas = int(re.findall(r'\d+', data_str)[0])
-            return hoje - timedelta(hours=horas)
-        elif 'dia' in data_str or 'dias' in data_str:
-            dias = int(re.findall(r'\d+', data_str)[0])
-            return hoje - timedelta(days=dias)
-        elif 'semana' in data_str or 'semanas' in data_str:
-            semanas = int(re.findall(r'\d+', data_str)[0])
-            return hoje - timedelta(weeks=semanas)
-        elif 'mês' in data_str or 'meses' in data_str:
-            meses = int(re.findall(r'\d+', data_str)[0])
-            return hoje - timedelta(days=meses * 30)
-    except:
-        pass
+    # Configura o período de busca
+    data_fim = datetime.now()
+    data_inicio = data_fim - timedelta(days=dias)
+    googlenews.set_time_range(data_inicio.strftime('%m/%d/%Y'), data_fim.strftime('%m/%d/%Y'))
     
-    return hoje
-
-def ordenar_noticias_por_data(noticias: List[dict]) -> List[dict]:
-    """Ordena notícias da mais recente para a mais antiga"""
-    return sorted(
-        noticias,
-        key=lambda x: converter_data_relativa(x.get('data', '')),
-        reverse=True  # True para ordem decrescente (mais recente primeiro)
-    )
+    # Os filtros são aplicados durante o parsing: as notícias de fora das fontes permitidas
+    # são descartadas antes de ler a data, a descrição e a imagem
+    googlenews.set_filter(link=dominios_permitidos, media=MediaFilter(fonte) if fonte else None)
+    return googlenews, data_inicio, data_fim
 
 @app.get("/buscar-noticias/", response_model=List[dict], tags=["Notícias"])
 async def buscar_noticias(
@@ -177,7 +439,8 @@ async def buscar_noticias(
     dias: Optional[int] = 7,
     fonte: Optional[str] = None,
     paginas: Optional[int] = 2,
-    buscar_imagens: Optional[bool] = False
+    buscar_imagens: Optional[bool] = False,
+    limite: Optional[int] = None
 ):
     """
     Busca notícias no Google News com base nos parâmetros fornecidos
@@ -186,58 +449,200 @@ async def buscar_noticias(
         termo: Termos de busca separados por OR (ex: "startup capta OR recebe aporte")
         dias: Período de busca em dias (padrão: 7)
         fonte: Filtrar por fonte específica (opcional)
-        paginas: Número de páginas de resultados (padrão: 2)
+        paginas: Número máximo de páginas de resultados por termo; a busca para antes na primeira
+                 página com notícias de antes do período (padrão: 2)
         buscar_imagens: Se deve tentar extrair imagens das páginas (padrão: False)
+        limite: Quantas notícias retornar, as mais recentes (padrão: todas)
     """
     try:
-        # Inicializa o GoogleNews com configurações para PT-BR
-        googlenews = GoogleNews(lang='pt', region='BR')
-        
-        # Configura o período de busca
-        data_fim = datetime.now()
-        data_inicio = data_fim - timedelta(days=dias)
+        googlenews, data_inicio, data_fim = configurar_busca(dias, fonte)
         data_inicio_str = data_inicio.strftime('%m/%d/%Y')
         data_fim_str = data_fim.strftime('%m/%d/%Y')
-        googlenews.set_time_range(data_inicio_str, data_fim_str)
         
         # Busca com múltiplos termos
-        noticias = buscar_com_termos_multiplos(googlenews, termo)
-        noticias_unicas = {}
+        noticias = await buscar_com_termos_multiplos_async(googlenews, termo, data_inicio,
+                                                          (data_inicio_str, data_fim_str, (fonte or '').lower()),
+                                                          paginas=max(1, paginas or 1))
+        noticias_unicas = selecionar_noticias(noticias, fonte)
         
-        # Processa e filtra os resultados
-        for idx, noticia in enumerate(noticias):
-            if fonte and fonte.lower() not in noticia.get('media', '').lower():
-                continue
-                
-            url = limpar_url(noticia.get('link'))
-            
-            # Adiciona verificação de URL permitida
-            if not url or url in noticias_unicas or not url_permitida(url):
-                continue
-                
-            imagem_url = None
-            if buscar_imagens and url:
-                imagem_url = extrair_imagem_da_pagina(url)
-                
-            noticias_unicas[url] = {
-                "id": f"{termo.replace(' OR ', '-')}-{idx}",
-                "titulo": noticia.get('title'),
-                "data": noticia.get('date'),
-                "fonte": noticia.get('media'),
-                "descricao": noticia.get('desc'),
-                "link": url,
-                "imagem": imagem_url,
-                "termo_busca": termo
-            }
+        # Ordena uma vez só, pelo timestamp calculado no parsing (sem data por último);
+        # com limite, só as mais recentes são escolhidas, com um heap
+        noticias_filtradas = [formatar_noticia(noticia, termo, posicao)
+                              for posicao, noticia in newest(noticias_unicas, limite, key=lambda par: par[1].timestamp)]
         
-        # Converte o dicionário em lista e ordena
-        noticias_filtradas = list(noticias_unicas.values())
-        noticias_filtradas = ordenar_noticias_por_data(noticias_filtradas)
+        # Busca as imagens das notícias retornadas ao mesmo tempo
+        if buscar_imagens:
+            imagens = await enriquecer_imagens([noticia["link"] for noticia in noticias_filtradas])
+            for noticia in noticias_filtradas:
+                noticia["imagem"] = imagens.get(noticia["link"])
         
         return noticias_filtradas
         
+    except BlockedError as e:
+        # O Google bloqueou as buscas: avisa o cliente em vez de responder uma lista vazia
+        raise HTTPException(
+            status_code=503,
+            detail=f"Google bloqueou as buscas: {str(e)}",
+            headers={'Retry-After': str(int(e.retry_after) + 1)} if e.retry_after else None
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao buscar notícias: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@app.get("/arquivo/buscar", response_model=List[dict], tags=["Notícias"])
+async def buscar_arquivo(
+    texto: str,
+    dias: Optional[int] = 30,
+    fonte: Optional[str] = None,
+    limite: Optional[int] = 50
+):
+    """
+    Busca no arquivo local as notícias com todas as palavras do texto no título ou na descrição,
+    sem diferenciar acentos nem maiúsculas, das mais recentes para as mais antigas. Não vai ao Google
+    
+    Args:
+        texto: Palavras buscadas (ex: "inteligencia artificial")
+        dias: Período em dias (padrão: 30)
+        fonte: Nome exato da fonte, sem diferenciar maiúsculas (opcional)
+        limite: Quantas notícias retornar (padrão: 50)
+    """
+    if arquivo is None:
+        raise HTTPException(status_code=404, detail="Arquivo desativado, defina NEWS_ARQUIVO_PATH")
+    desde = (datetime.now() - timedelta(days=dias)).timestamp()
+    noticias = await asyncio.get_running_loop().run_in_executor(
+        executor_google, partial(arquivo.match, texto, desde, None, fonte, limite))
+    return [formatar_noticia(noticia, texto, posicao) for posicao, noticia in enumerate(noticias)]
+
+@app.post("/buscar-noticias/lote", tags=["Notícias"])
+async def buscar_noticias_lote(lote: Lote):
+    """
+    Busca vários termos numa requisição só, respondendo em NDJSON: uma linha por termo, assim que a
+    busca dele termina, com {"termo", "noticias", "erro"}. As buscas compartilham as conexões, o cache
+    e o limitador de taxa, até NEWS_MAX_TERMOS_PARALELOS ao mesmo tempo
+    """
+    googlenews, _, _ = configurar_busca(lote.dias, lote.fonte)
+    termos = [termo.strip() for termo in lote.termos if termo.strip()]
+    loop = asyncio.get_running_loop()
+    semaforo = asyncio.Semaphore(MAX_TERMOS_PARALELOS)
+
+    async def buscar(termo):
+        # No executor_google, como as outras buscas: o lote não abre threads nem conexões além do limite do worker
+        async with semaforo:
+            return await loop.run_in_executor(executor_google, partial(googlenews.search_query, Query(termo),
+                                                                       max(1, lote.paginas or 1)))
+
+    async def linhas():
+        buscas = [asyncio.ensure_future(buscar(termo)) for termo in termos]
+        try:
+            for proxima in asyncio.as_completed(buscas):
+                consulta, noticias, erro = await proxima
+                linha = {
+                    "termo": consulta.key,
+                    "noticias": [formatar_noticia(noticia, consulta.key, posicao)
+                                 for posicao, noticia in newest(selecionar_noticias(noticias, lote.fonte),
+                                                                key=lambda par: par[1].timestamp)],
+                    "erro": str(erro) if erro is not None else None
+                }
+                yield json.dumps(linha, ensure_ascii=False, default=str) + '\n'
+        finally:
+            # o cliente desistiu: os termos que ainda esperam a vez não são buscados
+            for busca in buscas:
+                busca.cancel()
+
+    return StreamingResponse(linhas(), media_type='application/x-ndjson')
+
+@app.get("/buscar-noticias/stream", tags=["Notícias"])
+async def buscar_noticias_stream(
+    termo: str,
+    dias: Optional[int] = 7,
+    fonte: Optional[str] = None,
+    paginas: Optional[int] = 2,
+    buscar_imagens: Optional[bool] = False
+):
+    """
+    Mesma busca de /buscar-noticias/, respondida em NDJSON à medida que as páginas são lidas:
+    - {"tipo": "noticia", "noticia": {...}} para cada notícia, já filtrada e sem repetidas, na ordem em que chegam
+    - {"tipo": "imagem", "id", "imagem"} para cada imagem encontrada, com buscar_imagens, depois das notícias
+    - {"tipo": "resumo", ...} no fim: total de notícias e por termo, erros por termo, os ids da mais recente
+      para a mais antiga ("ordem"), e os segundos até a primeira notícia e até o fim
+    """
+    googlenews, data_inicio, _ = configurar_busca(dias, fonte)
+    termos = separar_termos(termo)
+    paginas = max(1, paginas or 1)
+    loop = asyncio.get_running_loop()
+    fila = asyncio.Queue()
+    parado = threading.Event()
+
+    def buscar(termo_busca):
+        # Roda numa thread: cada notícia vai para o event loop assim que a página dela é lida,
+        # com a página seguinte já sendo baixada
+        cliente = googlenews.clone()
+        cliente.enableException(True)
+        erro = None
+        try:
+            for noticia in cliente.iter_results(termo_busca, max_pages=paginas, until=data_inicio):
+                if parado.is_set():
+                    break
+                loop.call_soon_threadsafe(fila.put_nowait, ('noticia', termo_busca, noticia))
+        except Exception as e:
+            erro = e
+        loop.call_soon_threadsafe(fila.put_nowait, ('fim', termo_busca, erro))
+
+    async def eventos():
+        inicio = time.perf_counter()
+        primeira = None
+        # Os termos esperam a vez no executor_stream, compartilhado pelos streams de todas as requisições
+        tarefas = [loop.run_in_executor(executor_stream, buscar, termo_busca) for termo_busca in termos]
+        vistas = DedupIndex()
+        urls_vistas = set()
+        enviadas = []
+        por_termo = {termo_busca: 0 for termo_busca in termos}
+        erros = {}
+        recebidas = 0
+        try:
+            terminados = 0
+            while terminados < len(termos):
+                tipo, termo_busca, valor = await fila.get()
+                if tipo == 'fim':
+                    terminados += 1
+                    if valor is not None:
+                        erros[termo_busca] = str(valor)
+                    continue
+                recebidas += 1
+                if not valor.get('link') or vistas.add(valor) is not None or not aceitar_noticia(valor, fonte, urls_vistas):
+                    continue
+                noticia = formatar_noticia(valor, termo, recebidas - 1)
+                enviadas.append((noticia, valor.timestamp))
+                por_termo[termo_busca] += 1
+                if primeira is None:
+                    primeira = time.perf_counter() - inicio
+                yield json.dumps({"tipo": "noticia", "noticia": noticia}, ensure_ascii=False) + '\n'
+
+            # As imagens chegam depois das notícias, para não atrasar a primeira
+            if buscar_imagens and enviadas:
+                imagens = await enriquecer_imagens([noticia["link"] for noticia, _ in enviadas])
+                for noticia, _ in enviadas:
+                    if imagens.get(noticia["link"]):
+                        yield json.dumps({"tipo": "imagem", "id": noticia["id"], "imagem": imagens[noticia["link"]]},
+                                         ensure_ascii=False) + '\n'
+
+            ordem = [noticia["id"] for noticia, _ in newest(enviadas, key=lambda par: par[1])]
+            yield json.dumps({
+                "tipo": "resumo",
+                "total": len(enviadas),
+                "por_termo": por_termo,
+                "erros": erros,
+                "ordem": ordem,
+                "ordenado_por": "data, da mais recente para a mais antiga; sem data por último",
+                "primeira_noticia_segundos": primeira,
+                "duracao_segundos": time.perf_counter() - inicio
+            }, ensure_ascii=False) + '\n'
+        finally:
+            # O cliente pode desconectar antes do fim: as buscas param na próxima notícia
+            parado.set()
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    return StreamingResponse(eventos(), media_type='application/x-ndjson')
@@ -0,0 +1,126 @@
+"""
+Load test of the /buscar-noticias/ endpoint on a single uvicorn worker, offline.
+
+    python -m benchmarks.load [--requests 40] [--latency 0.1] [--concurrency 1 --concurrency 8] [--output load.json]
+
+Google is replaced by a local server answering the saved pages after `latency` seconds, and every
+request searches different terms so the page cache never answers. Prints one JSON document with
+the requests per second reached at each number of concurrent clients.
+"""
+
+### MODULES
+
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import threading
+import contextlib
+import datetime
+import urllib.request
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+import api_news
+from benchmarks.run import record
+from test.stub_server import StubServer, LocalTransport, fixture_for
+
+### METHODS
+
+CONCURRENCY = [1, 2, 4, 8, 16]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def api_server():
+    """Runs api_news.app on one uvicorn worker in a background thread, yields its base URL."""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(api_news.app, host='127.0.0.1', port=port, log_level='warning', workers=1))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield 'http://127.0.0.1:{}'.format(port)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+@contextlib.contextmanager
+def offline_google(latency):
+    """Points api_news at a local server answering the saved pages, without the page cache."""
+    def handler(path):
+        time.sleep(latency)
+        return 200, {}, fixture_for(path)
+    transporte, cache = api_news.transporte, api_news.cache
+    with StubServer(handler) as google:
+        api_news.transporte = LocalTransport(google, pool_size=api_news.DOWNLOADS_PARALELOS)
+        api_news.cache = None
+        try:
+            yield google
+        finally:
+            api_news.transporte.close()
+            api_news.transporte, api_news.cache = transporte, cache
+
+
+def load(base_url, requests, concurrency, offset=0):
+    """Sends `requests` searches from `concurrency` clients, returns the seconds it took."""
+    def get(i):
+        termo = quote('startup {0} OR aporte {0}'.format(offset + i))
+        with urllib.request.urlopen('{}/buscar-noticias/?termo={}'.format(base_url, termo), timeout=60) as response:
+            response.read()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(get, range(requests)))
+    return time.perf_counter() - started
+
+
+def run(requests=40, latency=0.1, concurrency=None, repeat=1):
+    records = []
+    offset = 0
+    # GoogleNews prints the fields it could not read, keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr), offline_google(latency), api_server() as base_url:
+        load(base_url, 2, 2, offset=-2)
+        for clients in concurrency or CONCURRENCY:
+            rounds = []
+            for _ in range(repeat):
+                rounds.append(load(base_url, requests, clients, offset) / requests)
+                offset += requests
+            records.append(record('buscar_noticias_load', rounds, 1, 'requests/s', concurrency=clients,
+                                  latency=latency, workers=1, terms=2))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        'benchmarks': records,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=40, help='searches sent at each concurrency')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds the local google takes for each page')
+    parser.add_argument('--concurrency', type=int, action='append', help='concurrent clients, can be repeated')
+    parser.add_argument('--repeat', type=int, default=1, help='rounds per concurrency, the best one is reported')
+    parser.add_argument('--output', help='write the JSON there instead of stdout')
+    args = parser.parse_args(argv)
+    report = json.dumps(run(args.requests, args.latency, args.concurrency, args.repeat), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+### MAIN
+
+if __name__ == '__main__':
+    sys.exit(main())
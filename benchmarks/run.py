@@ -0,0 +1,213 @@
+"""
+Offline benchmarks over the saved pages in test/fixtures.
+
+    python -m benchmarks.run [--repeat 5] [--output bench.json] [--only parse]
+
+Prints one JSON document, so runs can be stored and compared to track regressions.
+"""
+
+### MODULES
+
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import os
+import contextlib
+import datetime
+import statistics
+import importlib.util
+
+from GoogleNews import GoogleNews, Transport, DomainFilter, HistogramObserver, process_pool
+from GoogleNews.dates import parse_date, date_spec
+from GoogleNews.item import NewsItem
+from test.stub_server import StubServer, LocalTransport, fixture_for
+
+### METHODS
+
+ENGINES = ['html.parser'] + [engine for engine in ('lxml', 'selectolax') if importlib.util.find_spec(engine)]
+
+DATES = [('há 19 horas', 'pt'), ('2 dias atrás', 'pt'), ('1 semana atrás', 'pt'), ('15 de dez. de 2024', 'pt'),
+         ('20/12/2024', 'pt'), ('3 hours ago', 'en'), ('Yesterday', 'en'), ('Sep 5, 2024', 'en'),
+         ('hace 5 minutos', 'es'), ('2 ore fa', 'it'), ('il y a 3 jours', 'fr'), ('vor 4 Stunden', 'de')]
+
+
+class MemoryTransport(Transport):
+    """Serves the fixtures from memory, so only parsing is measured."""
+
+    def __init__(self):
+        self.pages = {}
+
+    def fetch(self, url, headers):
+        if url not in self.pages:
+            self.pages[url] = fixture_for(url)
+        return self.pages[url]
+
+
+def measure(function, repeat, number):
+    """Runs function number times per round, returns the seconds of each call for every round."""
+    rounds = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        rounds.append((time.perf_counter() - started) / number)
+    return rounds
+
+
+def record(name, rounds, unit_per_call, unit, **params):
+    best = min(rounds)
+    return {
+        'name': name,
+        'params': params,
+        'seconds_per_call': {'min': best, 'median': statistics.median(rounds), 'max': max(rounds)},
+        'throughput': unit_per_call / best,
+        'unit': unit,
+        'rounds': len(rounds),
+    }
+
+
+def bench_parse(repeat):
+    records = []
+    transport = MemoryTransport()
+    for engine in ENGINES:
+        googlenews = GoogleNews(lang='pt', region='BR', transport=transport, parser=engine)
+        googlenews.search('startup')
+        def parse_search():
+            googlenews.clear()
+            googlenews.get_page(1)
+        records.append(record('get_page', measure(parse_search, repeat, 20), 1, 'pages/s', parser=engine))
+
+        filtered = GoogleNews(lang='pt', region='BR', transport=transport, parser=engine)
+        filtered.set_filter(link=DomainFilter(['exame.com']))
+        filtered.search('startup')
+        def parse_filtered():
+            filtered.clear()
+            filtered.get_page(1)
+        records.append(record('get_page', measure(parse_filtered, repeat, 20), 1, 'pages/s', parser=engine, filter='domains'))
+
+        observed = GoogleNews(lang='pt', region='BR', transport=transport, parser=engine, observer=HistogramObserver())
+        observed.search('startup')
+        def parse_observed():
+            observed.clear()
+            observed.get_page(1)
+        records.append(record('get_page', measure(parse_observed, repeat, 20), 1, 'pages/s', parser=engine, observer='histogram'))
+
+        news = GoogleNews(transport=transport, parser=engine)
+        def parse_news():
+            news.clear()
+            news.get_news('apple')
+        records.append(record('get_news', measure(parse_news, repeat, 20), 1, 'pages/s', parser=engine))
+    return records
+
+
+def bench_dates(repeat):
+    def cold():
+        date_spec.cache_clear()
+        for text, lang in DATES:
+            parse_date(text, lang)
+    def warm():
+        for text, lang in DATES:
+            parse_date(text, lang)
+    warm()
+    return [record('parse_date', measure(cold, repeat, 50), len(DATES), 'dates/s', cache='cold'),
+            record('parse_date', measure(warm, repeat, 200), len(DATES), 'dates/s', cache='warm')]
+
+
+def bench_sort(repeat, size=10000):
+    now = datetime.datetime.now()
+    items = [NewsItem('title {}'.format(i), 'media', '', now - datetime.timedelta(minutes=(i * 7919) % size))
+             for i in range(size)]
+    googlenews = GoogleNews(transport=MemoryTransport())
+    results = googlenews.results()
+    def sort():
+        results[:] = items
+        googlenews.results(sort=True)
+    def top():
+        results[:] = items
+        googlenews.results(sort=True, limit=100)
+    return [record('results_sort', measure(sort, repeat, 5), size, 'items/s', items=size),
+            record('results_sort', measure(top, repeat, 5), size, 'items/s', items=size, limit=100)]
+
+
+def bench_end_to_end(repeat, pages=5):
+    records = []
+    with StubServer() as server:
+        for concurrency in (1, pages):
+            transport = LocalTransport(server)
+            def search():
+                googlenews = GoogleNews(lang='pt', region='BR', transport=transport)
+                googlenews.search('startup', pages=pages, concurrency=concurrency)
+            search()
+            records.append(record('search_end_to_end', measure(search, repeat, 3), pages, 'pages/s',
+                                  pages=pages, concurrency=concurrency, server='local replay'))
+            transport.close()
+    return records
+
+
+def bench_parse_pool(repeat, pages=16):
+    """Pages parsed per second by a multi-page search, in the calling thread and in process pools of growing size."""
+    records = []
+    transport = MemoryTransport()
+    cores = os.cpu_count() or 1
+    sizes = sorted(set([1, 2, 4, cores]))
+    for workers in [None] + sizes:
+        pool = process_pool(workers) if workers else None
+        googlenews = GoogleNews(lang='pt', region='BR', transport=transport)
+        googlenews.set_parse_pool(pool)
+        def search():
+            googlenews.clear()
+            googlenews.search('startup', pages=pages, concurrency=pages)
+        search()
+        records.append(record('search_parse_pool', measure(search, repeat, 3), pages, 'pages/s',
+                              pages=pages, workers=workers or 0, cores=cores))
+        if pool is not None:
+            pool.shutdown()
+    return records
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'parse_pool': bench_parse_pool,
+    'dates': bench_dates,
+    'sort': bench_sort,
+    'end_to_end': bench_end_to_end,
+}
+
+
+def run(repeat=5, only=None):
+    records = []
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        # GoogleNews prints the fields it could not read, keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            records.extend(bench(repeat))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        'benchmarks': records,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='rounds per benchmark, the best one is reported')
+    parser.add_argument('--output', help='write the JSON there instead of stdout')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='run only these benchmarks')
+    args = parser.parse_args(argv)
+    report = json.dumps(run(args.repeat, args.only), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+### MAIN
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,14 @@
-from GoogleNews import GoogleNews
+from GoogleNews import GoogleNews, MemoryWatermarkStore, DedupIndex
 from datetime import datetime, timedelta
-import re
-
-def converter_data_relativa(data_str):
-    hoje = datetime.now()
-    
-    if not data_str:
-        return None
-        
-    if 'horas' in data_str or 'hora' in data_str:
-        horas = re.findall(r'\d+', data_str)
-        if horas:
-            return hoje - timedelta(hours=int(horas[0]))
-    elif 'dias' in data_str or 'dia' in data_str:
-        dias = re.findall(r'\d+', data_str)
-        if dias:
-            return hoje - timedelta(days=int(dias[0]))
-    elif 'semana' in data_str or 'semanas' in data_str:
-        semanas = re.findall(r'\d+', data_str)
-        if semanas:
-            return hoje - timedelta(weeks=int(semanas[0]))
-    
-    return None
 
 class NoticiasBuscador:
-    def __init__(self, idioma='pt-BR', regiao='BR'):
-        self.googlenews = GoogleNews(lang=idioma, region=regiao)
+    def __init__(self, idioma='pt-BR', regiao='BR', cache=None, marcas=None):
+        self.googlenews = GoogleNews(lang=idioma, region=regiao, cache=cache)
+        # O que cada busca já retornou, para buscar_novas. Um SQLiteWatermarkStore mantém entre execuções
+        self.marcas = marcas if marcas is not None else MemoryWatermarkStore()
+        # Notícias já retornadas por buscar_novas, para não repetir a mesma notícia
+        # que volta com outro link ou reproduzida por outro veículo
+        self.vistas = DedupIndex()
         
     def buscar_noticias(self, termo_busca, dias_atras=7, quantidade_paginas=2):
         """
@@ -34,7 +17,7 @@ class NoticiasBuscador:
         Args:
             termo_busca (str): Termo para pesquisar
             dias_atras (int): Quantidade de dias para buscar no passado
-            quantidade_paginas (int): Número de páginas de resultados
+            quantidade_paginas (int): Número máximo de páginas de resultados
             
         Returns:
             list: Lista de notícias encontradas
@@ -53,16 +36,37 @@ class NoticiasBuscador:
         # Configura o período de busca
         self.googlenews.set_time_range(data_inicio_str, data_fim_str)
         
-        # Realiza a busca
-        self.googlenews.search(termo_busca)
-        
-        # Coleta resultados de páginas adicionais
-        for i in range(2, quantidade_paginas + 1):
-            self.googlenews.get_page(i)
+        # Busca página a página até a primeira com notícias de antes do período,
+        # baixando a próxima página enquanto a atual é lida
+        self.googlenews.fetch_until(data_inicio, max_pages=quantidade_paginas, key=termo_busca)
             
         # Retorna os resultados ordenados por data
         return self.googlenews.results(sort=True)
 
+    def buscar_novas(self, termo_busca, dias_atras=7, quantidade_paginas=2):
+        """
+        Busca só as notícias que ainda não vieram nas chamadas anteriores com o mesmo termo
+        
+        Args:
+            termo_busca (str): Termo para pesquisar
+            dias_atras (int): Quantidade de dias para buscar no passado
+            quantidade_paginas (int): Número máximo de páginas; a busca para na primeira
+                página que chega a notícias já vistas, normalmente a primeira
+            
+        Returns:
+            list: Lista das notícias novas, da mais recente para a mais antiga
+        """
+        self.googlenews.clear()
+        
+        data_fim = datetime.now()
+        data_inicio = data_fim - timedelta(days=dias_atras)
+        self.googlenews.set_time_range(data_inicio.strftime('%m/%d/%Y'), data_fim.strftime('%m/%d/%Y'))
+        
+        # A marca é do termo com o período em dias, não das datas, para valer de um dia para o outro
+        nome = f'{termo_busca} {dias_atras}'
+        novas = self.googlenews.poll(termo_busca, self.marcas, pages=quantidade_paginas, name=nome)
+        return [noticia for noticia in novas if self.vistas.add(noticia) is None]
+
 def formatar_noticia(noticia):
     """Formata uma notícia para exibição"""
     return f"""
@@ -106,12 +110,10 @@ if __name__ == "__main__":
         data_fim = datetime.now()
         data_inicio = data_fim - timedelta(days=dias_atras)
 
+        # timestamp já vem calculado no parsing; as notícias sem data ficam de fora
         for noticia in noticias:
-            data_str = noticia.get('date')
-            if data_str:
-                data_noticia = converter_data_relativa(data_str)
-                if data_noticia and data_inicio <= data_noticia <= data_fim:
-                    noticias_filtradas.append(noticia)
+            if data_inicio.timestamp() <= noticia.timestamp <= data_fim.timestamp():
+                noticias_filtradas.append(noticia)
 
         # Exibição dos resultados
         if noticias_filtradas:
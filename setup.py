@@ -12,8 +12,9 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/Iceloof/GoogleNews",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=('benchmarks', 'benchmarks.*', 'test', 'test.*')),
     install_requires=['beautifulsoup4','dateparser','python-dateutil'],
+    extras_require={'lxml': ['lxml'], 'selectolax': ['selectolax']},
     classifiers=[
         "Programming Language :: Python :: 3.6",
         "License :: OSI Approved :: MIT License",
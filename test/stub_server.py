@@ -0,0 +1,163 @@
+
+### MODULES
+
+import os
+import sys
+import threading
+import importlib.util
+from socketserver import ThreadingMixIn
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from GoogleNews import Transport, PooledTransport
+
+### METHODS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# the API, api_news, needs Python 3.7, fastapi and requests; the library does not
+API_AVAILABLE = sys.version_info >= (3, 7) and all(importlib.util.find_spec(module) for module in ('fastapi', 'requests'))
+
+def read_fixture(name):
+  with open(os.path.join(FIXTURES, name), 'rb') as f:
+    return f.read()
+
+def search_fixture(path):
+  """Alternates the two saved search pages by the start= parameter."""
+  start = int(path.split('start=')[-1].split('&')[0]) if 'start=' in path else 0
+  return read_fixture('search_page2.html' if start % 20 else 'search_page1.html')
+
+def fixture_for(url):
+  """Picks the saved page matching a google.com or news.google.com URL (or path, once rewritten to a StubServer)."""
+  if '/topics/' in url:
+    return read_fixture('news_topic.html')
+  if 'tbm=nws' not in url:
+    return read_fixture('news_search.html')
+  if 'hl=en' in url:
+    return read_fixture('search_en.html')
+  return search_fixture(url)
+
+RESULT = ('<div class="SoaBEf"><div class="xuvV6b BGxR7d"><a jsname="YKoRaf" class="WlydOe" '
+          'href="/url?esrc=s&amp;q=&amp;rct=j&amp;sa=U&amp;url={link}&amp;ved={ved}&amp;usg=AOvVaw0" data-ved="{ved}">'
+          '<div class="SoAPf"><div class="MgUUmf NUnG9d"><div class="Z6"><img alt="" src="data:image/gif;base64,R0lGOD"></div>'
+          '<div class="CEMjEf"><span>{media}</span></div></div></div><div class="iRPxbe"><div role="heading" aria-level="3">'
+          '<h3 class="r">{title}</h3></div><div class="UqSP2b"><div class="GI74Re nDgy9d"><div><div>{desc}</div></div></div>'
+          '<div class="OSrXXb rbYSKb LfVVr"><span>{date}</span></div></div></div></a></div></div>')
+
+def search_page(results, start=0):
+  """
+  Builds a google.com news results page from (title, link, media, date) tuples,
+  with the pager link when start is given for the next page.
+  """
+  body = ''.join(RESULT.format(title=title, link=link, media=media, date=date, desc='Resumo de ' + title + '.',
+                               ved='2ahUKE{}x{}'.format(start, i))
+                 for i, (title, link, media, date) in enumerate(results))
+  pager = '<a data-ved="0ahUKEpager" href="/search?q=x&amp;tbm=nws&amp;start={}" id="pnnext"><span>Next</span></a>'.format(start + 10)
+  return ('<html><body><div id="result-stats">About {} results</div><div id="rso">{}</div>{}</body></html>'
+          .format(len(results), body, pager)).encode('utf-8')
+
+### CLASSEs
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+  """http.server.ThreadingHTTPServer, which only exists from Python 3.7."""
+  daemon_threads = True
+
+
+class FeedTransport(Transport):
+  """
+  Serves google.com news results from a list of (title, link, media, date), newest first, 10 per page.
+  Adding results at the front of feed plays news arriving between two searches.
+  """
+
+  def __init__(self, feed=()):
+    self.feed = list(feed)
+    self.urls = []
+
+  def fetch(self, url, headers):
+    self.urls.append(url)
+    start = int(url.split('start=')[-1].split('&')[0]) if 'start=' in url else 0
+    return search_page(self.feed[start:start + 10], start)
+
+
+class FixtureTransport(Transport):
+  """Answers every request with a saved page, without any network."""
+
+  def __init__(self):
+    self.urls = []
+
+  def fetch(self, url, headers):
+    self.urls.append(url)
+    return fixture_for(url)
+
+
+class StubServer:
+  """
+  In-process HTTP/1.1 server standing in for google.com.
+  Answers with handler(path) -> (status, headers, body) and counts the connections it accepted.
+  An 'X-Drop' header makes it hang up after the response without announcing it, like an idle keep-alive timeout.
+  """
+
+  def __init__(self, handler=None):
+    self.handler = handler or (lambda path: (200, {}, fixture_for(path)))
+    self.connections = 0
+    self.requests = []
+    self.lock = threading.Lock()
+    stub = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def setup(self):
+        super().setup()
+        with stub.lock:
+          stub.connections += 1
+
+      def handle(self):
+        try:
+          super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+          # the client read what it needed and hung up
+          pass
+
+      def do_GET(self):
+        with stub.lock:
+          stub.requests.append(self.path)
+        status, headers, body = stub.handler(self.path)
+        headers = dict(headers)
+        if headers.pop('X-Drop', None):
+          self.close_connection = True
+        self.send_response(status)
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, *args):
+        pass
+
+    self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    self.url = 'http://127.0.0.1:{}'.format(self.httpd.server_address[1])
+    self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+  def __enter__(self):
+    self.thread.start()
+    return self
+
+  def __exit__(self, *args):
+    self.httpd.shutdown()
+    self.httpd.server_close()
+
+
+class LocalTransport(PooledTransport):
+  """Sends the requests meant for google.com to a StubServer instead."""
+
+  # the stub doesn't need to be spared
+  rate_limited = False
+
+  def __init__(self, server, **kwargs):
+    super().__init__(**kwargs)
+    self.server = server
+
+  def fetch(self, url, headers):
+    for host in ('https://www.google.com', 'https://news.google.com'):
+      url = url.replace(host, self.server.url)
+    return super().fetch(url, headers)
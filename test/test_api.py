@@ -0,0 +1,359 @@
+
+### MODULES
+
+import os
+import time
+import json
+import tempfile
+import asyncio
+import datetime
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from GoogleNews import GoogleNews, Transport, SQLiteArchive, clean_url
+from test.stub_server import read_fixture, StubServer, FeedTransport, API_AVAILABLE
+
+if not API_AVAILABLE:
+  raise unittest.SkipTest('the API needs Python 3.7, fastapi and requests')
+
+import api_news
+
+### METHODS
+
+DELAY = 0.2
+
+class TermTransport(Transport):
+  """Every term gets its own saved page, after DELAY seconds."""
+
+  PAGES = {'startup': 'search_page1.html', 'aporte': 'search_page2.html', 'rodada': 'search_page1.html'}
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.active = 0
+    self.peak = 0
+    self.calls = 0
+
+  def fetch(self, url, headers):
+    with self.lock:
+      self.calls += 1
+      self.active += 1
+      self.peak = max(self.peak, self.active)
+    time.sleep(DELAY)
+    with self.lock:
+      self.active -= 1
+    term = unquote(url.split('q=')[1].split('&')[0])
+    return read_fixture(self.PAGES.get(term, 'search_page2.html'))
+
+def serial_search(googlenews, termos):
+  """buscar_com_termos_multiplos_async before the terms were fetched in parallel."""
+  todas_noticias = []
+  urls_vistas = set()
+  for termo in [termo.strip() for termo in termos.split('OR')]:
+    googlenews.search(termo)
+    for noticia in googlenews.result():
+      url = noticia.canonical
+      if url and url not in urls_vistas:
+        urls_vistas.add(url)
+        todas_noticias.append(noticia)
+    googlenews.clear()
+  return todas_noticias
+
+### TEST
+
+class MultipleTermsTest(unittest.TestCase):
+
+  def testSameOutputAsSerial(self):
+    termos = 'startup OR aporte OR rodada OR outro'
+    expected = serial_search(GoogleNews(lang='pt', region='BR', transport=TermTransport()), termos)
+    transport = TermTransport()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=transport)
+    started = time.time()
+    noticias = asyncio.run(api_news.buscar_com_termos_multiplos_async(googlenews, termos, datetime.datetime(2000, 1, 1)))
+    elapsed = time.time() - started
+    # relative dates are computed from now(), leave the datetimes out
+    self.assertEqual([(n['title'], n['link'], n['date']) for n in noticias], [(n['title'], n['link'], n['date']) for n in expected])
+    self.assertEqual(transport.peak, 4)
+    self.assertLess(elapsed, 3 * DELAY)
+    self.assertEqual(googlenews.results(), [])
+    print('OR terms fetched in parallel, merged in term order ')
+
+  def testCloneHasItsOwnResults(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=TermTransport())
+    googlenews.search('startup')
+    other = googlenews.clone()
+    self.assertEqual(other.results(), [])
+    self.assertIs(other.transport, googlenews.transport)
+    titles = list(googlenews.get_texts())
+    other.search('aporte')
+    self.assertEqual(list(googlenews.get_texts()), titles)
+    self.assertNotEqual(list(other.get_texts()), titles)
+
+ARTICLE = (b'<html><head><title>x</title><meta property="og:image" content="https://cdn.com/capa.jpg"></head>'
+           b'<body>' + b'<p>texto</p>' * 200000 + b'</body></html>')
+
+def article_handler(path):
+  if path.startswith('/lento'):
+    time.sleep(1)
+  if path.startswith('/sem-meta'):
+    return 200, {'Content-Type': 'text/html'}, b'<html><head></head><body><img src="/logo.png"><img src="/fotos/1.jpg"></body></html>'
+  return 200, {'Content-Type': 'text/html'}, ARTICLE
+
+
+class ImageEnrichmentTest(unittest.TestCase):
+
+  def setUp(self):
+    api_news.cache_imagens.clear()
+
+  def testReadsOnlyTheHead(self):
+    with StubServer(article_handler) as server:
+      started = time.time()
+      self.assertEqual(api_news.extrair_imagem_da_pagina(server.url + '/noticia'), 'https://cdn.com/capa.jpg')
+      self.assertLess(time.time() - started, 0.5)
+      self.assertEqual(api_news.extrair_imagem_da_pagina(server.url + '/sem-meta'), server.url + '/fotos/1.jpg')
+    print('Image read from the page head ')
+
+  def testCached(self):
+    with StubServer(article_handler) as server:
+      api_news.extrair_imagem_da_pagina(server.url + '/noticia')
+      api_news.extrair_imagem_da_pagina(server.url + '/noticia')
+      self.assertEqual(len(server.requests), 1)
+
+  def testTimeBudget(self):
+    with StubServer(article_handler) as server:
+      urls = [server.url + '/noticia/{}'.format(i) for i in range(6)] + [server.url + '/lento']
+      started = time.time()
+      imagens = asyncio.run(api_news.enriquecer_imagens(urls, limite=4, orcamento=0.5))
+      self.assertLess(time.time() - started, 0.9)
+      self.assertEqual(sorted(imagens), sorted(urls[:-1]))
+      self.assertTrue(all(imagem == 'https://cdn.com/capa.jpg' for imagem in imagens.values()))
+    print('Images found within the time budget ')
+
+class CoalescingTest(unittest.TestCase):
+
+  def setUp(self):
+    self.transporte, self.cache = api_news.transporte, api_news.cache
+    api_news.transporte = TermTransport()
+    api_news.cache = None
+
+  def tearDown(self):
+    api_news.transporte, api_news.cache = self.transporte, self.cache
+
+  def testIdenticalQueriesShareOneFetch(self):
+    async def clients():
+      return await asyncio.gather(api_news.buscar_noticias('startup OR aporte', paginas=1),
+                                  api_news.buscar_noticias('aporte OR  Startup', paginas=1),
+                                  api_news.buscar_noticias('startup OR aporte', paginas=1))
+    coalesced = api_news.buscas_google.coalescidas
+    respostas = asyncio.run(clients())
+    self.assertEqual(api_news.transporte.calls, 2)
+    self.assertEqual(api_news.buscas_google.coalescidas - coalesced, 4)
+    self.assertEqual(respostas[0], respostas[2])
+    self.assertEqual({n['link'] for n in respostas[0]}, {n['link'] for n in respostas[1]})
+    self.assertEqual(api_news.buscas_google.em_andamento, {})
+    print('Identical concurrent queries coalesced ')
+
+  def testDifferentPeriodsAreNotShared(self):
+    async def clients():
+      return await asyncio.gather(api_news.buscar_noticias('startup', dias=7, paginas=1), api_news.buscar_noticias('startup', dias=30, paginas=1))
+    asyncio.run(clients())
+    self.assertEqual(api_news.transporte.calls, 2)
+
+  def testBlockedIsReported(self):
+    class Captcha(Transport):
+      def fetch(self, url, headers):
+        return b'<html><form id="captcha-form"></form></html>'
+    api_news.transporte = Captcha()
+    with self.assertRaises(api_news.HTTPException) as raised:
+      asyncio.run(api_news.buscar_noticias('startup OR aporte'))
+    self.assertEqual(raised.exception.status_code, 503)
+    print('Blocked searches answered with 503 ')
+
+  def testMetrics(self):
+    metricas = asyncio.run(api_news.metricas())
+    self.assertIn('# TYPE noticias_buscas_coalescidas_total counter', metricas)
+    self.assertRegex(metricas, r'noticias_buscas_termos_total \d+')
+    self.assertIn('noticias_google_bloqueios_total', metricas)
+
+  def testPhaseHistograms(self):
+    asyncio.run(api_news.buscar_noticias('startup', paginas=1))
+    metricas = asyncio.run(api_news.metricas())
+    self.assertIn('# TYPE noticias_fase_segundos histogram', metricas)
+    self.assertRegex(metricas, r'noticias_fase_segundos_bucket\{fase="parse",le="\+Inf"\} [1-9]')
+    self.assertRegex(metricas, r'noticias_pagina_segundos_count [1-9]')
+    self.assertRegex(metricas, r'noticias_resultados_total [1-9]')
+
+class SortingTest(unittest.TestCase):
+
+  def setUp(self):
+    self.transporte, self.cache = api_news.transporte, api_news.cache
+    api_news.transporte = TermTransport()
+    api_news.cache = None
+
+  def tearDown(self):
+    api_news.transporte, api_news.cache = self.transporte, self.cache
+
+  def testNewestFirstWithLimit(self):
+    todas = asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=3650, paginas=1))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=TermTransport())
+    googlenews.search('startup')
+    googlenews.search('aporte')
+    datas = {clean_url(item.link): item.timestamp for item in googlenews.results()}
+    ordem = [datas[noticia['link']] for noticia in todas]
+    self.assertEqual(ordem, sorted(ordem, reverse=True))
+    limitadas = asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=3650, paginas=1, limite=3))
+    self.assertEqual(limitadas, todas[:3])
+    print('Newest results first, limited with a heap ')
+
+  def testOriginalLinkIsReturned(self):
+    links = ['http://www.bloomberglinea.com.br/startups/x/', 'https://amp.exame.com/negocios/noticia/amp',
+             'https://m.infomoney.com.br/x?output=amp', 'https://valor.globo.com/noticia?src=home&id=3']
+    api_news.transporte = FeedTransport([('Notícia {} sobre startups'.format(i), link + '&ved=2ahUKE&usg=AOvVaw0', 'Fonte', 'há 1 hora')
+                                         for i, link in enumerate(links)])
+    noticias = asyncio.run(api_news.buscar_noticias('startup', paginas=1))
+    self.assertEqual(sorted(noticia['link'] for noticia in noticias), sorted(links))
+
+class ArchiveTest(unittest.TestCase):
+
+  def setUp(self):
+    self.transporte, self.cache, self.arquivo = api_news.transporte, api_news.cache, api_news.arquivo
+    self.pasta = tempfile.TemporaryDirectory()
+    api_news.transporte = TermTransport()
+    api_news.cache = None
+    api_news.arquivo = SQLiteArchive(os.path.join(self.pasta.name, 'arquivo.db'))
+
+  def tearDown(self):
+    api_news.transporte, api_news.cache, api_news.arquivo = self.transporte, self.cache, self.arquivo
+    self.pasta.cleanup()
+
+  def testRepeatedWindowFromTheArchive(self):
+    # the saved pages reach back a week
+    primeira = asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=5, paginas=1))
+    self.assertEqual(api_news.transporte.calls, 2)
+    segunda = asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=5, paginas=1))
+    self.assertEqual(api_news.transporte.calls, 2)
+    self.assertEqual(segunda, primeira)
+    # a page doesn't reach back ten years, the rest of the window is still asked for
+    asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=3650, paginas=1))
+    self.assertEqual(api_news.transporte.calls, 4)
+    print('Repeated window answered from the archive ')
+
+  def testFullTextSearch(self):
+    noticias = asyncio.run(api_news.buscar_noticias('startup', dias=3650, paginas=1))
+    palavra = noticias[0]['titulo'].split()[0]
+    encontradas = asyncio.run(api_news.buscar_arquivo(palavra, dias=3650))
+    self.assertIn(noticias[0]['link'], [noticia['link'] for noticia in encontradas])
+    api_news.arquivo = None
+    with self.assertRaises(api_news.HTTPException) as raised:
+      asyncio.run(api_news.buscar_arquivo(palavra))
+    self.assertEqual(raised.exception.status_code, 404)
+
+class BatchTest(unittest.TestCase):
+
+  def setUp(self):
+    self.transporte, self.cache = api_news.transporte, api_news.cache
+    api_news.transporte = TermTransport()
+    api_news.cache = None
+
+  def tearDown(self):
+    api_news.transporte, api_news.cache = self.transporte, self.cache
+
+  def testNdjsonLinePerTerm(self):
+    async def ler():
+      resposta = await api_news.buscar_noticias_lote(api_news.Lote(termos=['startup', 'aporte', 'rodada'], dias=3650))
+      self.assertEqual(resposta.media_type, 'application/x-ndjson')
+      return [chunk async for chunk in resposta.body_iterator]
+    started = time.time()
+    linhas = [json.loads(linha) for linha in asyncio.run(ler())]
+    self.assertLess(time.time() - started, 3 * DELAY)
+    self.assertEqual(sorted(linha['termo'] for linha in linhas), ['aporte', 'rodada', 'startup'])
+    separadas = {termo: asyncio.run(api_news.buscar_noticias(termo, dias=3650, paginas=1)) for termo in ('startup', 'aporte')}
+    for linha in linhas:
+      self.assertIsNone(linha['erro'])
+      if linha['termo'] in separadas:
+        self.assertEqual(linha['noticias'], separadas[linha['termo']])
+    print('Batch answered with one NDJSON line per term ')
+
+  def testBoundedBySharedExecutor(self):
+    executor = api_news.executor_google
+    api_news.executor_google = ThreadPoolExecutor(max_workers=2)
+    async def ler():
+      resposta = await api_news.buscar_noticias_lote(api_news.Lote(termos=['startup', 'aporte', 'rodada', 'outro'], dias=3650))
+      return [chunk async for chunk in resposta.body_iterator]
+    try:
+      self.assertEqual(len(asyncio.run(ler())), 4)
+    finally:
+      api_news.executor_google.shutdown()
+      api_news.executor_google = executor
+    self.assertEqual(api_news.transporte.peak, 2)
+
+class StreamTest(unittest.TestCase):
+
+  def setUp(self):
+    self.transporte, self.cache = api_news.transporte, api_news.cache
+    api_news.transporte = TermTransport()
+    api_news.cache = None
+
+  def tearDown(self):
+    api_news.transporte, api_news.cache = self.transporte, self.cache
+
+  def read(self, *args, **kwargs):
+    async def ler():
+      resposta = await api_news.buscar_noticias_stream(*args, **kwargs)
+      inicio, eventos = time.perf_counter(), []
+      async for linha in resposta.body_iterator:
+        eventos.append((time.perf_counter() - inicio, json.loads(linha)))
+      return eventos
+    return asyncio.run(ler())
+
+  def testSameNewsAsTheList(self):
+    eventos = self.read('startup OR aporte', dias=3650, paginas=1)
+    noticias = [evento['noticia'] for _, evento in eventos if evento['tipo'] == 'noticia']
+    resumo = eventos[-1][1]
+    self.assertEqual(resumo['tipo'], 'resumo')
+    self.assertEqual(resumo['total'], len(noticias))
+    self.assertEqual(resumo['erros'], {})
+    links = {noticia['id']: noticia['link'] for noticia in noticias}
+    lista = asyncio.run(api_news.buscar_noticias('startup OR aporte', dias=3650, paginas=1))
+    self.assertEqual([links[id] for id in resumo['ordem']], [noticia['link'] for noticia in lista])
+    print('Streamed the same news, with their order in the summary ')
+
+  def testFirstNewsBeforeTheSlowestTerm(self):
+    class SlowTerm(TermTransport):
+      def fetch(self, url, headers):
+        if 'q=rodada' in url:
+          time.sleep(1)
+        return super().fetch(url, headers)
+    api_news.transporte = SlowTerm()
+    eventos = self.read('startup OR rodada', dias=3650, paginas=1)
+    self.assertLess(eventos[0][0], 0.8)
+    self.assertGreater(eventos[-1][0], 1)
+    self.assertLess(eventos[-1][1]['primeira_noticia_segundos'], 0.8)
+
+  def testErrorsInTheSummary(self):
+    class Captcha(Transport):
+      def fetch(self, url, headers):
+        return b'<html><form id="captcha-form"></form></html>'
+    api_news.transporte = Captcha()
+    resumo = self.read('startup', dias=3650)[-1][1]
+    self.assertEqual(resumo['total'], 0)
+    self.assertIn('captcha', resumo['erros']['startup'])
+
+  def testOwnThreads(self):
+    # the streams leave the threads of the other searches alone, and share a limit of their own
+    executor_google, executor_stream = api_news.executor_google, api_news.executor_stream
+    api_news.executor_google = ThreadPoolExecutor(max_workers=1)
+    api_news.executor_google.shutdown()
+    api_news.executor_stream = ThreadPoolExecutor(max_workers=2)
+    try:
+      resumo = self.read('startup OR aporte OR rodada OR outro', dias=3650, paginas=1)[-1][1]
+    finally:
+      api_news.executor_stream.shutdown()
+      api_news.executor_google, api_news.executor_stream = executor_google, executor_stream
+    self.assertEqual(resumo['erros'], {})
+    self.assertEqual(api_news.transporte.peak, 2)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
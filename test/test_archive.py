@@ -0,0 +1,236 @@
+### MODULES
+
+import os
+import time
+import datetime
+import tempfile
+import unittest
+from GoogleNews import GoogleNews, NewsItem, SQLiteArchive, DomainFilter, HistogramObserver, DedupIndex
+from GoogleNews.archive import uncovered
+from test.stub_server import FeedTransport, search_page
+
+### METHODS
+
+def news(first, last):
+  """Results first..last-1, the highest number being the newest."""
+  return [('Notícia {} da inteligência'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há {} minutos'.format(1000 - i))
+          for i in reversed(range(first, last))]
+
+def item(title, link, media='Exame', hours=1, desc=''):
+  return NewsItem(title, media, 'há {} horas'.format(hours), datetime.datetime.now() - datetime.timedelta(hours=hours), desc, link)
+
+### CLASSEs
+
+class DatedFeedTransport(FeedTransport):
+  """FeedTransport of (title, link, media, hours ago) honouring the cd_min/cd_max days of the url, like google."""
+
+  def fetch(self, url, headers):
+    self.urls.append(url)
+    now = datetime.datetime.now()
+    results = [(title, link, media, 'há {} horas'.format(hours)) for title, link, media, hours in self.feed]
+    if 'cd_min:' in url:
+      first, last = (datetime.datetime.strptime(url.split(bound)[1][:10], '%m/%d/%Y').date() for bound in ('cd_min:', 'cd_max:'))
+      results = [result for result, (_, _, _, hours) in zip(results, self.feed)
+                 if first <= (now - datetime.timedelta(hours=hours)).date() <= last]
+    start = int(url.split('start=')[-1].split('&')[0]) if 'start=' in url else 0
+    return search_page(results[start:start + 10], start)
+
+### TEST
+
+class ArchiveTest(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.TemporaryDirectory()
+    self.archive = SQLiteArchive(os.path.join(self.folder.name, 'archive.db'))
+
+  def tearDown(self):
+    self.folder.cleanup()
+
+  def testUpsertByCanonicalLink(self):
+    first = item('Startup capta R$ 10 mi', 'https://www.exame.com/a?utm_source=x', hours=2)
+    self.archive.add([first], 'startup')
+    self.archive.add([item('Startup capta R$ 12 mi', 'https://exame.com/a/', hours=30)], 'startup')
+    self.assertEqual(len(self.archive), 1)
+    stored, = self.archive.results('startup', 0)
+    self.assertEqual(stored.title, 'Startup capta R$ 12 mi')
+    # the first date that could be converted is kept, google's later '30 horas' is less precise;
+    # it is read as an absolute date, 'há 2 horas' would be wrong the next day
+    self.assertEqual(stored.datetime, first.datetime)
+    self.assertEqual(stored.date, first.datetime.strftime('%Y-%m-%d %H:%M'))
+    self.assertEqual(stored.canonical, 'https://exame.com/a')
+    print('Articles upserted by canonical link ')
+
+  def testMatch(self):
+    self.archive.add([item('Inteligência artificial na saúde', 'https://exame.com/1', hours=1),
+                      item('Fintech recebe aporte', 'https://valor.globo.com/2', media='Valor', hours=2,
+                           desc='Rodada liderada por fundo de inteligência artificial'),
+                      item('Varejo cresce', 'https://exame.com/3', hours=3)])
+    self.assertEqual([found.link for found in self.archive.match('inteligencia ARTIFICIAL')],
+                     ['https://exame.com/1', 'https://valor.globo.com/2'])
+    self.assertEqual([found.media for found in self.archive.match('inteligencia', media='valor')], ['Valor'])
+    since = time.time() - 1.5 * 3600
+    self.assertEqual(len(self.archive.match('inteligencia', start=since)), 1)
+    # quotes are searched as text, not parsed as FTS5 syntax
+    self.assertEqual(len(self.archive.match('"aporte')), 1)
+    print('Full text search without accents ')
+
+  def testUncovered(self):
+    self.assertEqual(uncovered([], 0, 100), [(0, 100)])
+    self.assertEqual(uncovered([(0, 60)], 0, 100), [(60, 100)])
+    self.assertEqual(uncovered([(10, 20), (15, 40), (70, 80)], 0, 100), [(80, 100), (40, 70), (0, 10)])
+    self.assertEqual(uncovered([(0, 95)], 0, 100, min_gap=10), [])
+
+  def testCoverageIsMerged(self):
+    self.archive.cover('startup', 0, 50)
+    self.archive.cover('startup', 40, 90)
+    self.archive.cover('startup', 95, 100)
+    self.assertEqual(self.archive.gaps('startup', 0, 100), [(90, 95)])
+    self.assertEqual(self.archive.gaps('fintech', 0, 100), [(0, 100)])
+
+  def testOffsetsFollowTheCoverage(self):
+    self.archive.cover('startup', 50, 100)
+    self.archive.set_offset('startup', 50, 12)
+    self.assertEqual(self.archive.offset('startup', 50), 12)
+    self.assertEqual(self.archive.offset('fintech', 50), 0)
+    # once covered, a retrieval no longer starts there
+    self.archive.cover('startup', 30, 50)
+    self.archive.set_offset('startup', 30, 4)
+    self.assertEqual(self.archive.offset('startup', 50), 0)
+    self.assertEqual(self.archive.offset('startup', 30), 4)
+
+  def testPrune(self):
+    self.archive.add([item('Antiga', 'https://exame.com/1', hours=200), item('Nova', 'https://exame.com/2')], 'startup')
+    self.archive.cover('startup', 0, time.time())
+    self.assertEqual(self.archive.prune(time.time() - 7 * 24 * 3600), 1)
+    self.assertEqual([found.title for found in self.archive.results('startup', 0)], ['Nova'])
+    self.assertEqual(self.archive.gaps('startup', 0, 10), [(0, 10)])
+
+
+class SearchArchivedTest(unittest.TestCase):
+
+  def setUp(self):
+    self.folder = tempfile.TemporaryDirectory()
+    self.archive = SQLiteArchive(os.path.join(self.folder.name, 'archive.db'))
+    self.since = datetime.datetime.now() - datetime.timedelta(days=7)
+
+  def tearDown(self):
+    self.folder.cleanup()
+
+  def client(self, feed, observer=None):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed, observer=observer)
+    googlenews.set_archive(self.archive)
+    return googlenews
+
+  def testOnlyTheHeadIsFetched(self):
+    feed = FeedTransport(news(0, 25))
+    googlenews = self.client(feed)
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=5), 4)
+    self.assertEqual(len(googlenews.results()), 25)
+    # the window was just retrieved: the archive answers alone
+    feed.urls = []
+    googlenews.clear()
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=5, fresh=300), 0)
+    self.assertEqual(feed.urls, [])
+    self.assertEqual(len(googlenews.results()), 25)
+    # news arrived since: one page for the head of the window
+    feed.feed[:0] = news(25, 28)
+    googlenews.clear()
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=5), 1)
+    self.assertEqual(len(feed.urls), 1)
+    titles = [found.title for found in googlenews.results()]
+    self.assertEqual(titles[:3], ['Notícia 27 da inteligência', 'Notícia 26 da inteligência', 'Notícia 25 da inteligência'])
+    self.assertEqual(len(titles), 28)
+    print('Archived search fetches only the uncovered head ')
+
+  def testSearchesAndFiltersHaveTheirOwnCoverage(self):
+    feed = FeedTransport(news(0, 5))
+    googlenews = self.client(feed)
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=2, fresh=300), 2)
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=2, fresh=300), 0)
+    googlenews.set_filter(link=DomainFilter(['exame.com']))
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=2, fresh=300), 2)
+    self.assertEqual(googlenews.search_archived('fintech', self.since, pages=2, fresh=300), 2)
+    self.assertIn("DomainFilter(['exame.com'])", googlenews.archive_key('startup'))
+    self.assertEqual(len(self.archive), 5)
+
+  def testPagesBoundTheRetrieval(self):
+    feed = FeedTransport(news(0, 25))
+    googlenews = self.client(feed)
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=1), 1)
+    self.assertEqual(len(googlenews.results()), 10)
+    # the page ended before the window did: only the time down to its oldest result counts as retrieved
+    oldest = min(found.timestamp for found in googlenews.results())
+    self.assertEqual(self.archive.gaps(googlenews.archive_key('startup'), self.since.timestamp(), time.time(), 300),
+                     [(self.since.timestamp(), oldest)])
+    googlenews.clear()
+    # the first page is archived already, the retrieval goes on from the second one
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=5, fresh=300), 3)
+    self.assertEqual(len(googlenews.results()), 25)
+    googlenews.clear()
+    self.assertEqual(googlenews.search_archived('startup', self.since, pages=5, fresh=300), 0)
+    self.assertEqual(len(googlenews.results()), 25)
+
+  def testFeedDeeperThanThePages(self):
+    feed = DatedFeedTransport([('Notícia {} da inteligência'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 1 + 3 * i)
+                               for i in range(60)])
+    googlenews = self.client(feed)
+    requests, archived = [], []
+    for _ in range(6):
+      feed.urls = []
+      googlenews.clear()
+      googlenews.search_archived('startup', self.since, pages=2, fresh=300)
+      requests.append(len(feed.urls))
+      archived.append(len(self.archive))
+    # every search goes further back in the window, until it is covered and the archive answers alone
+    self.assertTrue(all(count <= 2 for count in requests))
+    covered = archived.index(max(archived))
+    self.assertEqual(archived[:covered + 1], sorted(set(archived[:covered + 1])))
+    self.assertEqual(requests[-1], 0)
+    self.assertEqual(len(googlenews.results()), 56)
+    self.assertTrue(all('cd_min:' in url for url in feed.urls))
+    print('Archived search goes on where the previous one stopped ')
+
+  def testFilteredFeedDeeperThanThePages(self):
+    # one result an hour, one in 20 from the media the filter lets through
+    feed = DatedFeedTransport([('Notícia {} da inteligência'.format(i),
+                                'https://{}/{}'.format('valor.globo.com' if i % 20 == 0 else 'exame.com', i), 'Exame', 1 + i)
+                               for i in range(200)])
+    googlenews = self.client(feed)
+    googlenews.set_filter(link=DomainFilter(['valor.globo.com']))
+    requests = []
+    for _ in range(15):
+      feed.urls = []
+      googlenews.clear()
+      googlenews.search_archived('startup', self.since, pages=2, fresh=300)
+      requests.append(len(feed.urls))
+    # the pages the filter emptied still move the next search back in the window, until it is covered
+    self.assertTrue(all(count <= 2 for count in requests))
+    self.assertEqual(requests[-1], 0)
+    self.assertLessEqual(sum(1 for count in requests if count), 12)
+    self.assertEqual(sorted(int(result['title'].split()[1]) for result in googlenews.results()), list(range(0, 161, 20)))
+    print('Filtered archived search goes on where the previous one stopped ')
+
+  def testDuplicatesAreNotArchived(self):
+    googlenews = self.client(FeedTransport(news(0, 5)))
+    index = DedupIndex()
+    index.add(item('Notícia 4 da inteligência', 'https://exame.com/4'))
+    googlenews.set_dedup(index)
+    googlenews.search('startup')
+    self.assertEqual(len(self.archive), 4)
+
+  def testFailedHeadStillAnswers(self):
+    feed = FeedTransport(news(0, 5))
+    observer = HistogramObserver()
+    googlenews = self.client(feed, observer)
+    googlenews.search_archived('startup', self.since)
+    googlenews.clear()
+    googlenews.transport = None
+    self.assertEqual(googlenews.search_archived('startup', self.since), 0)
+    self.assertEqual(len(googlenews.results()), 5)
+    self.assertEqual(observer.errors, {'AttributeError': 1})
+    self.assertIn('archive', observer.phases)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,40 @@
+
+### MODULES
+
+import json
+import unittest
+import importlib.util
+from benchmarks import run
+from test.stub_server import API_AVAILABLE
+
+# the load test serves the API with uvicorn
+LOAD_AVAILABLE = API_AVAILABLE and importlib.util.find_spec('uvicorn') is not None
+if LOAD_AVAILABLE:
+  from benchmarks import load
+
+### TEST
+
+class BenchmarkSuiteTest(unittest.TestCase):
+
+  def testReportIsMachineReadable(self):
+    report = json.loads(json.dumps(run.run(repeat=1)))
+    names = {record['name'] for record in report['benchmarks']}
+    self.assertEqual(names, {'get_page', 'get_news', 'parse_date', 'results_sort', 'search_end_to_end',
+                             'search_parse_pool'})
+    for record in report['benchmarks']:
+      self.assertGreater(record['throughput'], 0)
+      self.assertLessEqual(record['seconds_per_call']['min'], record['seconds_per_call']['max'])
+    print('Benchmark report is valid JSON')
+
+  @unittest.skipUnless(LOAD_AVAILABLE, 'the load test needs the API and uvicorn')
+  def testEndpointScalesWithConcurrency(self):
+    # one uvicorn worker: concurrent requests are only served together if the event loop never blocks
+    report = load.run(requests=8, latency=0.1, concurrency=[1, 4])
+    single, concurrent = [record['throughput'] for record in report['benchmarks']]
+    self.assertGreater(concurrent, 2 * single)
+    print('Endpoint serves concurrent requests on one worker')
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
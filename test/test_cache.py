@@ -0,0 +1,88 @@
+
+### MODULES
+
+import os
+import time
+import tempfile
+import unittest
+from GoogleNews import GoogleNews, MemoryCache, SQLiteCache
+from test.stub_server import FixtureTransport
+
+### TEST
+
+class MemoryCacheTest(unittest.TestCase):
+
+  def testLeastRecentlyUsedIsEvicted(self):
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+    self.assertIsNone(cache.get('b'))
+    self.assertEqual(cache.get('a'), b'1')
+    self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2})
+
+  def testSizeLimit(self):
+    cache = MemoryCache(max_bytes=10)
+    cache.set('a', b'123456')
+    cache.set('b', b'123456')
+    self.assertIsNone(cache.get('a'))
+    cache.set('c', b'12345678901')
+    self.assertIsNone(cache.get('c'))
+    self.assertEqual(len(cache), 1)
+
+  def testExpiry(self):
+    cache = MemoryCache(ttl=0.05)
+    cache.set('a', b'1')
+    self.assertEqual(cache.get('a'), b'1')
+    time.sleep(0.1)
+    self.assertIsNone(cache.get('a'))
+
+class SQLiteCacheTest(unittest.TestCase):
+
+  def testSharedBetweenInstances(self):
+    with tempfile.TemporaryDirectory() as folder:
+      path = os.path.join(folder, 'pages.db')
+      SQLiteCache(path).set('a', b'page')
+      other = SQLiteCache(path)
+      self.assertEqual(other.get('a'), b'page')
+      self.assertIsNone(other.get('b'))
+      self.assertEqual(other.stats()['hits'], 1)
+
+  def testExpiryAndMaxsize(self):
+    with tempfile.TemporaryDirectory() as folder:
+      cache = SQLiteCache(os.path.join(folder, 'pages.db'), ttl=0.05, maxsize=2)
+      for key in 'abc':
+        cache.set(key, b'x')
+      self.assertEqual(len(cache), 2)
+      time.sleep(0.1)
+      self.assertIsNone(cache.get('c'))
+
+class GoogleNewsCacheTest(unittest.TestCase):
+
+  def testRepeatedSearchIsServedFromCache(self):
+    transport = FixtureTransport()
+    cache = MemoryCache()
+    for _ in range(2):
+      googlenews = GoogleNews(lang='pt', region='BR', transport=transport, cache=cache)
+      googlenews.search('startup', pages=2)
+      googlenews.get_news('startup')
+    self.assertEqual(len(transport.urls), 3)
+    self.assertEqual(googlenews.cache_stats()['hits'], 3)
+    self.assertEqual(len(googlenews.results()), 14)
+    print('Repeated queries served from the cache')
+
+  def testRequestIdentityIsPartOfTheKey(self):
+    transport = FixtureTransport()
+    cache = MemoryCache()
+    GoogleNews(lang='pt', region='BR', transport=transport, cache=cache).search('startup')
+    GoogleNews(lang='pt', region='PT', transport=transport, cache=cache).search('startup')
+    GoogleNews(lang='pt', period='7d', transport=transport, cache=cache).search('startup')
+    GoogleNews(lang='pt', region='BR', transport=transport, cache=cache).search('fintech')
+    self.assertEqual(len(transport.urls), 4)
+    self.assertEqual(cache.stats()['hits'], 0)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
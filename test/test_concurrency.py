@@ -0,0 +1,208 @@
+
+### MODULES
+
+import time
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from GoogleNews import GoogleNews, Transport, Query, MemoryCache, DomainFilter, MediaFilter, HistogramObserver, process_pool, picklable
+from test.stub_server import read_fixture, search_fixture
+
+### METHODS
+
+DELAY = 0.2
+
+class SlowTransport(Transport):
+  """Every page takes DELAY seconds, the pages come from the fixtures."""
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.active = 0
+    self.peak = 0
+
+  def fetch(self, url, headers):
+    with self.lock:
+      self.active += 1
+      self.peak = max(self.peak, self.active)
+    time.sleep(DELAY)
+    with self.lock:
+      self.active -= 1
+    return search_fixture(url)
+
+### TEST
+
+class ConcurrentSearchTest(unittest.TestCase):
+
+  def serialTitles(self, pages):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=SlowTransport())
+    googlenews.search('startup')
+    for page in range(2, pages + 1):
+      googlenews.get_page(page)
+    return googlenews.get_texts()
+
+  def testSearchKeepsPageOrder(self):
+    expected = self.serialTitles(4)
+    started = time.time()
+    self.serialTitles(4)
+    serial = time.time() - started
+    fake = SlowTransport()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=fake)
+    started = time.time()
+    googlenews.search('startup', pages=4, concurrency=4)
+    elapsed = time.time() - started
+    self.assertEqual(googlenews.get_texts(), expected)
+    self.assertEqual(fake.peak, 4)
+    self.assertLess(elapsed, serial - 2 * DELAY)
+    print('Concurrent search keeps page order')
+
+  def testConcurrencyIsBounded(self):
+    fake = SlowTransport()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=fake)
+    googlenews.search('startup', pages=4, concurrency=2)
+    self.assertEqual(fake.peak, 2)
+    self.assertEqual(len(googlenews.results()), 20)
+
+  def testAsyncSearch(self):
+    fake = SlowTransport()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=fake)
+    # asyncio.run() needs Python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+      loop.run_until_complete(googlenews.async_search('startup', pages=3, concurrency=3))
+    finally:
+      loop.close()
+    self.assertEqual(googlenews.get_texts(), self.serialTitles(3))
+    self.assertEqual(fake.peak, 3)
+    print('Async search keeps page order')
+
+  def testFailedPageIsSkipped(self):
+    class FlakyTransport(Transport):
+      def fetch(self, url, headers):
+        if 'start=10' in url:
+          raise OSError('connection reset')
+        return read_fixture('search_page1.html')
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FlakyTransport())
+    googlenews.search('startup', pages=3, concurrency=3)
+    self.assertEqual(len(googlenews.results()), 12)
+
+class SearchManyTest(unittest.TestCase):
+
+  def testSharedClientAndPerQuerySettings(self):
+    fake = SlowTransport()
+    cache = MemoryCache()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=fake, cache=cache)
+    queries = ['startup', Query('aporte', lang='en', region='US'), {'key': 'rodada', 'start': '01/01/2024', 'end': '01/31/2024'},
+               Query('startup')]
+    sunk = []
+    started = time.time()
+    batch = googlenews.search_many(queries, pages=2, concurrency=4, sink=lambda query, results, error: sunk.append(query))
+    elapsed = time.time() - started
+    self.assertEqual([query.key for query, _, _ in batch], ['startup', 'aporte', 'rodada', 'startup'])
+    self.assertTrue(all(error is None and len(results) == 10 for _, results, error in batch))
+    self.assertEqual(len(sunk), 4)
+    self.assertEqual(fake.peak, 4)
+    self.assertLess(elapsed, 4 * DELAY)
+    self.assertEqual(googlenews.results(), [])
+    self.assertEqual(googlenews.headers['Accept-Language'], 'pt-BR,pt;q=0.9')
+    self.assertEqual(cache.stats()['size'], 6)
+    print('Batch of searches on one client ')
+
+  def testErrorsAreTagged(self):
+    class Failing(Transport):
+      def fetch(self, url, headers):
+        if 'q=quebrada' in url:
+          raise OSError('connection reset')
+        return read_fixture('search_page1.html')
+    googlenews = GoogleNews(lang='pt', transport=Failing())
+    batch = googlenews.search_many(['startup', 'quebrada'])
+    self.assertIsNone(batch[0][2])
+    self.assertIn('connection reset', str(batch[1][2]))
+    self.assertEqual(batch[1][1], [])
+
+  def testQueryTimeSettings(self):
+    for settings in ({'start': '01/01/2024'}, {'end': '01/31/2024'},
+                     {'start': '01/01/2024', 'end': '01/31/2024', 'period': '7d'}):
+      with self.subTest(settings=settings):
+        with self.assertRaises(ValueError):
+          Query('startup', **settings)
+    urls = []
+    class Recording(Transport):
+      def fetch(self, url, headers):
+        urls.append(url)
+        return read_fixture('search_page1.html')
+    googlenews = GoogleNews(lang='pt', start='01/01/2024', end='01/31/2024', transport=Recording())
+    googlenews.search_many([Query('startup', period='7d'), Query('aporte', start='02/01/2024', end='02/29/2024')],
+                           concurrency=1)
+    self.assertIn('qdr:7d', urls[0])
+    self.assertNotIn('cdr:1', urls[0])
+    self.assertIn('cd_min:02/01/2024,cd_max:02/29/2024', urls[1])
+
+class ParsePoolTest(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.pool = process_pool(2)
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.pool.shutdown()
+
+  def search(self, pool, observer=None):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=SlowTransport(), observer=observer)
+    googlenews.set_parse_pool(pool)
+    googlenews.search('startup', pages=3, concurrency=3)
+    return googlenews
+
+  def testSameResultsAsInProcess(self):
+    expected = self.search(None)
+    pooled = self.search(self.pool)
+    # relative dates are converted against the clock of each search
+    fields = ('title', 'media', 'date', 'desc', 'link', 'img')
+    self.assertEqual([[item[field] for field in fields] for item in pooled.results()],
+                     [[item[field] for field in fields] for item in expected.results()])
+    self.assertTrue(all(a.timestamp == b.timestamp or abs(a.timestamp - b.timestamp) < 60 for a, b in zip(pooled.results(), expected.results())))
+    self.assertEqual([item.canonical for item in pooled.results()], [item.canonical for item in expected.results()])
+    self.assertEqual(pooled.total_count(), expected.total_count())
+    print('Pages parsed in worker processes ')
+
+  def testFiltersAndObserver(self):
+    observer = HistogramObserver()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=SlowTransport(), observer=observer)
+    googlenews.set_parse_pool(self.pool)
+    googlenews.set_filter(link=DomainFilter(['exame.com']))
+    googlenews.search('startup')
+    self.assertTrue(googlenews.results())
+    self.assertTrue(all('exame.com' in item.link for item in googlenews.results()))
+    self.assertEqual(observer.pages.snapshot()[2], 1)
+    self.assertGreater(observer.rejected, 0)
+    self.assertTrue({'parse', 'extract', 'dates'} <= set(observer.phases))
+
+  def testUnpicklableFilters(self):
+    expected = GoogleNews(lang='pt', region='BR', transport=SlowTransport())
+    expected.set_filter(link=DomainFilter(['exame.com']))
+    expected.search('startup')
+    googlenews = GoogleNews(lang='pt', region='BR', transport=SlowTransport())
+    googlenews.set_parse_pool(self.pool)
+    # a lambda can't reach the workers, GoogleNews applies it to the rows they return
+    googlenews.set_filter(link=lambda link: 'exame.com' in link, media=MediaFilter('exame'))
+    googlenews.search('startup')
+    self.assertTrue(googlenews.results())
+    self.assertEqual([item.link for item in googlenews.results()], [item.link for item in expected.results()])
+    print('Unpicklable filters applied in the parent ')
+
+  def testFiltersArePickledOnce(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=SlowTransport())
+    googlenews.set_parse_pool(self.pool)
+    googlenews.set_filter(link=lambda link: 'exame.com' in link, media=MediaFilter('exame'))
+    with mock.patch('GoogleNews.picklable', wraps=picklable) as checked:
+      googlenews.search('startup', pages=3, concurrency=3)
+      self.assertEqual(checked.call_count, 2)
+      googlenews.set_filter(link=DomainFilter(['exame.com']))
+      googlenews.search('startup')
+      self.assertEqual(checked.call_count, 4)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,104 @@
+
+### MODULES
+
+import math
+import datetime
+import unittest
+from unittest import mock
+from GoogleNews import GoogleNews, define_date, lexical_date_parser
+from GoogleNews.dates import parse_date, date_spec
+from test.stub_server import FixtureTransport
+
+### TEST
+
+NOW = datetime.datetime(2024, 12, 22, 2, 15)
+
+class DateTablesTest(unittest.TestCase):
+
+  def testRelativeDates(self):
+    cases = [
+      ('3 hours ago', 'en', NOW - datetime.timedelta(hours=3)),
+      ('45 mins ago', 'en', NOW - datetime.timedelta(minutes=45)),
+      ('2 weeks ago', 'en', NOW - datetime.timedelta(weeks=2)),
+      ('Yesterday', 'en', NOW - datetime.timedelta(days=1)),
+      ('há 19 horas', 'pt', NOW - datetime.timedelta(hours=19)),
+      ('2 dias atrás', 'pt-BR', NOW - datetime.timedelta(days=2)),
+      ('1 semana atrás', 'pt', NOW - datetime.timedelta(weeks=1)),
+      ('há 1 mês', 'pt', datetime.datetime(2024, 11, 22, 2, 15)),
+      ('ontem', 'pt', NOW - datetime.timedelta(days=1)),
+      ('hace 5 minutos', 'es', NOW - datetime.timedelta(minutes=5)),
+      ('2 ore fa', 'it', NOW - datetime.timedelta(hours=2)),
+      ('il y a 3 jours', 'fr', NOW - datetime.timedelta(days=3)),
+      ('vor 4 Stunden', 'de', NOW - datetime.timedelta(hours=4)),
+      ('5 hours ago', 'pt', NOW - datetime.timedelta(hours=5)),
+    ]
+    for text, lang, expected in cases:
+      with self.subTest(text=text):
+        self.assertEqual(parse_date(text, lang, now=NOW), expected)
+    print('Relative dates parsed by the tables')
+
+  def testAbsoluteDates(self):
+    cases = [
+      ('15 de dez. de 2024', 'pt', datetime.datetime(2024, 12, 15)),
+      ('20/12/2024', 'pt', datetime.datetime(2024, 12, 20)),
+      ('Sep 5, 2024', 'en', datetime.datetime(2024, 9, 5)),
+      ('5 Sep 2024', 'en', datetime.datetime(2024, 9, 5)),
+      ('Dec 20', 'en', datetime.datetime(2024, 12, 20)),
+      ('Dec 30', 'en', datetime.datetime(2023, 12, 30)),
+      ('3 juil. 2024', 'fr', datetime.datetime(2024, 7, 3)),
+      ('5. März 2024', 'de', datetime.datetime(2024, 3, 5)),
+    ]
+    for text, lang, expected in cases:
+      with self.subTest(text=text):
+        self.assertEqual(parse_date(text, lang, now=NOW), expected)
+
+  def testTablesDoNotCallDateparser(self):
+    date_spec.cache_clear()
+    with mock.patch('GoogleNews.dates._dateparser') as dateparser:
+      parse_date('há 7 horas', 'pt')
+      parse_date('Sep 5, 2024', 'en')
+    dateparser.assert_not_called()
+
+  def testCacheKeepsRelativeDatesFresh(self):
+    date_spec.cache_clear()
+    first = parse_date('3 hours ago', 'en', now=NOW)
+    later = parse_date('3 hours ago', 'en', now=NOW + datetime.timedelta(hours=1))
+    self.assertEqual(later - first, datetime.timedelta(hours=1))
+    self.assertEqual(date_spec.cache_info().hits, 1)
+
+  def testDateparserFallback(self):
+    date_spec.cache_clear()
+    self.assertEqual(parse_date('December 15th, 2024', 'en', now=NOW), datetime.datetime(2024, 12, 15))
+    self.assertIsNone(parse_date('not a date at all', 'en'))
+
+  def testDateparserRelativeDatesAreNotFrozen(self):
+    date_spec.cache_clear()
+    # a weekday is relative to now, but not a fixed offset from it
+    self.assertEqual(parse_date('friday', 'en', now=NOW), datetime.datetime(2024, 12, 20))
+    self.assertEqual(parse_date('friday', 'en', now=NOW + datetime.timedelta(days=7)), datetime.datetime(2024, 12, 27))
+    self.assertEqual(date_spec.cache_info().hits, 1)
+
+class DefineDateTest(unittest.TestCase):
+
+  def testDefineDate(self):
+    self.assertTrue(math.isnan(define_date('Reuters')))
+    self.assertEqual(define_date('2 dias atrás', 'pt').date(), (datetime.datetime.now() - datetime.timedelta(days=2)).date())
+
+  def testLexicalDateParser(self):
+    self.assertEqual(lexical_date_parser('há 19 horas', 'pt')[0], 'há 19 horas')
+    self.assertEqual(lexical_date_parser('Texto cortado... 2 dias atrás', 'pt')[0], '2 dias atrás')
+    self.assertEqual(lexical_date_parser('Reuters'), ('Reuters', None))
+
+  def testPortugueseResultsHaveDatetime(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.search('startup', pages=2)
+    dated = [result for result in googlenews.results() if result['title']]
+    self.assertEqual(len(dated), 8)
+    for result in dated:
+      self.assertIsInstance(result['datetime'], datetime.datetime)
+    print('Portuguese dates are not nan anymore')
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
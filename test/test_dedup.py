@@ -0,0 +1,162 @@
+
+### MODULES
+
+import datetime
+import unittest
+from GoogleNews import GoogleNews, NewsItem, DedupIndex, canonical_url, clean_url
+from GoogleNews.dedup import simhash, tokens, hamming, strip_outlet
+from test.stub_server import FeedTransport, FixtureTransport
+
+### METHODS
+
+def item(title, link, desc=''):
+  return NewsItem(title, 'Media', '', None, desc, link)
+
+### TEST
+
+class CanonicalUrlTest(unittest.TestCase):
+
+  def testVariantsOfTheSameLink(self):
+    expected = 'https://exame.com/negocios/fintech-recebe-aporte'
+    for link in ['https://exame.com/negocios/fintech-recebe-aporte/',
+                 'http://www.exame.com/negocios/fintech-recebe-aporte',
+                 '/url?esrc=s&q=&rct=j&sa=U&url=https://exame.com/negocios/fintech-recebe-aporte/&ved=2ahUKE&usg=AOvVaw0',
+                 'https://exame.com/negocios/fintech-recebe-aporte/?utm_source=twitter&utm_medium=social#comments',
+                 'https://amp.exame.com/negocios/fintech-recebe-aporte/amp/',
+                 'https://m.exame.com/negocios/fintech-recebe-aporte?fbclid=abc']:
+      self.assertEqual(canonical_url(link), expected, link)
+    print('Link variants share a canonical form ')
+
+  def testKeepsWhatNamesThePage(self):
+    self.assertEqual(canonical_url('https://site.com/news?b=2&id=7&utm_campaign=x&a=1'), 'https://site.com/news?a=1&b=2&id=7')
+    self.assertNotEqual(canonical_url('https://site.com/news?id=7'), canonical_url('https://site.com/news?id=8'))
+    self.assertEqual(canonical_url(''), '')
+
+  def testCleanUrlKeepsTheAddress(self):
+    self.assertEqual(clean_url('/url?esrc=s&q=&rct=j&sa=U&url=http://www.exame.com/a/amp/?utm_source=x&ved=2ahUKE&usg=AOvVaw0'),
+                     'http://www.exame.com/a/amp/?utm_source=x')
+    self.assertEqual(clean_url('https://site.com/news?ved=1&id=7'), 'https://site.com/news?id=7')
+    self.assertEqual(clean_url(None), '')
+
+  def testSetAtParseTime(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.search('startup')
+    first = googlenews.results()[0]
+    self.assertEqual(first.canonical, 'https://bloomberglinea.com.br/startups/rodadas-da-semana-sami-capta-r-60-mi')
+    self.assertNotIn('canonical', first)
+
+
+class SimhashTest(unittest.TestCase):
+
+  def testNearDuplicateTitles(self):
+    a = simhash(tokens('Startup de logística capta R$ 50 milhões em rodada liderada por fundo americano'))
+    b = simhash(tokens(strip_outlet('Startup de logistica capta R$ 50 milhões em rodada liderada por fundo americano - Valor')))
+    c = simhash(tokens('Healthtech levanta R$ 20 milhões para expandir atendimento no Nordeste'))
+    self.assertLessEqual(hamming(a, b), 3)
+    self.assertGreater(hamming(a, c), 3)
+
+  def testNumbersAreTokens(self):
+    self.assertEqual(tokens('Startup capta R$ 5 mi nos EUA'), ['startup', 'capta', '5', 'nos', 'eua'])
+
+
+class DedupIndexTest(unittest.TestCase):
+
+  def testSameLinkAndSyndicatedCopies(self):
+    index = DedupIndex()
+    original = item('Fintech recebe aporte série A de R$ 80 milhões', 'https://exame.com/negocios/fintech-recebe-aporte/')
+    self.assertIsNone(index.add(original))
+    self.assertIs(index.add(item('Outro título', 'https://www.exame.com/negocios/fintech-recebe-aporte?utm_source=x')), original)
+    self.assertIs(index.add(item('Fintech recebe aporte série A de R$ 80 milhões', 'https://infomoney.com.br/fintech')), original)
+    self.assertIs(index.add(item('Fintech recebe aporte série A de R$ 80 milhões - InfoMoney', 'https://infomoney.com.br/f2')), original)
+    self.assertIsNone(index.add(item('Agtech recebe aporte de R$ 15 milhões de fundo', 'https://braziljournal.com/agtech')))
+    self.assertEqual(index.duplicates, 3)
+    self.assertEqual(len(index), 2)
+    print('Syndicated copies collapsed ')
+
+  def testSameDescription(self):
+    index = DedupIndex()
+    desc = 'A startup de logística anunciou nesta sexta-feira uma rodada de R$ 50 milhões liderada por um fundo americano.'
+    original = item('Startup capta R$ 50 milhões', 'https://valor.globo.com/a', desc)
+    index.add(original)
+    self.assertIs(index.add(item('Logtech levanta R$ 50 mi com fundo dos EUA', 'https://neofeed.com.br/b', desc)), original)
+
+  def testHeadlinesDifferingInOneWord(self):
+    index = DedupIndex()
+    pairs = [('Fintech recebe aporte de série A liderado por fundo americano',
+              'Healthtech recebe aporte de série A liderado por fundo americano'),
+             ('Startup capta R$ 5 milhões em rodada liderada pela Kaszek',
+              'Startup capta R$ 50 milhões em rodada liderada pela Kaszek'),
+             ('Nubank anuncia lucro recorde no terceiro trimestre',
+              'Inter anuncia lucro recorde no terceiro trimestre')]
+    for number, (first, second) in enumerate(pairs):
+      with self.subTest(title=second):
+        self.assertIsNone(index.add(item(first, 'https://exame.com/{}'.format(number))))
+        self.assertIsNone(index.add(item(second, 'https://neofeed.com.br/{}'.format(number))))
+
+  def testCloseTitlesNeedTheSameHostOrDescription(self):
+    # 6 bits apart: close enough for a wide index, but on other outlets and with other descriptions
+    index = DedupIndex(distance=6)
+    fintech = item('Fintech recebe aporte de série A liderado por fundo americano', 'https://exame.com/fintech',
+                   'A fintech paulista vai usar os recursos para contratar engenheiros e abrir escritório no México.')
+    self.assertIsNone(index.add(fintech))
+    self.assertIsNone(index.add(item('Healthtech recebe aporte de série A liderado por fundo americano',
+                                     'https://neofeed.com.br/healthtech',
+                                     'A healthtech carioca quer levar a telemedicina para o interior do Nordeste.')))
+    self.assertIs(index.add(item('Healthtech recebe aporte de série A liderado por fundo americano',
+                                 'https://exame.com/healthtech')), fintech)
+
+  def testShortTitlesOnlyMatchByLink(self):
+    index = DedupIndex()
+    index.add(item('Notícia 1', 'https://exame.com/1'))
+    self.assertIsNone(index.add(item('Notícia 1', 'https://exame.com/2')))
+
+  def testEviction(self):
+    index = DedupIndex(max_items=100)
+    for i in range(1000):
+      index.add(item('Manchete {}'.format(i), 'https://exame.com/{}'.format(i)))
+    self.assertEqual(len(index), 100)
+    self.assertIsNone(index.add(item('x', 'https://exame.com/5')))
+    self.assertIsNotNone(index.add(item('x', 'https://exame.com/999')))
+
+  def testAcrossPagesAndSearches(self):
+    feed = FeedTransport([('Título {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há 1 hora') for i in range(10)] +
+                         [('Título 3', 'https://www.exame.com/3/', 'Exame', 'há 2 horas')])
+    index = DedupIndex()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    googlenews.set_dedup(index)
+    googlenews.search('startup', pages=2)
+    links = [result.link for result in googlenews.results() if result.title]
+    self.assertEqual(len(links), 10)
+    googlenews.clear()
+    googlenews.search('fintech')
+    self.assertEqual([result for result in googlenews.results() if result.title], [])
+
+  def testPageOfDuplicatesIsNotTheLast(self):
+    feed = FeedTransport([('Manchete {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há {} horas'.format(i + 1)) for i in range(25)])
+    index = DedupIndex()
+    for i in range(10):
+      index.add(item('Manchete {}'.format(i), 'https://exame.com/{}'.format(i)))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    googlenews.set_dedup(index)
+    self.assertEqual(googlenews.fetch_until(datetime.datetime(2000, 1, 1), max_pages=5, key='startup'), 4)
+    self.assertEqual(len([result for result in googlenews.results() if result.title]), 15)
+    for i in range(25):
+      index.add(item('Manchete {}'.format(i), 'https://exame.com/{}'.format(i)))
+    feed.urls = []
+    self.assertEqual([result for result in googlenews.iter_results('startup', max_pages=5) if result.title], [])
+    self.assertEqual(len(feed.urls), 4)
+    print('Pages of duplicates don\'t end the search ')
+
+  def testNoFalsePositivesOnSavedPages(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.search('startup', pages=2)
+    everything = len(googlenews.results())
+    googlenews.clear()
+    googlenews.set_dedup(DedupIndex())
+    googlenews.search('startup', pages=2)
+    self.assertEqual(len(googlenews.results()), everything)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
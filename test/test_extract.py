@@ -0,0 +1,72 @@
+
+### MODULES
+
+import unittest
+from GoogleNews import GoogleNews, Transport, parse_search_page
+from GoogleNews import parser as html_parser
+from GoogleNews.extract import ExtractionPlan, search_plan, news_plan, search_layout_2024, news_layout_2024
+from test.stub_server import read_fixture
+
+### TEST
+
+class ExtractionPlanTest(unittest.TestCase):
+
+  def testLayoutIsKeptForThePage(self):
+    calls = []
+    def old(node, accept=None):
+      calls.append('old')
+      return None
+    def new(node, accept=None):
+      calls.append('new')
+      return (node,)
+    plan = ExtractionPlan([old, new], lambda node, accept=None: ('fallback',))
+    self.assertEqual([plan.extract(n) for n in (1, 2, 3)], [(1,), (2,), (3,)])
+    self.assertIs(plan.layout, new)
+    self.assertEqual(calls, ['old', 'new', 'new', 'new'])
+    print('Matching layout kept after the first result ')
+
+  def testFallbackWhenNoLayoutFits(self):
+    plan = ExtractionPlan([lambda node, accept=None: None], lambda node, accept=None: ('fallback', node))
+    self.assertEqual(plan.extract(1), ('fallback', 1))
+    self.assertIsNone(plan.layout)
+
+  def testSearchLayout(self):
+    items = html_parser.search_items(read_fixture('search_page1.html'), 'html.parser')
+    plan = search_plan()
+    fields = [plan.extract(item) for item in items]
+    self.assertIs(plan.layout, search_layout_2024)
+    self.assertTrue(all(len(f) == 6 for f in fields))
+    self.assertTrue(fields[0][0] and fields[0][2] and fields[0][3])
+    print('Search layout detected ')
+
+  def testNewsLayout(self):
+    articles = html_parser.news_items(read_fixture('news_search.html'), 'html.parser')
+    plan = news_plan()
+    fields = [plan.extract(article) for article in articles]
+    self.assertIs(plan.layout, news_layout_2024)
+    self.assertTrue(fields[0][0] and fields[0][1].startswith('./'))
+
+  def testMissingFieldsDontRaise(self):
+    page = b'<html><body><a data-ved="1" href="https://a.com/x"><h3>Only a title</h3></a><a data-ved="2"></a></body></html>'
+    _, rejected, rows, _, _ = parse_search_page(page)
+    self.assertEqual(rejected, 0)
+    title, media, date, datetime, desc, link, img = rows[0]
+    self.assertEqual((title, link), ('Only a title', 'https://a.com/x'))
+    self.assertEqual((media, date, desc, img), ('', '', '', ''))
+    self.assertEqual((rows[1][0], rows[1][5]), ('', ''))
+    print('Missing fields read as empty ')
+
+  def testNewsArticleWithoutLinkIsSkipped(self):
+    page = b'<html><body><article><div><div></div></div><div></div><div><a>No link</a></div></article></body></html>'
+    class Page(Transport):
+      def fetch(self, url, headers):
+        return page
+    googlenews = GoogleNews(transport=Page())
+    googlenews.enableException(True)
+    googlenews.get_news('x')
+    self.assertEqual(googlenews.results(), [])
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
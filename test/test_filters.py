@@ -0,0 +1,96 @@
+
+### MODULES
+
+import asyncio
+import unittest
+import GoogleNews as googlenews_module
+from GoogleNews import GoogleNews, DomainFilter, MediaFilter
+from test.stub_server import FixtureTransport, API_AVAILABLE
+if API_AVAILABLE:
+  import api_news
+
+### TEST
+
+class DomainFilterTest(unittest.TestCase):
+
+  def testHostSuffixes(self):
+    allowed = DomainFilter(['exame.com', 'valor.globo.com', '.braziljournal.com'])
+    self.assertTrue(allowed('https://exame.com/negocios/x'))
+    self.assertTrue(allowed('https://www.exame.com/negocios/x'))
+    self.assertTrue(allowed('https://VALOR.globo.com/x?a=1'))
+    self.assertTrue(allowed('https://braziljournal.com/x'))
+    self.assertFalse(allowed('https://pipelinevalor.globo.com/x'))
+    self.assertFalse(allowed('https://notexame.com/x'))
+    self.assertFalse(allowed('https://example.org/exame.com'))
+    self.assertFalse(allowed(''))
+    self.assertFalse(allowed(None))
+    self.assertFalse(allowed('not a link'))
+    print('Domain filter matches hosts and subdomains ')
+
+  def testMediaFilter(self):
+    self.assertTrue(MediaFilter('valor')('Valor Econômico'))
+    self.assertFalse(MediaFilter('valor')('Exame'))
+    self.assertFalse(MediaFilter('valor')(None))
+
+
+class PushdownTest(unittest.TestCase):
+
+  def search(self, **filters):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.set_filter(**filters)
+    googlenews.search('startup', pages=2)
+    return googlenews.results()
+
+  def testSameAsFilteringAfterwards(self):
+    allowed = DomainFilter(['exame.com', 'neofeed.com.br', 'valor.globo.com'])
+    everything = self.search()
+    filtered = self.search(link=allowed)
+    self.assertEqual([item['link'] for item in filtered], [item['link'] for item in everything if allowed(item['link'])])
+    self.assertEqual(len(filtered), 3)
+    media = everything[1]['media']
+    self.assertEqual([item['title'] for item in self.search(media=MediaFilter(media.upper()))],
+                     [item['title'] for item in everything if media.lower() in item['media'].lower()])
+
+  def testRejectedResultsAreNotParsed(self):
+    calls = []
+    parser = googlenews_module.lexical_date_parser
+    googlenews_module.lexical_date_parser = lambda date, lang='en': calls.append(date) or parser(date, lang)
+    try:
+      self.search(link=DomainFilter(['exame.com']))
+    finally:
+      googlenews_module.lexical_date_parser = parser
+    self.assertEqual(len(calls), 1)
+    print('Rejected results skip date parsing ')
+
+  def testNewsFilter(self):
+    googlenews = GoogleNews(transport=FixtureTransport())
+    googlenews.get_news('apple')
+    media = googlenews.results()[0]['media']
+    expected = [item['title'] for item in googlenews.results() if item['media'] == media]
+    googlenews.clear()
+    googlenews.set_filter(media=lambda name: name == media)
+    googlenews.get_news('apple')
+    self.assertEqual(googlenews.get_texts(), expected)
+
+  def testStreamGoesOnAfterAFilteredPage(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.set_filter(link=DomainFilter(['valor.globo.com']))
+    links = [item['link'] for item in googlenews.iter_results('startup', max_pages=2)]
+    self.assertEqual(len(links), 1)
+    self.assertIn('valor.globo.com', links[0])
+
+  @unittest.skipUnless(API_AVAILABLE, 'the API needs Python 3.7, fastapi and requests')
+  def testApiKeepsTheAllowedSources(self):
+    transporte, cache = api_news.transporte, api_news.cache
+    api_news.transporte, api_news.cache = FixtureTransport(), None
+    try:
+      noticias = asyncio.run(api_news.buscar_noticias('startup', paginas=1))
+    finally:
+      api_news.transporte, api_news.cache = transporte, cache
+    self.assertEqual(len(noticias), 4)
+    self.assertTrue(all(api_news.url_permitida(noticia['link']) for noticia in noticias))
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,49 @@
+
+### MODULES
+
+import os
+import sys
+import unittest
+import subprocess
+
+### METHODS
+
+# microseconds, python -X importtime cumulative time of the GoogleNews package
+BUDGET = int(os.environ.get('GOOGLENEWS_IMPORT_BUDGET_US', 60000))
+HEAVY = ('bs4', 'dateparser', 'dateutil', 'asyncio', 'ssl', 'http.client', 'concurrent.futures', 'selectolax', 'lxml')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def python(*args):
+  """Runs a fresh interpreter in the repository, returns the finished process with its output as text."""
+  return subprocess.run([sys.executable] + list(args), cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                        universal_newlines=True, check=True)
+
+def cold_import(code='from GoogleNews import GoogleNews'):
+  """Imports GoogleNews in a fresh interpreter, returns its microseconds."""
+  process = python('-X', 'importtime', '-c', code)
+  for line in process.stderr.splitlines():
+    fields = [field.strip() for field in line.split('|')]
+    if len(fields) == 3 and fields[2] == 'GoogleNews':
+      return int(fields[1])
+  raise AssertionError('GoogleNews not found in -X importtime output')
+
+### TEST
+
+class ImportTimeTest(unittest.TestCase):
+
+  @unittest.skipUnless(sys.version_info >= (3, 7), '-X importtime needs Python 3.7')
+  def testImportTimeBudget(self):
+    # best of three, the first run also pays for writing the .pyc files
+    elapsed = min(cold_import() for _ in range(3))
+    print('Cold import of GoogleNews: {} us (budget {} us)'.format(elapsed, BUDGET))
+    self.assertLess(elapsed, BUDGET)
+
+  def testHeavyDependenciesAreLazy(self):
+    code = 'import sys; from GoogleNews import GoogleNews; GoogleNews(); print(",".join(m for m in {!r} if m in sys.modules))'.format(HEAVY)
+    loaded = python('-c', code).stdout.strip()
+    self.assertEqual(loaded, '')
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
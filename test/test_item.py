@@ -0,0 +1,98 @@
+
+### MODULES
+
+import sys
+import json
+import pickle
+import datetime
+import unittest
+from GoogleNews import GoogleNews, NewsItem, UNKNOWN_TIMESTAMP, newest
+from test.stub_server import FixtureTransport
+
+### TEST
+
+class NewsItemTest(unittest.TestCase):
+
+  def testReadsLikeADict(self):
+    item = NewsItem('Title', 'Media', '3 hours ago', None, 'Desc.', 'https://a.com/x', 'data:')
+    self.assertEqual(item['title'], 'Title')
+    self.assertEqual(item.get('link', ''), 'https://a.com/x')
+    self.assertIsNone(item.get('site'))
+    self.assertNotIn('site', item)
+    self.assertEqual(list(item), ['title', 'media', 'date', 'datetime', 'desc', 'link', 'img'])
+    self.assertEqual(item, {'title': 'Title', 'media': 'Media', 'date': '3 hours ago', 'datetime': None,
+                            'desc': 'Desc.', 'link': 'https://a.com/x', 'img': 'data:'})
+    with self.assertRaises(KeyError):
+      item['site']
+    item['desc'] = 'Other'
+    self.assertEqual(item.desc, 'Other')
+
+  def testNewsFields(self):
+    item = NewsItem(title='Title', link='https://news.google.com/read/x', site=None, reporter='By Someone')
+    self.assertEqual(len(item), 9)
+    self.assertEqual(item['reporter'], 'By Someone')
+    self.assertEqual(dict(item)['site'], None)
+
+  def testPickle(self):
+    item = NewsItem(title='Title', site='Site', reporter=None)
+    copy = pickle.loads(pickle.dumps(item))
+    self.assertEqual(copy, item)
+    self.assertEqual(list(copy), list(item))
+
+  def testTimestamp(self):
+    now = datetime.datetime(2024, 5, 10, 12, 0)
+    item = NewsItem('Title', datetime=now)
+    self.assertEqual(item.timestamp, now.timestamp())
+    self.assertNotIn('timestamp', item)
+    for unknown in (None, float('nan'), '10 de mai.'):
+      self.assertEqual(NewsItem('Title', datetime=unknown).timestamp, UNKNOWN_TIMESTAMP)
+    item['datetime'] = None
+    self.assertEqual(item.timestamp, UNKNOWN_TIMESTAMP)
+    item.datetime = now
+    self.assertEqual(item.timestamp, now.timestamp())
+
+  def testJson(self):
+    item = NewsItem('Title', 'Media', '3 hours ago', None, 'Desc.', 'https://a.com/x', '')
+    self.assertEqual(json.loads(json.dumps([item.to_dict()]))[0]['title'], 'Title')
+
+  def testSmallerThanDict(self):
+    item = NewsItem('Title', 'Media', '3 hours ago', None, 'Desc.', 'https://a.com/x', 'data:')
+    self.assertLess(sys.getsizeof(item), sys.getsizeof(item.to_dict()))
+
+class ResultsStoreTest(unittest.TestCase):
+
+  def testTextsAndLinksAreViews(self):
+    googlenews = GoogleNews(lang='pt', transport=FixtureTransport())
+    texts, links = googlenews.get_texts(), googlenews.get_links()
+    googlenews.search('startup', pages=2)
+    results = googlenews.results()
+    self.assertEqual(len(texts), len(results))
+    self.assertEqual(texts, [result['title'] for result in results])
+    self.assertEqual(links[-1], results[-1]['link'])
+    self.assertIsInstance(results[0], NewsItem)
+    googlenews.clear()
+    self.assertEqual(googlenews.get_texts(), [])
+    print('Texts and links read from the results')
+
+  def testSortUnknownDatesLast(self):
+    now = datetime.datetime.now()
+    googlenews = GoogleNews()
+    results = googlenews.results()
+    results.extend([NewsItem('a', datetime=now - datetime.timedelta(hours=3)), NewsItem('b', datetime=float('nan')),
+                    NewsItem('c', datetime=now), NewsItem('d', datetime=None), NewsItem('e', datetime=now)])
+    self.assertEqual([item.title for item in googlenews.results(sort=True, limit=3)], ['c', 'e', 'a'])
+    self.assertEqual([item.title for item in results], ['a', 'b', 'c', 'd', 'e'])
+    self.assertEqual([item.title for item in googlenews.results(sort=True)], ['c', 'e', 'a', 'b', 'd'])
+    self.assertEqual([item.title for item in googlenews.results(limit=2)], ['c', 'e'])
+    print('Sorted newest first, unknown dates last')
+
+  def testTopKMatchesFullSort(self):
+    now = datetime.datetime.now()
+    items = [NewsItem(str(i), datetime=now - datetime.timedelta(minutes=(i * 7919) % 500) if i % 7 else None)
+             for i in range(500)]
+    self.assertEqual(newest(items, 50), newest(items)[:50])
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,98 @@
+
+### MODULES
+
+import unittest
+from GoogleNews import GoogleNews, Observer, HistogramObserver, Histogram, MemoryCache
+from test.stub_server import FixtureTransport, FeedTransport, StubServer, LocalTransport
+
+### METHODS
+
+class Recorder(Observer):
+  """Keeps every call, in order."""
+
+  def __init__(self):
+    self.calls = []
+
+  def phase(self, name, seconds):
+    self.calls.append(('phase', name, seconds))
+
+  def page(self, url, seconds, results, rejected):
+    self.calls.append(('page', url, results, rejected))
+
+  def missing(self, field, count=1):
+    self.calls.append(('missing', field, count))
+
+  def error(self, error):
+    self.calls.append(('error', type(error).__name__))
+
+  def phases(self):
+    return [call[1] for call in self.calls if call[0] == 'phase']
+
+### TEST
+
+class ObserverTest(unittest.TestCase):
+
+  def testPhasesAndPages(self):
+    recorder = Recorder()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport(), cache=MemoryCache(), observer=recorder)
+    googlenews.search('startup', pages=2)
+    self.assertEqual(recorder.phases().count('cache'), 2)
+    for phase in ('parse', 'extract', 'dates'):
+      self.assertEqual(recorder.phases().count(phase), 2, phase)
+    pages = [call for call in recorder.calls if call[0] == 'page']
+    self.assertEqual([call[2] for call in pages], [len([item for item in page if item.title]) for page in (googlenews.page_at(1), googlenews.page_at(2))])
+    self.assertTrue(all(call[2] >= 0 for call in recorder.calls if call[0] == 'phase'))
+    print('Phases and pages reported ')
+
+  def testMissingFieldsAndErrors(self):
+    recorder = Recorder()
+    feed = FeedTransport([('Startup capta', 'https://exame.com/1', 'Exame', 'ontem à noite')])
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed, observer=recorder)
+    googlenews.search('startup')
+    self.assertIn(('missing', 'datetime', 1), recorder.calls)
+    googlenews.transport = None
+    googlenews.search('startup')
+    self.assertIn(('error', 'AttributeError'), recorder.calls)
+
+  def testConnectPhase(self):
+    observer = HistogramObserver()
+    with StubServer() as server:
+      transport = LocalTransport(server, observer=observer)
+      googlenews = GoogleNews(lang='pt', region='BR', transport=transport, observer=observer)
+      googlenews.search('startup', pages=2)
+      transport.close()
+    self.assertEqual(observer.phases['connect'].snapshot()[2], 1)
+    self.assertEqual(observer.phases['request'].snapshot()[2], 2)
+
+  def testNoObserver(self):
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FixtureTransport())
+    googlenews.search('startup')
+    self.assertIsNone(googlenews.observer)
+    self.assertTrue(googlenews.results())
+
+
+class HistogramObserverTest(unittest.TestCase):
+
+  def testHistogram(self):
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+      histogram.observe(value)
+    buckets, total, count = histogram.snapshot()
+    self.assertEqual(buckets, [(0.1, 2), (1, 3), (float('inf'), 4)])
+    self.assertAlmostEqual(total, 3.65)
+    self.assertEqual(count, 4)
+
+  def testAggregates(self):
+    observer = HistogramObserver()
+    feed = FeedTransport([('Título {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há 1 hora') for i in range(12)])
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed, observer=observer)
+    googlenews.search('startup', pages=3)
+    self.assertEqual(observer.pages.snapshot()[2], 3)
+    self.assertEqual(observer.results, 12)
+    self.assertEqual(observer.empty_pages, 1)
+    self.assertEqual(set(observer.phases), {'request', 'parse', 'extract', 'dates'})
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
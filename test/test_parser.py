@@ -0,0 +1,81 @@
+
+### MODULES
+
+import math
+import unittest
+import importlib.util
+from GoogleNews import GoogleNews
+from test.stub_server import FixtureTransport
+
+### METHODS
+
+ENGINES = [engine for engine, module in (('lxml', 'lxml'), ('selectolax', 'selectolax'))
+           if importlib.util.find_spec(module)]
+
+def without_datetime(results):
+  return [{k: v for k, v in result.items() if k != 'datetime'} for result in results]
+
+def datetimes(results):
+  """datetime holds now() for relative dates, so it is compared in minutes since the epoch."""
+  values = []
+  for result in results:
+    value = result['datetime']
+    if isinstance(value, float) and math.isnan(value):
+      values.append('nan')
+    else:
+      values.append(round(value.timestamp() / 60))
+  return values
+
+def search_results(parser, lang='pt'):
+  googlenews = GoogleNews(lang=lang, transport=FixtureTransport(), parser=parser)
+  googlenews.search('startup', pages=2)
+  return googlenews
+
+def news_results(parser, topic=None):
+  googlenews = GoogleNews(transport=FixtureTransport(), parser=parser)
+  if topic:
+    googlenews.set_topic(topic)
+  googlenews.get_news('apple')
+  return googlenews
+
+### TEST
+
+class ParserParityTest(unittest.TestCase):
+
+  def assertParity(self, results, expected):
+    self.assertEqual(without_datetime(results), without_datetime(expected))
+    self.assertEqual(datetimes(results), datetimes(expected))
+
+  def testSearchParity(self):
+    for lang in ('pt', 'en'):
+      expected = search_results('html.parser', lang)
+      self.assertGreater(len(expected.results()), 0)
+      for engine in ENGINES:
+        with self.subTest(engine=engine, lang=lang):
+          googlenews = search_results(engine, lang)
+          self.assertParity(googlenews.results(), expected.results())
+          self.assertEqual(googlenews.total_count(), expected.total_count())
+    print('Search results identical across parsers')
+
+  def testNewsParity(self):
+    for topic in (None, 'CAAqJggKIiBDQkFTRWdvSUwyMHZNRGx6TVdZU0FtVnVHZ0pWVXlnQVAB'):
+      expected = news_results('html.parser', topic)
+      self.assertGreater(len(expected.results()), 0)
+      for engine in ENGINES:
+        with self.subTest(engine=engine, topic=topic):
+          self.assertParity(news_results(engine, topic).results(), expected.results())
+    print('News results identical across parsers')
+
+  def testTotalCount(self):
+    googlenews = GoogleNews(lang='pt', transport=FixtureTransport())
+    googlenews.search('startup')
+    self.assertEqual(googlenews.total_count(), 1230)
+
+  def testUnknownParser(self):
+    with self.assertRaises(ValueError):
+      GoogleNews(parser='regex')
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
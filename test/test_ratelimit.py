@@ -0,0 +1,152 @@
+
+### MODULES
+
+import time
+import threading
+import unittest
+from GoogleNews import GoogleNews, Transport, MemoryCache, RateLimiter, BlockedError
+from test.stub_server import StubServer, LocalTransport, fixture_for
+
+### METHODS
+
+CAPTCHA = b'<html><body><div id="infoDiv">Our systems have detected unusual traffic from your computer network.</div><form id="captcha-form"></form></body></html>'
+
+class CaptchaTransport(Transport):
+  rate_limited = True
+
+  def fetch(self, url, headers):
+    return CAPTCHA
+
+### TEST
+
+class RateLimiterTest(unittest.TestCase):
+
+  def testTokenBucket(self):
+    limiter = RateLimiter(rate=20, burst=2)
+    started = time.monotonic()
+    for _ in range(6):
+      limiter.acquire('www.google.com')
+    elapsed = time.monotonic() - started
+    # 2 at once, then one every 1/20 s
+    self.assertGreaterEqual(elapsed, 0.18)
+    self.assertLess(elapsed, 0.5)
+    limiter.acquire('news.google.com')
+    self.assertLess(time.monotonic() - started - elapsed, 0.02)
+    print('Requests paced per host ')
+
+  def testSharedBetweenThreads(self):
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire, args=('www.google.com',)) for _ in range(10)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertGreaterEqual(time.monotonic() - started, 9 / 50 - 0.01)
+    self.assertEqual(limiter.requests, 10)
+
+  def testBackoffAfterThrottle(self):
+    limiter = RateLimiter(rate=10, burst=1, backoff=0.1, jitter=0.5, max_wait=1)
+    first = limiter.throttled('www.google.com')
+    second = limiter.throttled('www.google.com')
+    self.assertTrue(0.1 <= first <= 0.15)
+    self.assertTrue(0.2 <= second <= 0.3)
+    self.assertEqual(limiter.stats()['hosts']['www.google.com']['rate'], 2.5)
+    started = time.monotonic()
+    limiter.acquire('www.google.com')
+    self.assertGreaterEqual(time.monotonic() - started, 0.15)
+    for _ in range(20):
+      limiter.succeeded('www.google.com')
+    self.assertEqual(limiter.stats()['hosts']['www.google.com']['rate'], 10)
+    print('Backoff with jitter after a throttle ')
+
+  def testNoBurstAfterThePause(self):
+    limiter = RateLimiter(rate=10, burst=5, backoff=0.2, jitter=0)
+    limiter.throttled('www.google.com')
+    limiter.succeeded('www.google.com')
+    started = time.monotonic()
+    for _ in range(3):
+      limiter.acquire('www.google.com')
+    # the pause, then one request every 1/rate: the pause refilled nothing
+    self.assertGreaterEqual(time.monotonic() - started, 0.2 + 2 / 10 - 0.02)
+
+  def testRetryAfterAndMaxWait(self):
+    limiter = RateLimiter(max_wait=1)
+    self.assertEqual(limiter.throttled('www.google.com', retry_after=120), 120)
+    with self.assertRaises(BlockedError) as raised:
+      limiter.acquire('www.google.com')
+    self.assertGreater(raised.exception.retry_after, 100)
+
+  def testMaxWaitCountsTheQueue(self):
+    limiter = RateLimiter(rate=10, burst=1, max_wait=0.35)
+    outcomes = []
+    def request():
+      try:
+        limiter.acquire('www.google.com')
+        outcomes.append('sent')
+      except BlockedError:
+        outcomes.append('blocked')
+    started = time.monotonic()
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    # one at once, then one every 1/10 s until the others have waited max_wait
+    self.assertLess(time.monotonic() - started, 0.6)
+    self.assertTrue(3 <= outcomes.count('sent') <= 5)
+    self.assertEqual(len(outcomes), 10)
+
+
+class BlockDetectionTest(unittest.TestCase):
+
+  def testCaptchaPage(self):
+    limiter = RateLimiter(backoff=0.01)
+    cache = MemoryCache()
+    googlenews = GoogleNews(transport=CaptchaTransport(), cache=cache, rate_limiter=limiter)
+    # raised even without enableException(), a block is not an empty search
+    with self.assertRaises(BlockedError):
+      googlenews.search('startup')
+    self.assertEqual(googlenews.results(), [])
+    googlenews.enableException(True)
+    with self.assertRaises(BlockedError):
+      googlenews.search('startup')
+    with self.assertRaises(BlockedError):
+      googlenews.get_news('startup')
+    self.assertEqual(limiter.throttles, 3)
+    self.assertEqual(len(cache), 0)
+    print('Captcha page raises BlockedError ')
+
+  def testTooManyRequests(self):
+    def handler(path):
+      if 'tbm=nws' in path:
+        return 429, {'Retry-After': '30'}, b''
+      return 200, {}, fixture_for(path)
+    limiter = RateLimiter(max_wait=5)
+    with StubServer(handler) as server:
+      transport = LocalTransport(server)
+      transport.rate_limited = True
+      googlenews = GoogleNews(transport=transport, rate_limiter=limiter)
+      googlenews.enableException(True)
+      with self.assertRaises(BlockedError) as raised:
+        googlenews.search('startup')
+      self.assertEqual(raised.exception.retry_after, 30)
+      # news.google.com is another host, it goes on
+      googlenews.get_news('startup')
+      self.assertGreater(len(googlenews.results()), 0)
+      with self.assertRaises(BlockedError):
+        googlenews.search('startup')
+      self.assertEqual(len([path for path in server.requests if 'tbm=nws' in path]), 1)
+      transport.close()
+
+  def testFakeTransportsAreNotPaced(self):
+    limiter = RateLimiter(rate=1, burst=1)
+    googlenews = GoogleNews(transport=Transport(), rate_limiter=limiter)
+    googlenews.transport.fetch = lambda url, headers: fixture_for(url)
+    googlenews.search('startup', pages=3, concurrency=3)
+    self.assertEqual(limiter.requests, 0)
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
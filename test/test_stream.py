@@ -0,0 +1,113 @@
+
+### MODULES
+
+import time
+import datetime
+import unittest
+from GoogleNews import GoogleNews, DomainFilter, process_pool
+from test.stub_server import FixtureTransport, FeedTransport
+
+### TEST
+
+class IterResultsTest(unittest.TestCase):
+
+  def testYieldsAllPagesWithoutStoring(self):
+    googlenews = GoogleNews(lang='pt', transport=FixtureTransport())
+    items = list(googlenews.iter_results('startup', max_pages=3))
+    self.assertEqual(len(items), 16)
+    self.assertEqual(googlenews.results(), [])
+    print('Results streamed without being stored')
+
+  def testSink(self):
+    seen = []
+    googlenews = GoogleNews(lang='pt', transport=FixtureTransport())
+    items = list(googlenews.iter_results('startup', max_pages=2, sink=seen.append))
+    self.assertEqual(seen, items)
+
+  def testStopsAtUntil(self):
+    googlenews = GoogleNews(lang='pt', transport=FixtureTransport())
+    until = datetime.datetime.now() - datetime.timedelta(days=2, hours=12)
+    titles = [item.title for item in googlenews.iter_results('startup', max_pages=5, until=until)]
+    # the third result of the first page is 3 days old
+    self.assertEqual(len(titles), 2)
+
+  def testBufferBoundsPagesInMemory(self):
+    transport = FixtureTransport()
+    googlenews = GoogleNews(lang='pt', transport=transport)
+    results = googlenews.iter_results('startup', max_pages=50, buffer=1)
+    next(results)
+    time.sleep(0.3)
+    # the page being consumed, one waiting in the buffer and one waiting to be put in it
+    self.assertLessEqual(len(transport.urls), 3)
+    results.close()
+    time.sleep(0.3)
+    fetched = len(transport.urls)
+    time.sleep(0.3)
+    self.assertEqual(len(transport.urls), fetched)
+
+  def testStopsAtFailedPage(self):
+    class FailingTransport(FixtureTransport):
+      def fetch(self, url, headers):
+        if 'start=20' in url:
+          raise OSError('connection reset')
+        return super().fetch(url, headers)
+    googlenews = GoogleNews(lang='pt', transport=FailingTransport())
+    self.assertEqual(len(list(googlenews.iter_results('startup'))), 10)
+
+def hourly(count):
+  return [('Notícia {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há {} horas'.format(i)) for i in range(count)]
+
+
+class FetchUntilTest(unittest.TestCase):
+
+  def testStopsAtThePageCrossingTheCutoff(self):
+    feed = FeedTransport(hourly(60))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=24, minutes=30)
+    self.assertEqual(googlenews.fetch_until(cutoff, max_pages=6, key='startup'), 3)
+    titles = [item.title for item in googlenews.results() if item.title]
+    self.assertEqual(titles, ['Notícia {}'.format(i) for i in range(25)])
+    # pages 1 to 3, and page 4 prefetched while page 3 was parsed
+    time.sleep(0.1)
+    self.assertEqual(len(feed.urls), 4)
+    print('Pages fetched until the cutoff')
+
+  def testStopsAtEmptyPageAndMaxPages(self):
+    feed = FeedTransport(hourly(15))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    old = datetime.datetime.now() - datetime.timedelta(days=30)
+    self.assertEqual(googlenews.fetch_until(old, max_pages=10, key='startup'), 3)
+    googlenews.clear()
+    feed.urls = []
+    self.assertEqual(googlenews.fetch_until(old, max_pages=1, key='startup'), 1)
+    self.assertEqual(len(feed.urls), 1)
+
+  def testWithoutPrefetch(self):
+    feed = FeedTransport(hourly(60))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    googlenews.search('startup')
+    googlenews.clear()
+    feed.urls = []
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=5)
+    self.assertEqual(googlenews.fetch_until(cutoff, prefetch=False), 1)
+    self.assertEqual(len(feed.urls), 1)
+
+  def testFilteredOutResultsStillReachTheCutoff(self):
+    feed = FeedTransport(hourly(60))
+    feed.feed[3] = ('Notícia 3', 'https://valor.globo.com/3', 'Valor', 'há 3 horas')
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=14, minutes=30)
+    for pool in (None, process_pool(1)):
+      with self.subTest(pool=pool):
+        googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+        googlenews.set_parse_pool(pool)
+        googlenews.set_filter(link=DomainFilter(['valor.globo.com']))
+        # page 2 has nothing from valor.globo.com, but its oldest result is older than the cutoff
+        self.assertEqual(googlenews.fetch_until(cutoff, max_pages=6, key='startup', prefetch=False), 2)
+        self.assertEqual([item.title for item in googlenews.results() if item.title], ['Notícia 3'])
+        if pool is not None:
+          pool.shutdown()
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,89 @@
+
+### MODULES
+
+import os
+import unittest
+from unittest import mock
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from GoogleNews import GoogleNews, PooledTransport
+from test.stub_server import StubServer, LocalTransport, search_fixture
+
+### TEST
+
+class PooledTransportTest(unittest.TestCase):
+
+  def testConnectionIsReused(self):
+    with StubServer() as server:
+      transport = PooledTransport()
+      for _ in range(3):
+        transport.fetch(server.url + '/search?q=a', {})
+      transport.close()
+    self.assertEqual(server.connections, 1)
+    self.assertEqual(transport.connections_opened, 1)
+    print('Keep-alive connection reused')
+
+  def testPoolSizeLimitsIdleConnections(self):
+    with StubServer() as server:
+      transport = PooledTransport(pool_size=2)
+      with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: transport.fetch(server.url + '/search', {}), range(4)))
+      opened = transport.connections_opened
+      for _ in range(4):
+        transport.fetch(server.url + '/search', {})
+      transport.close()
+    self.assertLessEqual(transport.connections_opened - opened, 2)
+
+  def testFollowsRedirects(self):
+    def handler(path):
+      if path == '/old':
+        return 302, {'Location': '/search?start=10'}, b''
+      return 200, {}, search_fixture(path)
+    with StubServer(handler) as server:
+      body = PooledTransport().fetch(server.url + '/old', {})
+    self.assertEqual(body, search_fixture('/search?start=10'))
+
+  def testErrorStatusRaisesHTTPError(self):
+    with StubServer(lambda path: (429, {}, b'slow down')) as server:
+      with self.assertRaises(urllib.error.HTTPError) as raised:
+        PooledTransport().fetch(server.url + '/search', {})
+    self.assertEqual(raised.exception.code, 429)
+
+  def testRecoversFromDroppedConnection(self):
+    with StubServer(lambda path: (200, {'X-Drop': '1'} if path == '/drop' else {}, b'ok')) as server:
+      transport = PooledTransport()
+      transport.fetch(server.url + '/drop', {})
+      self.assertEqual(transport.fetch(server.url + '/next', {}), b'ok')
+    self.assertEqual(transport.connections_opened, 2)
+
+  def testHttpProxy(self):
+    with StubServer(lambda path: (200, {}, path.encode())) as proxy:
+      transport = PooledTransport(proxies={'http': proxy.url})
+      self.assertEqual(transport.fetch('http://news.example/search?q=a', {}), b'http://news.example/search?q=a')
+      transport.close()
+    print('Requests sent through the proxy ')
+
+  def testProxyFromEnvironment(self):
+    with StubServer(lambda path: (200, {}, path.encode())) as proxy:
+      with mock.patch.dict(os.environ, {'http_proxy': proxy.url, 'no_proxy': '127.0.0.1'}):
+        transport = PooledTransport()
+        self.assertEqual(transport.fetch('http://news.example/a', {}), b'http://news.example/a')
+        # no_proxy hosts are reached directly, the server sees only the path
+        self.assertEqual(transport.fetch(proxy.url + '/a', {}), b'/a')
+      transport.close()
+
+class GoogleNewsTransportTest(unittest.TestCase):
+
+  def testSearchUsesInjectedTransport(self):
+    with StubServer() as server:
+      googlenews = GoogleNews(lang='pt', region='BR', transport=LocalTransport(server))
+      googlenews.search('startup', pages=3, concurrency=1)
+    self.assertEqual(len(googlenews.results()), 16)
+    self.assertEqual(server.connections, 1)
+    self.assertIn('hl=pt', server.requests[0])
+    print('Search pages share one connection')
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()
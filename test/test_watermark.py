@@ -0,0 +1,108 @@
+
+### MODULES
+
+import os
+import datetime
+import tempfile
+import unittest
+from GoogleNews import GoogleNews, DomainFilter, Watermark, MemoryWatermarkStore, SQLiteWatermarkStore
+from test.stub_server import FeedTransport
+from news_app import NoticiasBuscador
+
+### METHODS
+
+def news(first, last):
+  """Results first..last-1, the highest number being the newest."""
+  return [('Notícia {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há {} minutos'.format(1000 - i))
+          for i in reversed(range(first, last))]
+
+### TEST
+
+class PollTest(unittest.TestCase):
+
+  def testOnlyNewResults(self):
+    feed = FeedTransport(news(0, 25))
+    store = MemoryWatermarkStore()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    first = googlenews.poll('startup', store, pages=3)
+    self.assertEqual(len(first), 25)
+    self.assertEqual(len(feed.urls), 3)
+    feed.feed[:0] = news(25, 28)
+    feed.urls = []
+    second = googlenews.poll('startup', store, pages=3)
+    self.assertEqual([item['title'] for item in second], ['Notícia 27', 'Notícia 26', 'Notícia 25'])
+    self.assertEqual(len(feed.urls), 1)
+    self.assertEqual(googlenews.poll('startup', store, pages=3), [])
+    print('Poll returns only new results with one request ')
+
+  def testManyNewResultsGoOnToTheNextPage(self):
+    feed = FeedTransport(news(0, 10))
+    store = MemoryWatermarkStore()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    googlenews.poll('startup', store, pages=5)
+    feed.feed[:0] = news(10, 24)
+    feed.urls = []
+    new = googlenews.poll('startup', store, pages=5)
+    self.assertEqual(len(new), 14)
+    self.assertEqual(len(feed.urls), 2)
+
+  def testSearchesHaveTheirOwnWatermark(self):
+    store = MemoryWatermarkStore()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=FeedTransport(news(0, 5)))
+    self.assertEqual(len(googlenews.poll('startup', store)), 5)
+    self.assertEqual(len(googlenews.poll('fintech', store)), 5)
+    self.assertEqual(len(store), 2)
+
+  def testFailedPageKeepsTheWatermark(self):
+    feed = FeedTransport(news(0, 15))
+    store = MemoryWatermarkStore()
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    fetch = feed.fetch
+    def flaky(url, headers):
+      if 'start=10' in url:
+        raise OSError('connection reset')
+      return fetch(url, headers)
+    feed.fetch = flaky
+    self.assertEqual(len(googlenews.poll('startup', store, pages=2)), 10)
+    self.assertIsNone(store.get('startup pt pt-BR,pt;q=0.9 '))
+    feed.fetch = fetch
+    self.assertEqual(len(googlenews.poll('startup', store, pages=2)), 15)
+
+  def testFilteredOutResultsStillReachTheWatermark(self):
+    feed = FeedTransport([('Notícia {}'.format(i), 'https://exame.com/{}'.format(i), 'Exame', 'há {} horas'.format(i)) for i in range(60)])
+    feed.feed[30] = ('Notícia 30', 'https://valor.globo.com/30', 'Valor', 'há 30 horas')
+    store = MemoryWatermarkStore()
+    store.set('startup', Watermark(datetime.datetime.now() - datetime.timedelta(hours=2)))
+    googlenews = GoogleNews(lang='pt', region='BR', transport=feed)
+    googlenews.set_filter(link=DomainFilter(['valor.globo.com']))
+    # nothing on the first page is from valor.globo.com, but it already goes back past the watermark
+    self.assertEqual(googlenews.poll('startup', store, pages=5, name='startup'), [])
+    self.assertEqual(len(feed.urls), 1)
+
+  def testSQLiteStore(self):
+    with tempfile.TemporaryDirectory() as folder:
+      path = os.path.join(folder, 'marks.db')
+      googlenews = GoogleNews(lang='pt', region='BR', transport=FeedTransport(news(0, 5)))
+      googlenews.poll('startup', SQLiteWatermarkStore(path))
+      mark = SQLiteWatermarkStore(path).get('startup pt pt-BR,pt;q=0.9 ')
+      self.assertEqual(len(mark.links), 5)
+      self.assertTrue(mark.seen('https://exame.com/3&ved=other&usg=other'))
+      self.assertFalse(mark.seen('https://exame.com/7'))
+      self.assertEqual(Watermark.from_json(mark.to_json()).newest, mark.newest)
+
+  def testJsonWithoutMicroseconds(self):
+    mark = Watermark(datetime.datetime(2024, 12, 22, 2, 15), ['a1b2'])
+    self.assertEqual(Watermark.from_json(mark.to_json()).newest, datetime.datetime(2024, 12, 22, 2, 15))
+
+  def testNoticiasBuscador(self):
+    buscador = NoticiasBuscador()
+    feed = FeedTransport(news(0, 8))
+    buscador.googlenews.transport = feed
+    self.assertEqual(len(buscador.buscar_novas('startup')), 8)
+    feed.feed[:0] = news(8, 10)
+    self.assertEqual([n['title'] for n in buscador.buscar_novas('startup')], ['Notícia 9', 'Notícia 8'])
+
+### MAIN
+
+if __name__ == '__main__':
+  unittest.main()